@@ -0,0 +1,207 @@
+"""
+API-Football istemcisi (ht_bot.py ve fetch_matches.py ortak kullanır)
+- Kalıcı (keep-alive) TLS bağlantı havuzu
+- Bağlantı ve okuma zaman aşımları
+- 429/5xx ve ağ hatalarında jitter'lı üstel geri çekilme
+- Gövdesinde 'errors' olan 200 yanıtı hata sayılır (ApiError), hız sınırı hatası tekrar denenir
+- x-ratelimit-* başlıklarından kalan kota takibi
+- İsteğe bağlı disk önbelleği (response_cache.py): TTL, koşullu yenileme, hata anında eski kayıt
+- İsteğe bağlı süreçler arası kota bütçesi (shards.py)
+"""
+
+import http.client
+import json
+import os
+import queue
+import random
+from urllib.parse import urlsplit
+
+import clock
+from metrics import metrics
+from response_cache import ttl_for
+
+# Yerel test sunucusu için değiştirilebilir (örn. http://127.0.0.1:8080)
+API_URL = os.environ.get("API_FOOTBALL_URL", "https://v3.football.api-sports.io")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def make_connection(base_url, timeout):
+    """Adresin şemasına göre HTTP veya HTTPS bağlantısı oluştur"""
+    parts = urlsplit(base_url)
+    if parts.scheme == "http":
+        return http.client.HTTPConnection(parts.netloc, timeout=timeout)
+    return http.client.HTTPSConnection(parts.netloc, timeout=timeout)
+
+
+class ApiError(Exception):
+    """Tüm denemeler başarısız olduğunda fırlatılır"""
+
+
+class ApiFootballClient:
+    """API-Football için bağlantı havuzlu istemci"""
+
+    def __init__(self, api_key, base_url=API_URL, pool_size=4, connect_timeout=5, read_timeout=20,
+                 max_retries=3, backoff=1.0, cache=None, budget=None):
+        self.api_key = api_key
+        self.cache = cache
+        self.budget = budget
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool = queue.LifoQueue(maxsize=pool_size)
+        # Kota bilgisi (son yanıttan)
+        self.requests_limit = None
+        self.requests_remaining = None
+        self.minute_limit = None
+        self.minute_remaining = None
+        self.request_count = 0
+
+    def _acquire(self):
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            return make_connection(self.base_url, self.connect_timeout)
+
+    def _release(self, conn):
+        try:
+            self.pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _update_quota(self, res):
+        def header_int(name):
+            value = res.getheader(name)
+            return int(value) if value and value.isdigit() else None
+
+        daily_limit = header_int('x-ratelimit-requests-limit')
+        daily_remaining = header_int('x-ratelimit-requests-remaining')
+        minute_limit = header_int('X-RateLimit-Limit')
+        minute_remaining = header_int('X-RateLimit-Remaining')
+        if daily_remaining is not None:
+            self.requests_limit = daily_limit
+            self.requests_remaining = daily_remaining
+            metrics.set('api_quota_remaining', daily_remaining)
+        if minute_remaining is not None:
+            self.minute_limit = minute_limit
+            self.minute_remaining = minute_remaining
+        if self.budget is not None:
+            self.budget.update(daily_remaining, minute_limit)
+
+    def _retry_delay(self, attempt, res=None):
+        """Retry-After varsa ona uy (en uzun üstel beklemeyle sınırlı), yoksa tam jitter'lı üstel bekleme"""
+        if res is not None:
+            retry_after = res.getheader('Retry-After')
+            if retry_after and retry_after.isdigit():
+                # Büyük bir değer canlı sorgu döngüsünü (HT penceresini) kilitlemesin
+                return min(int(retry_after), self.backoff * (2 ** self.max_retries))
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def _send(self, endpoint, headers):
+        conn = self._acquire()
+        if conn.sock is not None:
+            # Sunucu boşta kalan bağlantıyı kapatmış olabilir: bir kez yeni bağlantıyla dene
+            try:
+                return self._send_on(conn, endpoint, headers)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn = make_connection(self.base_url, self.connect_timeout)
+        return self._send_on(conn, endpoint, headers)
+
+    def _send_on(self, conn, endpoint, headers):
+        try:
+            if conn.sock is None:
+                conn.connect()
+                conn.sock.settimeout(self.read_timeout)
+            conn.request("GET", endpoint, headers=headers)
+            res = conn.getresponse()
+            body = res.read()
+        except Exception:
+            conn.close()
+            raise
+        if res.will_close:
+            conn.close()
+        self._release(conn)
+        return res, body
+
+    def get(self, endpoint):
+        """GET isteği gönder, JSON yanıtı döndür (önbellek varsa önce ona bakılır)"""
+        ttl = ttl_for(endpoint) if self.cache else 0
+        entry = self.cache.get(endpoint) if ttl else None
+        if entry is not None and entry.is_fresh(ttl):
+            metrics.inc('api_cache', result='hit')
+            return entry.data
+        try:
+            return self._fetch(endpoint, entry, ttl)
+        except ApiError as e:
+            if entry is None:
+                raise
+            # Eski kayıt hatadan iyidir (fikstür listeleri gibi yavaş değişen veriler)
+            print(f"API hatası, önbellekteki eski yanıt kullanılıyor: {e}")
+            metrics.inc('api_cache', result='stale')
+            return entry.data
+
+    def _fetch(self, endpoint, entry, ttl):
+        headers = {'x-apisports-key': self.api_key}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        last_error = None
+        path = endpoint.split('?', 1)[0]
+        for attempt in range(self.max_retries + 1):
+            res = None
+            if self.budget is not None and not self.budget.acquire():
+                raise ApiError(f"{endpoint}: günlük kota bütçesi tükendi")
+            try:
+                with metrics.timer('phase', phase='api_request'):
+                    res, body = self._send(endpoint, headers)
+                self.request_count += 1
+                metrics.inc('api_requests', endpoint=path, status=res.status)
+                self._update_quota(res)
+                if res.status == 304 and entry is not None:
+                    metrics.inc('api_cache', result='revalidated')
+                    self.cache.revalidated(entry)
+                    return entry.data
+                if res.status == 200:
+                    with metrics.timer('phase', phase='json_decode'):
+                        data = json.loads(body.decode("utf-8"))
+                    errors = data.get('errors')
+                    if not errors:
+                        if ttl:
+                            metrics.inc('api_cache', result='miss')
+                            self.cache.put(endpoint, data, res.getheader('ETag'), res.getheader('Last-Modified'))
+                        return data
+                    # 200 yanıtında hata (geçersiz parametre, kota, hız sınırı): boş sonuç başarı sayılmaz
+                    last_error = ApiError(f"API hatası: {errors}")
+                    metrics.inc('api_errors', endpoint=path)
+                    if not (isinstance(errors, dict) and 'rateLimit' in errors):
+                        break
+                else:
+                    last_error = ApiError(f"HTTP {res.status}")
+                    if res.status not in RETRY_STATUSES:
+                        break
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                last_error = e
+                metrics.inc('api_errors', endpoint=path)
+            if attempt < self.max_retries:
+                delay = self._retry_delay(attempt, res)
+                print(f"API hatası: {last_error} ({endpoint}), {delay:.1f} sn sonra tekrar "
+                      f"(deneme {attempt + 1}/{self.max_retries})")
+                clock.sleep(delay)
+        raise ApiError(f"{endpoint}: {last_error}")
+
+    def quota_summary(self):
+        """Kalan günlük kota metni"""
+        if self.requests_remaining is None:
+            return "bilinmiyor"
+        return f"{self.requests_remaining}/{self.requests_limit}"
+
+    def close(self):
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+HT 0-0 stratejisi geriye dönük testi
+- Maçları kronolojik sırayla tekrar oynatır, her maçın özelliklerini o ana kadarki
+  veriyle (botun calculate_features() ile gördüğü gibi) hesaplar
+- HT 0-0 biten maçlarda ikinci yarı gol oranını eşik ve lig bazında raporlar
+- Eşik taraması işlemci çekirdeklerine paralel dağıtılır
+
+Kullanım:
+  python3 backtest.py                              # matches.db (yoksa matches_2025.csv)
+  python3 backtest.py --csv matches_2024.csv matches_2025.csv
+  python3 backtest.py --thresholds 1.5:4.0:0.25 --league-threshold 2.5
+  python3 backtest.py --feature avg_goal_combined_home_away_last10 --thresholds 1.0:4.0:0.25
+"""
+
+import argparse
+import csv
+import math
+import os
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from match_store import MatchStore, DB_FILE
+from team_stats import TeamStatsIndex
+
+CSV_FILE = "matches_2025.csv"
+COLUMNS = ('date', 'time', 'league_name', 'home_team_id', 'away_team_id',
+           'ht_home', 'ht_away', 'home_goals', 'away_goals')
+NAN = float('nan')
+
+
+def load_rows(csv_files=None, db_file=DB_FILE):
+    """Maçları (COLUMNS sırasıyla) kronolojik sırada yükle"""
+    if not csv_files:
+        if os.path.exists(db_file):
+            return MatchStore(db_file).iter_matches(COLUMNS)
+        csv_files = [CSV_FILE]
+    rows = {}
+    for path in csv_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                rows[row['fixture_id']] = tuple(row[c] for c in COLUMNS)
+    return sorted(rows.values(), key=lambda r: (r[0], r[1]))
+
+
+class HtSample:
+    """HT 0-0 biten maçların anlık özellikleri ve sonuçları (sütun dizileri)"""
+
+    def __init__(self):
+        self.league = []
+        self.combined = array('d')      # Eşikle karşılaştırılan özellik (yoksa NaN)
+        self.no_goal = array('b')       # Son 5'te gol yok bayrağı: 1 evet, 0 hayır, -1 veri yok
+        self.second_half = array('h')   # İkinci yarı gol sayısı
+
+    def __len__(self):
+        return len(self.second_half)
+
+
+def replay(rows, feature='avg_goal_combined_home_away'):
+    """Tek kronolojik geçişte özellikleri hesapla, HT 0-0 örneklemini döndür"""
+    stats = TeamStatsIndex()
+    sample = HtSample()
+    for _, _, league, home, away, ht_home, ht_away, home_goals, away_goals in rows:
+        if ht_home in (None, '') or home_goals in (None, ''):
+            continue
+        home_goals, away_goals = int(home_goals), int(away_goals)
+        if int(ht_home) == 0 and int(ht_away) == 0:
+            features = stats.features(home, away)
+            combined = features[feature]
+            flags = (features['home_team_no_goal_last5'], features['away_team_no_goal_last5'])
+            sample.league.append(league)
+            sample.combined.append(NAN if combined is None else combined)
+            sample.no_goal.append(1 if 1 in flags else -1 if None in flags else 0)
+            sample.second_half.append(home_goals + away_goals)
+        stats.add_match(home, away, home_goals, away_goals)
+    return sample
+
+
+# Çalışan süreçlerde paylaşılan örneklem
+_sample = None
+
+
+def _init_worker(sample):
+    global _sample
+    _sample = sample
+
+
+def evaluate(threshold, sample=None):
+    """Bir eşik için bildirim sayısı ve ikinci yarı gol isabeti"""
+    sample = sample or _sample
+    alerts = hits = goals = 0
+    for combined, no_goal, second_half in zip(sample.combined, sample.no_goal, sample.second_half):
+        if math.isnan(combined) or combined <= threshold or no_goal == 1:
+            continue
+        alerts += 1
+        goals += second_half
+        if second_half > 0:
+            hits += 1
+    return threshold, alerts, hits, goals
+
+
+def by_league(sample, threshold):
+    """Lig bazında: (HT 0-0 maç, 2Y gollü, bildirim, isabet)"""
+    result = defaultdict(lambda: [0, 0, 0, 0])
+    for league, combined, no_goal, second_half in zip(sample.league, sample.combined,
+                                                      sample.no_goal, sample.second_half):
+        row = result[league]
+        row[0] += 1
+        row[1] += second_half > 0
+        if not math.isnan(combined) and combined > threshold and no_goal != 1:
+            row[2] += 1
+            row[3] += second_half > 0
+    return result
+
+
+def parse_range(text):
+    start, stop, step = (float(x) for x in text.split(':'))
+    values = []
+    value = start
+    while value <= stop + 1e-9:
+        values.append(round(value, 4))
+        value += step
+    return values
+
+
+def pct(part, whole):
+    return f"{100 * part / whole:5.1f}%" if whole else "    -"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HT 0-0 stratejisi geriye dönük testi")
+    parser.add_argument('--csv', nargs='*', help="Sezon CSV dosyaları (varsayılan: maç deposu)")
+    parser.add_argument('--thresholds', default="1.5:4.0:0.25", help="başlangıç:bitiş:adım")
+    parser.add_argument('--league-threshold', type=float, default=2.5)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--feature', default='avg_goal_combined_home_away',
+                        help="Eşikle karşılaştırılan özellik (ör. ..._last10, ..._ewm10)")
+    args = parser.parse_args()
+    known = TeamStatsIndex().features(0, 0)
+    if args.feature not in known:
+        parser.error(f"bilinmeyen özellik: {args.feature} (seçenekler: {', '.join(sorted(known))})")
+
+    sample = replay(load_rows(args.csv), args.feature)
+    base_hits = sum(1 for g in sample.second_half if g > 0)
+    print(f"HT 0-0 maç: {len(sample)}, ikinci yarıda gol: {pct(base_hits, len(sample))}")
+
+    thresholds = parse_range(args.thresholds)
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(sample,)) as pool:
+        results = list(pool.map(evaluate, thresholds))
+
+    print(f"\n{'Eşik':>6} {'Bildirim':>9} {'2Y gol':>8} {'Ort. 2Y gol':>12}")
+    for threshold, alerts, hits, goals in results:
+        avg_goals = f"{goals / alerts:.2f}" if alerts else "-"
+        print(f"{threshold:>6.2f} {alerts:>9} {pct(hits, alerts):>8} {avg_goals:>12}")
+
+    print(f"\nLig bazında (eşik > {args.league_threshold}):")
+    print(f"{'Lig':<32} {'HT 0-0':>7} {'2Y gol':>8} {'Bildirim':>9} {'İsabet':>8}")
+    leagues = by_league(sample, args.league_threshold)
+    for league, (matches, goal_matches, alerts, hits) in sorted(leagues.items(), key=lambda x: -x[1][0]):
+        print(f"{league[:32]:<32} {matches:>7} {pct(goal_matches, matches):>8} {alerts:>9} {pct(hits, alerts):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Botun sıcak yolları için mikro benchmark
+- matches_2025.csv şemasında deterministik sentetik geçmiş (10k / 100k / 1M satır)
+- 10-500 maçlık sentetik canlı yanıtlar
+- load_historical_data(), calculate_features(), save_finished_match() ve tam bir
+  check_live_matches() turu için süre ve tepe bellek
+- Sonuçlar JSON olarak saklanıp sonraki çalıştırmalarla karşılaştırılabilir
+
+Kullanım:
+  python3 benchmark.py --save bench_baseline.json
+  python3 benchmark.py --sizes 10000 100000 --compare bench_baseline.json
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+WORKDIR = tempfile.mkdtemp(prefix="ht_bench_")
+# ht_bot içe aktarılmadan önce: gerçek giden kutusu/veritabanı kullanılmasın
+os.environ["OUTBOX_FILE"] = os.path.join(WORKDIR, "outbox.json")
+os.environ["MATCH_DB_FILE"] = os.path.join(WORKDIR, "matches.db")
+os.environ["API_CACHE_DIR"] = os.path.join(WORKDIR, "api_cache")
+os.environ["ALERT_OUTCOMES_FILE"] = os.path.join(WORKDIR, "alert_outcomes.jsonl")
+os.environ["STATE_JOURNAL_FILE"] = os.path.join(WORKDIR, "state_journal.jsonl")
+
+import ht_bot  # noqa: E402
+from match_store import MatchStore, FIELDS  # noqa: E402
+from fixture_model import Fixture  # noqa: E402
+from state_journal import StateJournal, JOURNAL_FILE  # noqa: E402
+
+LIVE_SIZES = (10, 50, 100, 500)
+LEAGUE_IDS = list(ht_bot.LEAGUES.keys())
+
+
+# ==================== VERİ ÜRETİMİ ====================
+
+def generate_csv(path, rows, seed=42):
+    """matches_2025.csv şemasında deterministik geçmiş üret, takım id'lerini döndür"""
+    rng = random.Random(seed)
+    team_count = max(20, rows // 20)
+    team_ids = [10000 + i for i in range(team_count)]
+    start = date(2015, 7, 1)
+    per_day = max(1, rows // 3650)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for i in range(rows):
+            home, away = rng.sample(team_ids, 2)
+            ht_home, ht_away = rng.choice((0, 0, 0, 1, 1, 2)), rng.choice((0, 0, 0, 1, 1))
+            ft_home, ft_away = ht_home + rng.choice((0, 0, 1, 1, 2)), ht_away + rng.choice((0, 0, 1, 1))
+            league = rng.choice(LEAGUE_IDS)
+            writer.writerow([
+                1000000 + i, (start + timedelta(days=i // per_day)).isoformat(), f"{12 + i % 10}:00",
+                league, ht_bot.LEAGUES[league], "World", "Regular Season",
+                home, f"Team {home}", away, f"Team {away}",
+                ft_home, ft_away, ht_home, ht_away, ft_home, ft_away,
+                '', '', '', '', '', '', '', '',
+            ])
+    return team_ids
+
+
+def generate_live(count, team_ids, seed=7, first_id=50000000):
+    """API-Football /fixtures?live= yanıtı şeklinde maçlar"""
+    rng = random.Random(seed)
+    statuses = ('1H', 'HT', 'HT', '2H', '2H', 'FT')
+    response = []
+    for i in range(count):
+        home, away = rng.sample(team_ids, 2)
+        status = rng.choice(statuses)
+        ht = (rng.choice((0, 0, 1)), rng.choice((0, 0, 1))) if status != '1H' else (None, None)
+        goals = (ht[0] or 0, ht[1] or 0)
+        league = rng.choice(LEAGUE_IDS)
+        response.append({
+            'fixture': {'id': first_id + i, 'date': "2026-10-17T20:00:00+03:00",
+                        'status': {'short': status, 'elapsed': 45 if status == 'HT' else 70}},
+            'league': {'id': league, 'name': ht_bot.LEAGUES[league], 'country': "World",
+                       'round': "Regular Season"},
+            'teams': {'home': {'id': home, 'name': f"Team {home}"},
+                      'away': {'id': away, 'name': f"Team {away}"}},
+            'goals': {'home': goals[0], 'away': goals[1]},
+            'score': {'halftime': {'home': ht[0], 'away': ht[1]},
+                      'fulltime': {'home': goals[0] if status == 'FT' else None,
+                                   'away': goals[1] if status == 'FT' else None}},
+        })
+    return {'response': response}
+
+
+class ReplayApi:
+    """Sabit canlı yanıt döndüren API (ağ süresi ölçüme katılmaz)"""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def get(self, endpoint):
+        return self.payload
+
+    def quota_summary(self):
+        return "-"
+
+
+# ==================== ÖLÇÜM ====================
+
+def measure(func, setup=None, repeat=3):
+    """En iyi süre (sn) ve tepe bellek (MB)"""
+    best = None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        func(arg)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    arg = setup() if setup else None
+    tracemalloc.start()
+    func(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': round(best, 6), 'peak_mb': round(peak / 1e6, 3)}
+
+
+_open_stores = []
+
+
+def fresh_store(db_file, template):
+    """Şablon veritabanının kopyası (önceki ölçümün deposu kapatılır)"""
+    while _open_stores:
+        _open_stores.pop().conn.close()
+    shutil.copyfile(template, db_file)
+    store = MatchStore(db_file)
+    _open_stores.append(store)
+    return store
+
+
+def run_size(rows, repeat):
+    csv_file = os.path.join(WORKDIR, f"history_{rows}.csv")
+    template = os.path.join(WORKDIR, f"history_{rows}.db")
+    db_file = os.path.join(WORKDIR, "work.db")
+    team_ids = generate_csv(csv_file, rows)
+    ht_bot.CSV_FILE = csv_file
+    results = {}
+
+    def import_csv(_):
+        if os.path.exists(db_file):
+            os.remove(db_file)
+        store = MatchStore(db_file)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ht_bot.load_historical_data(store)
+        store.conn.close()
+
+    results['import_csv'] = measure(import_csv, repeat=1)
+    shutil.copyfile(db_file, template)
+
+    results['load_historical_data'] = measure(
+        lambda store: ht_bot.load_historical_data(store), lambda: fresh_store(db_file, template), repeat)
+
+    stats = ht_bot.load_historical_data(MatchStore(template))
+    rng = random.Random(1)
+    pairs = [rng.sample(team_ids, 2) for _ in range(10000)]
+
+    def features(_):
+        for home, away in pairs:
+            ht_bot.calculate_features(home, away, stats)
+
+    results['calculate_features_x10000'] = measure(features, repeat=repeat)
+
+    finished = generate_live(200, team_ids, seed=3, first_id=60000000)['response']
+    for m in finished:
+        m['fixture']['status']['short'] = 'FT'
+        m['score']['halftime'] = {'home': 0, 'away': 0}
+        m['score']['fulltime'] = dict(m['goals'])
+    finished = [Fixture.from_api(m) for m in finished]
+
+    def fresh_state():
+        store = fresh_store(db_file, template)
+        return store, store.load_stats()
+
+    def save(state):
+        store, stats = state
+        with contextlib.redirect_stdout(io.StringIO()):
+            for m in finished:
+                ht_bot.save_finished_match(m, stats, store)
+            store.flush(stats)
+
+    results['save_finished_match_x200'] = measure(save, fresh_state, repeat)
+
+    for live in LIVE_SIZES:
+        payload = generate_live(live, team_ids)
+
+        def setup():
+            ht_bot.api = ReplayApi(payload)
+            ht_bot.notified_fixtures.clear()
+            ht_bot.fixture_tracker.clear()
+            ht_bot.prematch.clear()
+            ht_bot.journal.close()
+            ht_bot.journal = StateJournal(JOURNAL_FILE)
+            return fresh_state()
+
+        def tick(state):
+            store, stats = state
+            with contextlib.redirect_stdout(io.StringIO()):
+                ht_bot.check_live_matches(stats, store)
+                store.flush(stats)
+
+        results[f'check_live_matches_{live}'] = measure(tick, setup, repeat)
+    return results
+
+
+def compare(current, baseline):
+    print(f"\n{'Ölçüm':<42} {'Önceki':>10} {'Şimdi':>10} {'Oran':>7}")
+    for size, results in current.items():
+        for name, value in results.items():
+            old = baseline.get(size, {}).get(name)
+            if not old:
+                continue
+            ratio = value['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+            flag = "  ⚠" if ratio > 1.2 else ""
+            print(f"{size + ' ' + name:<42} {old['seconds']:>10.4f} {value['seconds']:>10.4f} {ratio:>6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HT bot mikro benchmark")
+    parser.add_argument('--sizes', nargs='*', type=int, default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help="Sonuçların yazılacağı JSON")
+    parser.add_argument('--compare', help="Karşılaştırılacak önceki sonuç JSON")
+    args = parser.parse_args()
+
+    ht_bot.outbox.enqueue = lambda chat_id, text, meta=None: None  # Disk yazımı ölçüme girmesin
+    ht_bot.enricher.deadline = 0  # Devre arası verisi ağdan çekilir, ölçüme girmesin
+    current = {}
+    try:
+        for rows in args.sizes:
+            print(f"{rows} satır...", flush=True)
+            current[str(rows)] = run_size(rows, args.repeat)
+            for name, value in current[str(rows)].items():
+                print(f"  {name:<32} {value['seconds']:>10.4f} sn {value['peak_mb']:>9.2f} MB")
+    finally:
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(current, json.load(f))
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"\n✓ Sonuçlar '{args.save}' dosyasına kaydedildi.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Bot saati
+- Varsayılan: gerçek saat
+- CLOCK_START (ISO zaman) verilirse sanal saat o andan başlar,
+  CLOCK_SPEED katı hızla ilerler (örn. 60 -> 1 gerçek saniye = 1 sanal dakika)
+- CLOCK_ORIGIN (unix zamanı) sanal başlangıcın gerçek karşılığı; aynı değerleri
+  alan süreçler (bot ve replay_server.py) aynı sanal saati paylaşır
+"""
+
+import os
+import time
+from datetime import datetime
+
+_START = os.environ.get("CLOCK_START")
+SPEED = float(os.environ.get("CLOCK_SPEED", "1"))
+_ORIGIN = float(os.environ.get("CLOCK_ORIGIN", time.time()))
+_START_TS = datetime.fromisoformat(_START).timestamp() if _START else None
+
+
+def timestamp():
+    """Şu anki (sanal) unix zamanı"""
+    if _START_TS is None:
+        return time.time()
+    return _START_TS + (time.time() - _ORIGIN) * SPEED
+
+
+def now(tz=None):
+    """Şu anki (sanal) zaman"""
+    return datetime.fromtimestamp(timestamp(), tz)
+
+
+def sleep(seconds):
+    """Sanal saniye kadar bekle"""
+    if seconds > 0:
+        time.sleep(real_seconds(seconds))
+
+
+def real_seconds(seconds):
+    """Sanal süreyi gerçek bekleme süresine çevir"""
+    return seconds / SPEED if _START_TS is not None else seconds
@@ -0,0 +1,297 @@
+"""
+Telegram komutları
+- Arka plandaki iş parçacığı getUpdates ile uzun sorgu (long polling) yapar
+- /team, /today, /league ve /help komutları bellekteki takım istatistikleri, günün fikstürü,
+  canlı maç görüntüleri ve maç deposundaki indeksli sorgularla yanıtlanır (API-Football çağrısı yok)
+- Hazır yanıtlar LRU önbellekte tutulur: yeni maç kaydedilince temizlenir, /today canlı skor değişince
+- Yanıtlar giden kutusu üzerinden gönderilir (hız sınırı ve kalıcılık orada)
+"""
+
+import html
+import http.client
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from api_client import make_connection
+from metrics import metrics
+from telegram_outbox import TELEGRAM_URL, MAX_MESSAGE_LENGTH, MAX_BACKOFF
+
+COMMANDS_ENABLED = os.environ.get("TELEGRAM_COMMANDS", "1") != "0"
+LONG_POLL_TIMEOUT = 50   # getUpdates bekleme süresi (saniye)
+ANSWER_CACHE_SIZE = 256
+LAST_MATCHES = 5
+MAX_CHOICES = 8          # Birden çok takım/lig eşleşirse listelenecek ad sayısı
+
+HELP = ("<b>Komutlar</b>\n"
+        "/team &lt;takım&gt; - Ortalamalar ve son 5 maç\n"
+        "/today - Bugünkü maçlar ve skorlar\n"
+        "/league &lt;lig&gt; - Lig özeti ve HT 0-0 isabet oranı")
+
+
+def _percent(part, whole):
+    return f"%{100 * part / whole:.1f}" if whole else "-"
+
+
+def _avg(value):
+    return f"{value:.2f}" if value is not None else "-"
+
+
+def _truncate(text):
+    if len(text) <= MAX_MESSAGE_LENGTH:
+        return text
+    return text[:text.rfind("\n", 0, MAX_MESSAGE_LENGTH - 4)] + "\n..."
+
+
+class AnswerCache:
+    """Komut yanıtları için LRU önbellek: (komut, argüman) -> metin"""
+
+    def __init__(self, size=ANSWER_CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            text = self.entries.get(key)
+            if text is not None:
+                self.entries.move_to_end(key)
+        metrics.inc('command_cache', result='miss' if text is None else 'hit')
+        return text
+
+    def put(self, key, text):
+        with self.lock:
+            self.entries[key] = text
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, command=None):
+        """Tüm yanıtları (veya yalnızca bir komutunkileri) at"""
+        with self.lock:
+            if command is None:
+                self.entries.clear()
+            else:
+                for key in [key for key in self.entries if key[0] == command]:
+                    del self.entries[key]
+
+
+class CommandHandler:
+    """Komut metnini yanıtla (önbellekten veya bellekteki veriden)"""
+
+    def __init__(self, leagues, fixtures, live, today):
+        self.leagues = leagues    # id -> League
+        self.fixtures = fixtures  # fixtures() -> günün Fixture kayıtları
+        self.live = live          # live(fixture_id) -> canlı Snapshot veya None
+        self.today = today        # today() -> "YYYY-MM-DD"
+        self.store = None
+        self.stats = None
+        self.team_names = None    # team_id -> ad (ilk /team komutunda depodan)
+        self.cache = AnswerCache()
+        self.handlers = {'team': self.team, 'today': self.today_fixtures, 'league': self.league,
+                         'help': lambda arg: HELP, 'start': lambda arg: HELP}
+
+    def attach(self, store, stats):
+        """Maç deposu ve takım istatistik indeksi (bot başlarken)"""
+        self.store = store
+        self.stats = stats
+        self.cache.invalidate()
+
+    def match_saved(self, match):
+        """Yeni maç kaydedildi: takım adlarını güncelle, yanıtları temizle"""
+        if self.team_names is not None:
+            self.team_names[match.home_id] = match.home_name
+            self.team_names[match.away_id] = match.away_name
+        self.cache.invalidate()
+
+    def live_changed(self):
+        """Canlı skorlar değişti: yalnızca /today yanıtları eskidi"""
+        self.cache.invalidate('today')
+
+    def answer(self, text):
+        """Komut metni -> yanıt (bilinmeyen komutta None)"""
+        command, _, arg = text.strip().partition(' ')
+        command = command[1:].split('@', 1)[0].lower()
+        handler = self.handlers.get(command)
+        if handler is None or self.store is None:
+            return None
+        arg = ' '.join(arg.split())
+        key = (command, arg.casefold(), self.today())
+        reply = self.cache.get(key)
+        if reply is None:
+            with metrics.timer('phase', phase='command'):
+                reply = _truncate(handler(arg))
+            self.cache.put(key, reply)
+        return reply
+
+    # ---------- Komutlar ----------
+
+    def _find(self, query, names):
+        """Ada göre ara: tam eşleşme, yoksa içeren adlar"""
+        needle = query.casefold()
+        exact = [(key, name) for key, name in names if name.casefold() == needle]
+        return exact or [(key, name) for key, name in names if needle in name.casefold()]
+
+    def _choices(self, kind, query, found):
+        if not found:
+            return f"❓ {kind} bulunamadı: {html.escape(query)}"
+        names = sorted({name for _, name in found})
+        more = f"\n... (+{len(names) - MAX_CHOICES})" if len(names) > MAX_CHOICES else ""
+        return f"❓ Birden çok {kind.lower()} eşleşti:\n" + "\n".join(
+            f"• {html.escape(name)}" for name in names[:MAX_CHOICES]) + more
+
+    def team(self, arg):
+        if not arg:
+            return "Kullanım: /team &lt;takım adı&gt;"
+        if self.team_names is None:
+            self.team_names = self.store.team_names()
+        found = self._find(arg, list(self.team_names.items()))
+        if len({team_id for team_id, _ in found}) != 1:
+            return self._choices("Takım", arg, found)
+        team_id, name = found[0]
+        stats = self.stats.get(team_id)
+        lines = [f"⚽ <b>{html.escape(name)}</b>",
+                 f"Ortalama gol: iç saha {_avg(stats.avg_home())}, deplasman {_avg(stats.avg_away())}, "
+                 f"genel {_avg(stats.avg_all())} ({stats.home_count + stats.away_count} maç)"]
+        recent = stats.recent_goals()
+        if recent:
+            lines.append(f"Son {len(recent)} maçta attığı goller: {' '.join(str(g) for g in recent)}")
+        matches = self.store.team_matches(team_id, LAST_MATCHES)
+        if matches:
+            lines.append("\n<b>Son maçlar:</b>")
+            for day, home, away, home_goals, away_goals, ht_home, ht_away in matches:
+                lines.append(f"• {day} {html.escape(home)} {home_goals}-{away_goals} {html.escape(away)} "
+                             f"(HT {ht_home}-{ht_away})")
+        for f in self._todays():
+            if team_id in (f.home_id, f.away_id):
+                lines.append(f"\nBugün: {f.date[11:16]} {html.escape(f.home_name)} - {html.escape(f.away_name)} "
+                             f"({html.escape(f.league_name)})")
+        return "\n".join(lines)
+
+    def _todays(self):
+        today = self.today()
+        return sorted((f for f in self.fixtures() if f.date[:10] == today), key=lambda f: (f.date, f.id))
+
+    def _fixture_line(self, f, results):
+        home, away = html.escape(f.home_name), html.escape(f.away_name)
+        snapshot = self.live(f.id)
+        if snapshot is not None:
+            minute = f" {snapshot.elapsed}'" if snapshot.elapsed and snapshot.status != 'HT' else ""
+            return f"{f.date[11:16]} {home} {snapshot.home}-{snapshot.away} {away} ({snapshot.status}{minute})"
+        if f.id in results:
+            return f"{f.date[11:16]} {home} {results[f.id][0]}-{results[f.id][1]} {away} (FT)"
+        return f"{f.date[11:16]} {home} - {away}"
+
+    def today_fixtures(self, arg):
+        fixtures = self._todays()
+        if not fixtures:
+            return "😴 Bugün izlenen liglerde maç yok."
+        results = self.store.results_on(self.today())
+        lines = [f"📅 <b>Bugünkü maçlar</b> ({len(fixtures)})"]
+        league_id = None
+        for f in sorted(fixtures, key=lambda f: (f.league_id, f.date, f.id)):
+            if f.league_id != league_id:
+                league_id = f.league_id
+                lines.append(f"\n🏆 <b>{html.escape(f.league_name)}</b>")
+            lines.append(self._fixture_line(f, results))
+        return "\n".join(lines)
+
+    def league(self, arg):
+        if not arg:
+            return "Kullanım: /league &lt;lig adı veya id&gt;"
+        if arg.isdigit() and int(arg) in self.leagues:
+            found = [(int(arg), self.leagues[int(arg)].name)]
+        else:
+            needle = arg.casefold()
+            found = [(lid, league.name) for lid, league in self.leagues.items() if league.slug.casefold() == needle]
+            found = found or self._find(arg, [(lid, league.name) for lid, league in self.leagues.items()])
+        if len(found) != 1:
+            return self._choices("Lig", arg, found)
+        league_id, name = found[0]
+        total, ht00, second_half = self.store.league_summary(league_id)
+        today = sum(1 for f in self._todays() if f.league_id == league_id)
+        return (f"🏆 <b>{html.escape(name)}</b>\n"
+                f"Kayıtlı maç: {total}\n"
+                f"HT 0-0: {ht00} ({_percent(ht00, total)})\n"
+                f"HT 0-0 sonrası 2. yarı golü: {second_half}/{ht00} ({_percent(second_half, ht00)})\n"
+                f"Bugün: {today} maç")
+
+
+class CommandPoller:
+    """getUpdates uzun sorgusu; yalnızca abone sohbetlerin komutları yanıtlanır"""
+
+    def __init__(self, token, handler, send, chat_ids, base_url=TELEGRAM_URL, timeout=LONG_POLL_TIMEOUT):
+        self.token = token
+        self.handler = handler
+        self.send = send            # send(text, chat_id)
+        self.chat_ids = set(chat_ids)
+        self.base_url = base_url
+        self.timeout = timeout
+        self.offset = None
+        self.conn = None
+        self.thread = None
+        self.failures = 0
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="telegram-commands", daemon=True)
+            self.thread.start()
+
+    def _get_updates(self):
+        params = {'timeout': self.timeout, 'allowed_updates': '["message"]'}
+        if self.offset is not None:
+            params['offset'] = self.offset
+        if self.conn is None:
+            self.conn = make_connection(self.base_url, self.timeout + 10)
+        self.conn.request("GET", f"/bot{self.token}/getUpdates?{urlencode(params)}")
+        res = self.conn.getresponse()
+        data = json.loads(res.read().decode("utf-8"))
+        if res.will_close:
+            self._reset()
+        if not data.get('ok'):
+            raise ValueError(f"HTTP {res.status} {data.get('description', '')}")
+        return data.get('result', [])
+
+    def _run(self):
+        while True:
+            try:
+                updates = self._get_updates()
+                self.failures = 0
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                self._reset()
+                self.failures += 1
+                delay = min(2 ** self.failures, MAX_BACKOFF)
+                print(f"Telegram komut sorgusu hatası: {e}, {delay} sn sonra tekrar")
+                time.sleep(delay)
+                continue
+            for update in updates:
+                self.offset = update['update_id'] + 1
+                self._dispatch(update.get('message') or {})
+
+    def _dispatch(self, message):
+        text = message.get('text') or ''
+        if not text.startswith('/'):
+            return
+        chat_id = str(message.get('chat', {}).get('id'))
+        if chat_id not in self.chat_ids:
+            metrics.inc('commands', result='ignored')
+            return
+        try:
+            reply = self.handler.answer(text)
+        except Exception as e:
+            print(f"Komut yanıtlanamadı ({text}): {e}")
+            metrics.inc('commands', result='error')
+            return
+        if reply is None:
+            metrics.inc('commands', result='unknown')
+            return
+        metrics.inc('commands', result='answered')
+        self.send(reply, chat_id)
+
+    def _reset(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
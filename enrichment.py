@@ -0,0 +1,127 @@
+"""
+Devre arası zenginleştirme
+- Yalnızca devre arasındaki aday maçlar için ilk yarı istatistikleri (/fixtures/statistics)
+  ve olayları (/fixtures/events) sınırlı bir iş parçacığı havuzunda eşzamanlı çekilir
+- Maç başına önbellek: aynı maç için uç nokta bir kez sorgulanır (hata olursa sonra yeniden)
+- Kesin süre sınırı: yetişmeyen veri beklenmez, bildirim ek veri olmadan gider
+  (geç gelen yanıt önbelleğe yazılır)
+- Özellikler ht_ önekiyle özellik kümesine eklenir; kurallar bunları da kullanabilir
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from metrics import metrics
+
+ENRICH_DEADLINE = float(os.environ.get("HT_ENRICH_DEADLINE", "3"))  # Saniye; 0: zenginleştirme kapalı
+ENRICH_WORKERS = int(os.environ.get("HT_ENRICH_WORKERS", "4"))
+
+HT_FEATURES = ('ht_shots_home', 'ht_shots_away', 'ht_shots_total',
+               'ht_shots_on_target_home', 'ht_shots_on_target_away', 'ht_shots_on_target_total',
+               'ht_possession_home', 'ht_possession_away',
+               'ht_yellow_cards', 'ht_red_cards')
+
+# API'deki istatistik türü -> özellik adı kökü
+STATISTICS = {'Total Shots': 'ht_shots', 'Shots on Goal': 'ht_shots_on_target', 'Ball Possession': 'ht_possession'}
+
+
+def _stat_value(value):
+    """'55%' / 3 / None -> sayı"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.rstrip('%')
+        return int(value) if value.isdigit() else None
+    return value
+
+
+def parse_statistics(data, home_id):
+    """/fixtures/statistics yanıtı -> şut, isabetli şut ve topla oynama özellikleri"""
+    features = {}
+    for entry in data.get('response', []):
+        side = 'home' if entry['team']['id'] == home_id else 'away'
+        for stat in entry.get('statistics', []):
+            name = STATISTICS.get(stat.get('type'))
+            if name is not None:
+                features[f"{name}_{side}"] = _stat_value(stat.get('value'))
+    for name in ('ht_shots', 'ht_shots_on_target'):
+        home, away = features.get(f"{name}_home"), features.get(f"{name}_away")
+        if home is not None and away is not None:
+            features[f"{name}_total"] = home + away
+    return features
+
+
+def parse_events(data):
+    """/fixtures/events yanıtı -> ilk yarı kart sayıları"""
+    yellow = red = 0
+    for event in data.get('response', []):
+        if event.get('type') != 'Card' or (event['time'].get('elapsed') or 0) > 45:
+            continue
+        if event.get('detail') == 'Yellow Card':
+            yellow += 1
+        else:
+            red += 1
+    return {'ht_yellow_cards': yellow, 'ht_red_cards': red}
+
+
+def _fetch_statistics(api, fixture):
+    return parse_statistics(api.get(f"/fixtures/statistics?fixture={fixture.id}"), fixture.home_id)
+
+
+def _fetch_events(api, fixture):
+    return parse_events(api.get(f"/fixtures/events?fixture={fixture.id}"))
+
+
+PARTS = (('statistics', _fetch_statistics), ('events', _fetch_events))
+
+
+class HalftimeEnricher:
+    """Aday maçların ilk yarı verisi: (fixture_id, uç nokta) -> Future önbelleği"""
+
+    def __init__(self, api, workers=ENRICH_WORKERS, deadline=ENRICH_DEADLINE):
+        self.api = api
+        self.deadline = deadline
+        self.workers = workers
+        self.pool = None
+        self.futures = {}
+
+    @property
+    def enabled(self):
+        return self.deadline > 0 and self.workers > 0
+
+    def enrich(self, fixtures):
+        """Maçların verisini eşzamanlı çek, süre sınırına kadar bekle: fixture_id -> ht_ özellikleri"""
+        if not fixtures or not self.enabled:
+            return {}
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ht-enrich")
+        wanted = {}
+        for fixture in fixtures:
+            for part, fetch in PARTS:
+                key = (fixture.id, part)
+                future = self.futures.get(key)
+                if future is None or (future.done() and future.exception() is not None):
+                    future = self.futures[key] = self.pool.submit(fetch, self.api, fixture)
+                wanted[key] = future
+        with metrics.timer('phase', phase='enrichment'):
+            wait(wanted.values(), timeout=self.deadline)
+
+        enriched = {}
+        for (fixture_id, part), future in wanted.items():
+            if not future.done():
+                metrics.inc('enrichment', part=part, result='timeout')
+            elif future.exception() is not None:
+                print(f"  Devre arası verisi alınamadı ({part}, {fixture_id}): {future.exception()}")
+                metrics.inc('enrichment', part=part, result='error')
+            else:
+                metrics.inc('enrichment', part=part, result='ok')
+                enriched.setdefault(fixture_id, {}).update(future.result())
+        return enriched
+
+    def retain(self, fixture_ids):
+        """Canlı yanıttan düşen maçların önbelleğini bırak"""
+        for key in [key for key in self.futures if key[0] not in fixture_ids]:
+            del self.futures[key]
+
+    def clear(self):
+        self.futures.clear()
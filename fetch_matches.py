@@ -1,90 +1,139 @@
-import http.client
+#!/usr/bin/env python3
+"""
+Biten maçları API-Football'dan maç deposuna aktarır
+- Her lig/sezon için yalnızca depodaki son tarihten sonraki maçlar çekilir (from/to)
+- Ligler (leagues.json) kota sınırı içinde paralel çekilir, birden çok sezon desteklenir
+- Her lig tamamlandıkça satırlar depoya yazılır
+- İlerleme kontrol noktası dosyasına yazılır; yarıda kalan çalıştırma kaldığı yerden devam eder
+
+Kullanım:
+  python3 fetch_matches.py                         # 2025 sezonu, artımlı
+  python3 fetch_matches.py --seasons 2023 2024 2025
+  python3 fetch_matches.py --full --leagues 39 140
+"""
+
+import argparse
 import json
-import csv
-from datetime import datetime
-
-conn = http.client.HTTPSConnection("v3.football.api-sports.io")
-headers = {'x-apisports-key': "fe2cf4696f3c278253a3bb3be01d5ec2"}
-
-leagues = {
-    "Belgian Cup": 147,
-    "Belgian Super Cup": 519,
-    "Bundesliga": 78,
-    "Community Shield": 528,
-    "Copa del Rey": 143,
-    "Coppa Italia": 137,
-    "DFB Pokal": 81,
-    "DFL Super Cup": 529,
-    "Eredivisie": 88,
-    "FA Cup": 45,
-    "KNVB Cup": 90,
-    "La Liga": 140,
-    "League Cup": 48,
-    "Primeira Liga": 94,
-    "Ligue 1": 61,
-    "Portuguese League Cup": 97,
-    "Portuguese Super Cup": 550,
-    "Premier League": 39,
-    "Pro League": 144,
-    "Super Lig": 203,
-    "Supercopa de Espana": 556,
-    "Supercoppa Italiana": 547,
-    "Taca de Portugal": 96,
-    "Trophee des Champions": 526,
-    "Turkish Cup": 206,
-    "Turkish Super Cup": 551,
-    "UEFA Champions League": 2,
-    "UEFA Europa Conference League": 848,
-    "UEFA Europa League": 3,
-    "UEFA Super Cup": 531,
-}
-
-all_matches = []
-
-print("Maçlar çekiliyor...")
-for league_name, league_id in leagues.items():
-    print(f"  {league_name}...", end=" ", flush=True)
-    
-    conn.request("GET", f"/fixtures?league={league_id}&season=2025&status=FT", headers=headers)
-    res = conn.getresponse()
-    data = json.loads(res.read().decode("utf-8"))
-    
-    matches = data.get('response', [])
-    print(f"{len(matches)} maç")
-    
-    for m in matches:
-        fixture = m['fixture']
-        league = m['league']
-        teams = m['teams']
-        goals = m['goals']
-        score = m['score']
-        
-        all_matches.append({
-            'fixture_id': fixture['id'],
-            'date': fixture['date'][:10],
-            'time': fixture['date'][11:16],
-            'league_id': league['id'],
-            'league_name': league['name'],
-            'country': league['country'],
-            'round': league.get('round', ''),
-            'home_team_id': teams['home']['id'],
-            'home_team': teams['home']['name'],
-            'away_team_id': teams['away']['id'],
-            'away_team': teams['away']['name'],
-            'home_goals': goals['home'],
-            'away_goals': goals['away'],
-            'ht_home': score['halftime']['home'],
-            'ht_away': score['halftime']['away'],
-            'ft_home': score['fulltime']['home'],
-            'ft_away': score['fulltime']['away'],
-        })
-
-# CSV'ye yaz
-csv_file = 'matches_2025.csv'
-with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-    if all_matches:
-        writer = csv.DictWriter(f, fieldnames=all_matches[0].keys())
-        writer.writeheader()
-        writer.writerows(all_matches)
-
-print(f"\n✓ Toplam {len(all_matches)} maç '{csv_file}' dosyasına kaydedildi.")
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+
+from api_client import ApiFootballClient
+from fixture_model import parse_fixtures
+from league_registry import load_leagues
+from match_store import MatchStore, DB_FILE
+from response_cache import ResponseCache
+
+CHECKPOINT_FILE = "ingest_checkpoint.json"
+SEASON = 2025
+MIN_QUOTA = 100  # Günlük kota bu değerin altına inerse yeni lig başlatılmaz
+
+api = ApiFootballClient(os.environ.get("API_FOOTBALL_KEY", ""), cache=ResponseCache())
+
+
+def season_range(season):
+    """Sezonun tarih aralığı (Temmuz - Haziran)"""
+    return f"{season}-07-01", f"{season + 1}-06-30"
+
+
+def build_endpoint(store, league_id, season, full):
+    """Lig/sezon için sorgu: depoda veri varsa son tarihten bugüne"""
+    endpoint = f"/fixtures?league={league_id}&season={season}&status=FT"
+    if full:
+        return endpoint
+    start, end = season_range(season)
+    latest = store.latest_date(league_id, start, end)
+    if latest is None:
+        return endpoint
+    today = date.today().isoformat()
+    return f"{endpoint}&from={latest}&to={min(today, end)}"
+
+
+def fetch(endpoint):
+    if api.requests_remaining is not None and api.requests_remaining < MIN_QUOTA:
+        raise RuntimeError(f"kota azaldı ({api.quota_summary()}), sonraki çalıştırmaya kaldı")
+    # Dakikalık sınır dolmak üzereyse bir sonraki dakikayı bekle
+    if api.minute_remaining is not None and api.minute_remaining < 2:
+        time.sleep(60)
+    return parse_fixtures(api.get(endpoint))
+
+
+def load_checkpoint(path, run_key):
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('run') != run_key:
+        return set()
+    return set(data.get('done', []))
+
+
+def save_checkpoint(path, run_key, done):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'run': run_key, 'done': sorted(done)}, f)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Biten maçları depoya aktar")
+    parser.add_argument('--seasons', nargs='*', type=int, default=[SEASON])
+    parser.add_argument('--leagues', nargs='*', type=int, help="Lig id'leri (varsayılan: tümü)")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--full', action='store_true', help="Son tarihe bakmadan tüm sezonu çek")
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE)
+    args = parser.parse_args()
+
+    names = {lid: league.name for lid, league in load_leagues().items()}
+    league_ids = args.leagues or list(names)
+    run_key = f"{'-'.join(map(str, args.seasons))}:{'-'.join(map(str, league_ids))}:{int(args.full)}"
+    done = load_checkpoint(args.checkpoint, run_key)
+    if done:
+        print(f"Kontrol noktasından devam: {len(done)} lig/sezon zaten tamam")
+
+    store = MatchStore(DB_FILE)
+    jobs = [(lid, season) for season in args.seasons for lid in league_ids if f"{lid}:{season}" not in done]
+    added = 0
+
+    print("Maçlar çekiliyor...")
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(fetch, build_endpoint(store, league_id, season, args.full)): (league_id, season)
+                       for league_id, season in jobs}
+
+            for future in as_completed(futures):
+                league_id, season = futures[future]
+                label = f"{names.get(league_id, league_id)} {season}"
+                try:
+                    matches = future.result()
+                except Exception as e:
+                    print(f"  ✗ {label}: {e}")
+                    continue
+                new = 0
+                for m in matches:
+                    if m.ht_home is None or store.has(m.id):
+                        continue
+                    store.add(m.row())
+                    new += 1
+                store.flush()
+                added += new
+                done.add(f"{league_id}:{season}")
+                save_checkpoint(args.checkpoint, run_key, done)
+                print(f"  {label}: {len(matches)} maç, {new} yeni")
+    finally:
+        if added:
+            # Eski tarihli maçlar da eklenmiş olabilir: özellik sütunlarını ve takım istatistiklerini
+            # kronolojik sırayla yeniden hesapla. Yarıda kesilse de yapılır: çalışan bot yeni maçları
+            # takım istatistiklerinden (sync_stats) alır
+            store.backfill_features()
+    if len(done) == len(args.seasons) * len(league_ids) and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    print(f"\n✓ {added} yeni maç '{DB_FILE}' deposuna kaydedildi (toplam {store.count()}).")
+    print(f"  Kalan API kotası: {api.quota_summary()}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Günlük fikstür yükleyici
+- Önce tek bir tarih sorgusu (/fixtures?date=...) ile tüm ligleri çeker
+- Başarısız olursa ligleri sınırlı bir iş parçacığı havuzunda paralel sorgular
+- Her lig için sonuç/hata döndürür; bir ligin hatası günü kaybettirmez
+- Tarih sorgusunun süresi bir kez raporlanır (lig başına süre yalnızca paralel sorgularda)
+- Yanıtlar kompakt Fixture kayıtlarına dönüştürülür
+"""
+
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from fixture_model import parse_fixtures
+
+LeagueLoadResult = namedtuple('LeagueLoadResult', ['league_id', 'count', 'seconds', 'error'])
+
+
+def _fetch_date(api, date, timezone):
+    started = time.monotonic()
+    data = api.get(f"/fixtures?date={date}&timezone={timezone}")
+    return parse_fixtures(data), time.monotonic() - started
+
+
+def _fetch_league(api, league_id, season, date, timezone):
+    started = time.monotonic()
+    try:
+        data = api.get(f"/fixtures?league={league_id}&season={season}&date={date}&timezone={timezone}")
+        fixtures = parse_fixtures(data)
+        return fixtures, LeagueLoadResult(league_id, len(fixtures), time.monotonic() - started, None)
+    except Exception as e:
+        return [], LeagueLoadResult(league_id, 0, time.monotonic() - started, str(e))
+
+
+def load_fixtures(api, league_ids, date, timezone, season, workers=8, use_date_query=True):
+    """Verilen tarihteki maçları çek: (fikstürler, lig sonuçları, toplam süre sn)
+
+    Tarih sorgusu başarılıysa ligler ayrı sorgulanmaz: lig sonuçlarında süre None olur.
+    """
+    started = time.monotonic()
+    league_ids = list(league_ids)
+    wanted = set(league_ids)
+
+    if use_date_query:
+        try:
+            fixtures, seconds = _fetch_date(api, date, timezone)
+            fixtures = [f for f in fixtures if f.league_id in wanted]
+            counts = dict.fromkeys(league_ids, 0)
+            for f in fixtures:
+                counts[f.league_id] += 1
+            return fixtures, [LeagueLoadResult(lid, counts[lid], None, None) for lid in league_ids], seconds
+        except Exception as e:
+            print(f"  Tarih sorgusu başarısız ({e}), ligler tek tek çekiliyor...")
+
+    all_fixtures = []
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(league_ids)))) as pool:
+        for fixtures, result in pool.map(lambda lid: _fetch_league(api, lid, season, date, timezone), league_ids):
+            all_fixtures.extend(fixtures)
+            results.append(result)
+    return all_fixtures, results, time.monotonic() - started
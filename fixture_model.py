@@ -0,0 +1,103 @@
+"""
+Kompakt fikstür kaydı
+- API-Football yanıtı çözülür çözülmez bu kayda dönüştürülür; iç içe sözlükler tutulmaz
+- Yalnızca botun kullandığı alanlar, __slots__ ile (örnek başına __dict__ yok)
+- Takım/lig id'leri ve adları, durum kodları paylaşılır (intern): aynı takım tüm kayıtlarda tek nesne
+"""
+
+import sys
+
+_ids = {}  # id -> paylaşılan int nesnesi
+
+
+def _intern_id(value):
+    if value is None:
+        return None
+    value = int(value)
+    return _ids.setdefault(value, value)
+
+
+def _intern_str(value):
+    return sys.intern(value) if value else value
+
+
+class Fixture:
+    """API-Football /fixtures yanıtındaki bir maç"""
+    __slots__ = ('id', 'date', 'status', 'elapsed',
+                 'league_id', 'league_name', 'country', 'round',
+                 'home_id', 'home_name', 'away_id', 'away_name',
+                 'home_goals', 'away_goals', 'ht_home', 'ht_away', 'ft_home', 'ft_away')
+
+    @classmethod
+    def from_api(cls, m):
+        """API maçını kompakt kayda dönüştür"""
+        f = cls()
+        fixture = m['fixture']
+        status = fixture['status']
+        league = m['league']
+        teams = m['teams']
+        goals = m['goals']
+        score = m['score']
+        f.id = fixture['id']
+        f.date = fixture['date']
+        f.status = sys.intern(status['short'])
+        f.elapsed = status['elapsed']
+        f.league_id = _intern_id(league['id'])
+        f.league_name = _intern_str(league['name'])
+        f.country = _intern_str(league.get('country'))
+        f.round = _intern_str(league.get('round', ''))
+        f.home_id = _intern_id(teams['home']['id'])
+        f.home_name = _intern_str(teams['home']['name'])
+        f.away_id = _intern_id(teams['away']['id'])
+        f.away_name = _intern_str(teams['away']['name'])
+        f.home_goals = goals['home']
+        f.away_goals = goals['away']
+        f.ht_home = score['halftime']['home']
+        f.ht_away = score['halftime']['away']
+        f.ft_home = score['fulltime']['home']
+        f.ft_away = score['fulltime']['away']
+        return f
+
+    def record(self):
+        """Günlüğe yazılacak kompakt liste (alan sırasıyla)"""
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_record(cls, values):
+        """record() listesinden kaydı geri kur (id ve adlar yine paylaşılır)"""
+        f = cls()
+        for name, value in zip(cls.__slots__, values):
+            setattr(f, name, value)
+        f.status = sys.intern(f.status)
+        for name in ('league_id', 'home_id', 'away_id'):
+            setattr(f, name, _intern_id(getattr(f, name)))
+        for name in ('league_name', 'country', 'round', 'home_name', 'away_name'):
+            setattr(f, name, _intern_str(getattr(f, name)))
+        return f
+
+    def row(self):
+        """Maç deposu satırı (türetilmiş özellik sütunları hariç)"""
+        return {
+            'fixture_id': self.id,
+            'date': self.date[:10],
+            'time': self.date[11:16],
+            'league_id': self.league_id,
+            'league_name': self.league_name,
+            'country': self.country,
+            'round': self.round,
+            'home_team_id': self.home_id,
+            'home_team': self.home_name,
+            'away_team_id': self.away_id,
+            'away_team': self.away_name,
+            'home_goals': self.home_goals,
+            'away_goals': self.away_goals,
+            'ht_home': self.ht_home,
+            'ht_away': self.ht_away,
+            'ft_home': self.ft_home,
+            'ft_away': self.ft_away,
+        }
+
+
+def parse_fixtures(data):
+    """API yanıtındaki maçları kompakt kayıtlara dönüştür"""
+    return [Fixture.from_api(m) for m in data.get('response', [])]
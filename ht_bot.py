@@ -2,446 +2,574 @@
 """
 HT 0-0 Taktigi Telegram Bot
 - Günlük fikstürü çeker ve maç saatlerine göre çalışır
-- HT 0-0 biten ve kriterlere uyan maçlar için bildirim gönderir
-- Biten maçları CSV'ye kaydeder
+- HT 0-0 ve strateji kurallarına (rules.json) uyan maçlar için bildirim gönderir
+- Devre arasındaki adaylar için ilk yarı istatistikleri eşzamanlı, süre sınırıyla eklenir
+- Biten maçları SQLite deposuna kaydeder
+- LIVE_SHARDS > 1 ise ligler parçalara bölünür, her parça ayrı süreçte sorgulanır
+- Durum günlüğü (state_journal.jsonl) sayesinde yeniden başlatma API çağrısı ve tekrar bildirim gerektirmez
+- /team, /today, /league komutlarını bellekteki veriden yanıtlar (getUpdates, arka planda)
 """
 
-import http.client
-import json
-import csv
-import time
+import html
+import multiprocessing
 import os
+import sqlite3
+import threading
 from datetime import datetime, timedelta, timezone
-from collections import defaultdict
+import clock
+from api_client import ApiFootballClient, ApiError
+from response_cache import ResponseCache
+from fixture_loader import load_fixtures
+from telegram_outbox import TelegramOutbox, OUTBOX_FILE
+from scheduler import PollScheduler, HT_POLL_INTERVAL, FT_POLL_INTERVAL
+from match_store import MatchStore, DB_FILE
+from team_stats import feature_row
+from metrics import metrics
+from subscriptions import load_subscriptions
+from rules import load_rules
+from live_state import FixtureTracker, FINAL_STATUSES
+from fixture_model import Fixture, parse_fixtures
+from league_registry import load_leagues
+from shards import QuotaBudget, split_leagues
+from prematch import PrematchCache, Prepared
+from enrichment import HalftimeEnricher, HT_FEATURES
+from state_journal import StateJournal, JOURNAL_FILE
+from commands import CommandHandler, CommandPoller, COMMANDS_ENABLED
 
 # Istanbul timezone (UTC+3)
 TZ_OFFSET = timezone(timedelta(hours=3))
 
 def now_istanbul():
-    """Istanbul saatini döndür"""
-    return datetime.now(TZ_OFFSET)
+    """Istanbul saatini döndür (replay testlerinde sanal saat)"""
+    return clock.now(TZ_OFFSET)
 
 # ==================== AYARLAR ====================
 API_KEY = os.environ.get("API_FOOTBALL_KEY", "")
 TELEGRAM_TOKEN = os.environ.get("TELEGRAM_TOKEN", "")
 TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID", "")
-CSV_FILE = "matches_2025.csv"
-CHECK_INTERVAL = 300  # 5 dakika (saniye)
+CSV_FILE = "matches_2025.csv"  # İlk çalıştırmada depoya aktarılır
+CHECK_INTERVAL = 300  # Fikstür çekilemezse tekrar deneme aralığı (saniye)
+SEASON = 2025
+FIXTURE_WORKERS = 8  # Lig bazlı fikstür çekiminde paralel istek sayısı
 TIMEZONE = "Europe/Istanbul"
+DROPPED_BATCH = 20  # /fixtures?ids= sorgusunda en fazla maç (API sınırı)
+LIVE_STATUSES = {'1H', 'HT', '2H', 'ET', 'BT', 'P', 'SUSP', 'INT', 'LIVE'}
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))  # 0: /metrics kapalı
+METRICS_LOG_INTERVAL = 900  # Log özeti aralığı (saniye)
 
-# İzlenecek ligler
-LEAGUES = {
-    147: "Belgian Cup",
-    519: "Belgian Super Cup",
-    78: "Bundesliga",
-    528: "Community Shield",
-    143: "Copa del Rey",
-    137: "Coppa Italia",
-    81: "DFB Pokal",
-    529: "DFL Super Cup",
-    88: "Eredivisie",
-    45: "FA Cup",
-    90: "KNVB Cup",
-    140: "La Liga",
-    48: "League Cup",
-    94: "Primeira Liga",
-    61: "Ligue 1",
-    97: "Portuguese League Cup",
-    550: "Portuguese Super Cup",
-    39: "Premier League",
-    144: "Pro League",
-    203: "Süper Lig",
-    556: "Supercopa de España",
-    547: "Supercoppa Italiana",
-    96: "Taça de Portugal",
-    526: "Trophée des Champions",
-    206: "Turkish Cup",
-    551: "Turkish Super Cup",
-    2: "UEFA Champions League",
-    848: "UEFA Europa Conference League",
-    3: "UEFA Europa League",
-    531: "UEFA Super Cup",
-}
-
-# Bildirim gönderilmiş maçları takip et (aynı maç için tekrar bildirim gönderme)
+LIVE_SHARDS = int(os.environ.get("LIVE_SHARDS", "1"))  # >1: ligler ayrı süreçlerde sorgulanır
+
+# İzlenecek ligler (leagues.json)
+LEAGUE_REGISTRY = load_leagues()
+LEAGUES = {lid: league.name for lid, league in LEAGUE_REGISTRY.items()}
+
+# Parça modunda bu sürecin ligleri (None: tüm ligler) ve parça sırası
+shard_leagues = None
+shard_index = 0
+
+# Abonelikler (sohbet başına ligler, eşik ve mesaj formatı)
+subscriptions = load_subscriptions(TELEGRAM_CHAT_ID, LEAGUES)
+
+# Strateji kuralları (açılışta bir kez derlenir)
+rules = load_rules()
+subscriptions.check_rules(rules.names())
+
+# İlk yarı verisi (ht_ özellikleri) kullanan kurallar: kararları maç öncesi hazırlanamaz
+enriched_rules = {rule.name for rule in rules.rules if rule.features & set(HT_FEATURES)}
+
+# Bildirim gönderilmiş (sohbet, kural, maç) üçlüleri (aynı maç için tekrar bildirim gönderme)
 notified_fixtures = set()
 
+# Bildirimler, günün fikstürü, kaydırılan pencereler ve bekleyen sonuçlar (sıcak yeniden başlatma için)
+journal = StateJournal()
+
+# Tur ve giden kutusunun gönderim sonucu aynı durumu (bildirimler, maç izleyici, günlük) değiştirir
+state_lock = threading.Lock()
+
+# Önceki turun maç görüntüleri: yalnızca değişen maçlar yeniden değerlendirilir
+fixture_tracker = FixtureTracker(track_elapsed=rules.uses_minute())
+
+# Maç öncesi hazırlanmış özellikler, kararlar ve mesaj iskeletleri (fixture_id -> Prepared)
+prematch = PrematchCache(lambda fixture, stats: prepare_fixture(fixture, stats))
+
+# Günün fikstür listesi (parça modunda ilk parçada tüm ligler): /today ve /team için
+todays_fixtures = []
+
+# Telegram komutları: yanıtlar bellekteki veriden, LRU önbellekli (yeni maç kaydedilince temizlenir)
+commands = CommandHandler(LEAGUE_REGISTRY, lambda: todays_fixtures,
+                          lambda fixture_id: fixture_tracker.snapshot(fixture_id),
+                          lambda: now_istanbul().strftime("%Y-%m-%d"))
+
 # ==================== API FONKSİYONLARI ====================
 
+api = ApiFootballClient(API_KEY, pool_size=FIXTURE_WORKERS, cache=ResponseCache())
+
+# Devre arası adayları için /fixtures/statistics ve /fixtures/events (sınırlı havuz, süre sınırı)
+enricher = HalftimeEnricher(api)
+
 def api_request(endpoint):
     """API-Football'a istek gönder"""
-    conn = http.client.HTTPSConnection("v3.football.api-sports.io")
-    headers = {'x-apisports-key': API_KEY}
-    conn.request("GET", endpoint, headers=headers)
-    res = conn.getresponse()
-    data = json.loads(res.read().decode("utf-8"))
-    conn.close()
-    return data
-
-def send_telegram(message, max_retries=3):
-    """Telegram bildirimi gönder (retry mekanizmalı)"""
-    for attempt in range(max_retries):
-        try:
-            conn = http.client.HTTPSConnection("api.telegram.org", timeout=30)
-            params = json.dumps({
-                "chat_id": TELEGRAM_CHAT_ID,
-                "text": message,
-                "parse_mode": "HTML"
-            })
-            headers = {'Content-Type': 'application/json'}
-            conn.request("POST", f"/bot{TELEGRAM_TOKEN}/sendMessage", params, headers)
-            res = conn.getresponse()
-            conn.close()
-            if res.status == 200:
-                return True
-            print(f"Telegram HTTP hatası: {res.status} (deneme {attempt + 1}/{max_retries})")
-        except Exception as e:
-            print(f"Telegram hatası: {e} (deneme {attempt + 1}/{max_retries})")
-        if attempt < max_retries - 1:
-            time.sleep(5)  # 5 saniye bekle ve tekrar dene
-    return False
+    return api.get(endpoint)
+
+outbox = TelegramOutbox(TELEGRAM_TOKEN)
+
+def send_telegram(message, chat_id=None, meta=None):
+    """Telegram bildirimini giden kutusuna ekle (gönderim arka planda yapılır)"""
+    outbox.enqueue(chat_id or TELEGRAM_CHAT_ID, message, meta)
+
+def polled_league_ids():
+    """Bu sürecin sorguladığı ligler (abonelerin ligleri, parça modunda parçanınkiler)"""
+    league_ids = subscriptions.league_ids()
+    if shard_leagues is None:
+        return league_ids
+    return [lid for lid in league_ids if lid in shard_leagues]
+
+def broadcast(message):
+    """Mesajı tüm abonelere gönder"""
+    for sub in subscriptions.subscriptions:
+        send_telegram(message, sub.chat_id)
 
 # ==================== VERİ FONKSİYONLARI ====================
 
-def load_historical_data():
-    """CSV'den geçmiş maç verilerini yükle"""
-    team_goals = defaultdict(list)
-    team_goals_home = defaultdict(list)
-    team_goals_away = defaultdict(list)
-    existing_fixture_ids = set()
-    
-    if not os.path.exists(CSV_FILE):
-        return team_goals, team_goals_home, team_goals_away, existing_fixture_ids
-    
-    with open(CSV_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-    
-    # Tarihe göre sırala
-    rows.sort(key=lambda x: (x['date'], x['time']))
-    
-    for row in rows:
-        fixture_id = row['fixture_id']
-        existing_fixture_ids.add(fixture_id)
-        
-        home_team = row['home_team_id']
-        away_team = row['away_team_id']
-        home_goals = int(row['home_goals'])
-        away_goals = int(row['away_goals'])
-        
-        team_goals[home_team].append(home_goals)
-        team_goals[away_team].append(away_goals)
-        team_goals_home[home_team].append(home_goals)
-        team_goals_away[away_team].append(away_goals)
-    
-    return team_goals, team_goals_home, team_goals_away, existing_fixture_ids
+def load_historical_data(store):
+    """Takım istatistik indeksini depodan yükle (ilk çalıştırmada CSV'den içe aktar)"""
+    if store.count() == 0 and os.path.exists(CSV_FILE):
+        imported = store.import_csv(CSV_FILE)
+        print(f"  ✓ {CSV_FILE} içe aktarıldı: {imported} maç")
+    return store.load_stats()
 
-def calculate_features(home_team_id, away_team_id, team_goals, team_goals_home, team_goals_away):
+def calculate_features(home_team_id, away_team_id, stats):
     """Bir maç için özellikleri hesapla"""
-    home_team = str(home_team_id)
-    away_team = str(away_team_id)
-    
-    # avg_goal_home_team_home
-    home_home_goals = team_goals_home.get(home_team, [])
-    avg_goal_home_team_home = sum(home_home_goals) / len(home_home_goals) if home_home_goals else None
-    
-    # avg_goal_away_team_away
-    away_away_goals = team_goals_away.get(away_team, [])
-    avg_goal_away_team_away = sum(away_away_goals) / len(away_away_goals) if away_away_goals else None
-    
-    # avg_goal_combined_home_away
-    if avg_goal_home_team_home is not None and avg_goal_away_team_away is not None:
-        avg_goal_combined_home_away = avg_goal_home_team_home + avg_goal_away_team_away
-    else:
-        avg_goal_combined_home_away = None
-    
-    # home_team_no_goal_last5
-    home_last5 = team_goals.get(home_team, [])[-5:]
-    home_team_no_goal_last5 = 1 if len(home_last5) >= 5 and all(g == 0 for g in home_last5) else 0 if len(home_last5) >= 5 else None
-    
-    # away_team_no_goal_last5
-    away_last5 = team_goals.get(away_team, [])[-5:]
-    away_team_no_goal_last5 = 1 if len(away_last5) >= 5 and all(g == 0 for g in away_last5) else 0 if len(away_last5) >= 5 else None
-    
-    return {
-        'avg_goal_home_team_home': avg_goal_home_team_home,
-        'avg_goal_away_team_away': avg_goal_away_team_away,
-        'avg_goal_combined_home_away': avg_goal_combined_home_away,
-        'home_team_no_goal_last5': home_team_no_goal_last5,
-        'away_team_no_goal_last5': away_team_no_goal_last5
-    }
-
-def save_finished_match(match, team_goals, team_goals_home, team_goals_away, existing_fixture_ids):
-    """Biten maçı CSV'ye kaydet"""
-    fixture = match['fixture']
-    league = match['league']
-    teams = match['teams']
-    goals = match['goals']
-    score = match['score']
-    
-    fixture_id = str(fixture['id'])
-    
+    return stats.features(home_team_id, away_team_id)
+
+def save_finished_match(match, stats, store):
+    """Biten maçı depoya kaydet (yazma tick sonunda toplu yapılır)"""
     # Zaten var mı kontrol et
-    if fixture_id in existing_fixture_ids:
+    if store.has(match.id):
         return False
     
     # HT verisi boş mu kontrol et
-    ht_home = score['halftime']['home']
-    ht_away = score['halftime']['away']
-    if ht_home is None or ht_away is None:
+    if match.ht_home is None or match.ht_away is None:
         return False
     
-    home_team_id = str(teams['home']['id'])
-    away_team_id = str(teams['away']['id'])
-    home_goals_val = goals['home']
-    away_goals_val = goals['away']
-    
     # Özellikleri hesapla
-    features = calculate_features(home_team_id, away_team_id, team_goals, team_goals_home, team_goals_away)
+    features = calculate_features(match.home_id, match.away_id, stats)
     
     # Yeni satır oluştur
-    new_row = {
-        'fixture_id': fixture_id,
-        'date': fixture['date'][:10],
-        'time': fixture['date'][11:16],
-        'league_id': league['id'],
-        'league_name': league['name'],
-        'country': league['country'],
-        'round': league.get('round', ''),
-        'home_team_id': home_team_id,
-        'home_team': teams['home']['name'],
-        'away_team_id': away_team_id,
-        'away_team': teams['away']['name'],
-        'home_goals': home_goals_val,
-        'away_goals': away_goals_val,
-        'ht_home': ht_home,
-        'ht_away': ht_away,
-        'ft_home': score['fulltime']['home'],
-        'ft_away': score['fulltime']['away'],
-        'avg_goal_home_team': '',
-        'avg_goal_away_team': '',
-        'avg_goal_combined': '',
-        'avg_goal_home_team_home': round(features['avg_goal_home_team_home'], 2) if features['avg_goal_home_team_home'] else '',
-        'avg_goal_away_team_away': round(features['avg_goal_away_team_away'], 2) if features['avg_goal_away_team_away'] else '',
-        'avg_goal_combined_home_away': round(features['avg_goal_combined_home_away'], 2) if features['avg_goal_combined_home_away'] else '',
-        'home_team_no_goal_last5': features['home_team_no_goal_last5'] if features['home_team_no_goal_last5'] is not None else '',
-        'away_team_no_goal_last5': features['away_team_no_goal_last5'] if features['away_team_no_goal_last5'] is not None else ''
-    }
+    new_row = match.row()
+    new_row.update(feature_row(features))
     
-    # CSV'ye ekle
-    fieldnames = list(new_row.keys())
-    file_exists = os.path.exists(CSV_FILE)
+    # Depoya ekle
+    store.add(new_row)
     
-    with open(CSV_FILE, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        if not file_exists:
-            writer.writeheader()
-        writer.writerow(new_row)
+    # Geçmiş verileri güncelle; bu takımların bugünkü diğer maçlarının hazırlığı yenilenir
+    stats.add_match(match.home_id, match.away_id, match.home_goals, match.away_goals)
+    prematch.discard(match.id)
+    prematch.refresh_teams((match.home_id, match.away_id), stats)
+    commands.match_saved(match)
     
-    # Geçmiş verileri güncelle
-    existing_fixture_ids.add(fixture_id)
-    team_goals[home_team_id].append(home_goals_val)
-    team_goals[away_team_id].append(away_goals_val)
-    team_goals_home[home_team_id].append(home_goals_val)
-    team_goals_away[away_team_id].append(away_goals_val)
-    
-    print(f"  ✓ Kaydedildi: {teams['home']['name']} {home_goals_val}-{away_goals_val} {teams['away']['name']}")
+    print(f"  ✓ Kaydedildi: {match.home_name} {match.home_goals}-{match.away_goals} {match.away_name}")
     return True
 
+def sync_stats(store, stats):
+    """Depoya yazılan takım istatistiklerini belleğe al (diğer parçalar, çalışırken fetch_matches.py)"""
+    changed = store.sync_stats(stats)
+    if changed:
+        prematch.refresh_teams([int(team_id) for team_id in changed], stats)
+        commands.cache.invalidate()
+    return changed
+
 # ==================== ANA FONKSİYONLAR ====================
 
-def check_live_matches():
-    """Canlı maçları kontrol et"""
+def alert_skeleton(kind, rule, fixture, features, fmt="full"):
+    """Mesajın maç öncesi bilinen kısımları: (baş, son); canlı skor/dakika araya eklenir"""
+    # API'den gelen adlar HTML olarak kaçışlanır ('&', '<' mesajı Telegram'da geçersiz kılar)
+    home_team = html.escape(fixture.home_name)
+    away_team = html.escape(fixture.away_name)
+    league_name = html.escape(fixture.league_name)
+    title = html.escape(rule.title)
+    avg_combined = features['avg_goal_combined_home_away']
+    
+    if fmt == "compact":
+        label = {'no_data': f"⚠️ {title} (veri yok)", 'partial': f"⚠️ {title} (kısmi)",
+                 'full': f"🔔 {title}"}[kind]
+        stats_part = f" | avg {avg_combined:.2f}" if avg_combined is not None else ""
+        return f"{label} | <b>{home_team}</b> vs <b>{away_team}</b> | {league_name}{stats_part}", None
+    
+    header = {'no_data': f"⚠️ <b>{title} - Veri Yetersiz</b>",
+              'partial': f"⚠️ <b>{title} - Kısmi Veri</b>",
+              'full': f"🔔 <b>{title} Fırsat!</b>"}[kind]
+    head = f"""{header}
+
+⚽ <b>{home_team}</b> vs <b>{away_team}</b>
+🏆 {league_name} ({html.escape(fixture.country or '')})
+"""
+    if kind == 'no_data' or avg_combined is None:
+        return head, "\n⚠️ Yeterli geçmiş veri yok!"
+    tail = f"""
+📈 <b>İstatistikler:</b>
+• Avg Goal Combined: <b>{avg_combined:.2f}</b>"""
+    if kind == 'partial':
+        return head, tail + "\n⚠️ Son 5 maç verisi eksik!"
+    return head, tail + f"""
+• Home Avg (Home): {features['avg_goal_home_team_home']:.2f}
+• Away Avg (Away): {features['avg_goal_away_team_away']:.2f}"""
+
+def format_ht_stats(ht, compact=False):
+    """İlk yarı verisi satırı (veri yoksa None)"""
+    parts = []
+    if ht.get('ht_shots_home') is not None and ht.get('ht_shots_away') is not None:
+        shots = f"{ht['ht_shots_home']}-{ht['ht_shots_away']}"
+        if ht.get('ht_shots_on_target_total') is not None:
+            shots += f" ({ht['ht_shots_on_target_home']}-{ht['ht_shots_on_target_away']})"
+        parts.append(f"şut {shots}")
+    if not compact and ht.get('ht_possession_home') is not None and ht.get('ht_possession_away') is not None:
+        parts.append(f"topla oynama %{ht['ht_possession_home']}-%{ht['ht_possession_away']}")
+    if not compact and 'ht_yellow_cards' in ht:
+        parts.append(f"kart {ht['ht_yellow_cards']} sarı / {ht['ht_red_cards']} kırmızı")
+    return ", ".join(parts) or None
+
+def render_alert(skeleton, match, ht=None):
+    """Hazır iskelete canlı skor, dakika ve (varsa) ilk yarı verisini ekle"""
+    head, tail = skeleton
+    ht_line = format_ht_stats(ht, compact=tail is None) if ht else None
+    if tail is None:
+        return f"{head} | {ht_line}" if ht_line else head
+    message = (f"{head}📊 Skor: {match.home_goals}-{match.away_goals} (HT: {match.ht_home}-{match.ht_away})\n"
+               f"⏱️ Dakika: {match.elapsed or 0}'\n")
+    if ht_line:
+        message += f"🎯 İlk yarı: {ht_line}\n"
+    return message + tail
+
+def format_alert(kind, rule, match, features, fmt="full", ht=None):
+    """Bildirim mesajı (tam veya kısa format)"""
+    return render_alert(alert_skeleton(kind, rule, match, features, fmt), match, ht)
+
+def prepare_fixture(fixture, stats):
+    """Maç öncesi hazırlık: özellikler, her (kural, abone) kararı ve mesaj iskeletleri"""
+    features = calculate_features(fixture.home_id, fixture.away_id, stats)
+    verdicts = {}
+    skeletons = {}
+    for rule in rules.rules:
+        if rule.name in enriched_rules:
+            continue  # Karar devre arasında, ilk yarı verisiyle verilir
+        for sub in subscriptions.for_league(fixture.league_id):
+            if not sub.accepts(rule.name):
+                continue
+            kind, reason = verdicts[(rule.name, sub)] = rule.verdict(features, sub.params)
+            if kind is not None and (rule.name, kind, sub.format) not in skeletons:
+                skeletons[(rule.name, kind, sub.format)] = alert_skeleton(kind, rule, fixture, features, sub.format)
+    return Prepared(features, verdicts, skeletons)
+
+ALERT_LABELS = {'no_data': "⚠ BİLDİRİM (veri yok)", 'partial': "⚠ BİLDİRİM (kısmi veri)", 'full': "✓ BİLDİRİM"}
+
+def report_events(events, finished, home_team, away_team):
+    """Durum geçişlerini ve biten bildirim sonuçlarını yazdır/say"""
+    for event in events:
+        if event.kind == 'transition':
+            print(f"  ↪ {home_team} vs {away_team}: {event.old} → {event.new}")
+            metrics.inc('transitions', transition=f"{event.old}-{event.new}")
+        else:
+            metrics.inc('goals_seen')
+    if finished:
+        report_outcome(finished)
+
+def report_outcome(record):
+    """Bildirim sonrası sonuç özeti"""
+    journal.outcome(record['fixture_id'])
+    second_half = {True: "var", False: "yok", None: "bilinmiyor"}[record['second_half_goal']]
+    print(f"  📋 Sonuç: {record['home_team']} {record['final_score']} {record['away_team']} "
+          f"({', '.join(record['rules'])}) - 2. yarı golü: {second_half}")
+    metrics.inc('alert_outcomes', second_half_goal=second_half)
+
+def mark_notified(key):
+    """(sohbet, kural, maç) bildirildi: bellekte ve durum günlüğünde"""
+    notified_fixtures.add(key)
+    journal.notified(key, now_istanbul().strftime("%Y-%m-%d"))
+
+def alert_result(meta, sent, store):
+    """Giden kutusundan bildirimin kesin sonucu: gönderildiyse bildirildi sayılır ve sonucu izlenir,
+    atıldıysa (kalıcı Telegram hatası) sahiplik bırakılır, maç sonraki turda yeniden değerlendirilir"""
+    match = Fixture.from_record(meta['fixture'])
+    key = (meta['chat_id'], meta['rule'], match.id)
+    with state_lock:
+        if sent:
+            mark_notified(key)
+            fixture_tracker.record_alert(match, meta['rule'])
+            journal.alert(match, meta['rule'])
+            return
+        print(f"  ✗ Bildirim GÖNDERİLEMEDİ (sonra tekrar denenecek): {match.home_name} vs {match.away_name} "
+              f"[{meta['chat_id']}]")
+        metrics.inc('alerts_dropped', rule=meta['rule'])
+        notified_fixtures.discard(key)
+        journal.released(key)
+        store.release_notification(*key)
+        fixture_tracker.invalidate(match.id)
+
+def send_alerts(match, prepared, pending, ht, store):
+    """Bekleyen (kural, abone) çiftlerini karara bağla ve bildirimleri gönder"""
+    fixture_id = match.id
+    home_team = match.home_name
+    away_team = match.away_name
+    features = None
+    for rule, sub in pending:
+        if rule.name in enriched_rules:
+            # İlk yarı verisi gelmediyse kuralın missing davranışı geçerli
+            if features is None:
+                features = {**prepared.features, **(ht or {})}
+            kind, reason = rule.verdict(features, sub.params)
+        else:
+            kind, reason = prepared.verdicts[(rule.name, sub)]
+        if kind is None:
+            print(f"  ✗ {home_team} vs {away_team}: {rule.name} ({reason}) [{sub.chat_id}]")
+            metrics.inc('filtered', rule=rule.name, reason=reason)
+            continue
+        
+        # Ortak depoda sahiplen: başka bir parça/önceki çalıştırma göndermişse atla
+        if not store.claim_notification(sub.chat_id, rule.name, fixture_id):
+            mark_notified((sub.chat_id, rule.name, fixture_id))
+            metrics.inc('filtered', reason='already_notified')
+            continue
+        
+        key = (rule.name, kind, sub.format)
+        skeleton = prepared.skeletons.get(key)
+        if skeleton is None:
+            skeleton = prepared.skeletons[key] = alert_skeleton(kind, rule, match, prepared.features, sub.format)
+        message = render_alert(skeleton, match, ht)
+        # Bildirildi kaydı gönderim sonucuyla (alert_result) yapılır
+        send_telegram(message, sub.chat_id, {'chat_id': sub.chat_id, 'rule': rule.name, 'fixture': match.record()})
+        print(f"  {ALERT_LABELS[kind]}: {home_team} vs {away_team} ({rule.name}) [{sub.chat_id}]")
+        metrics.inc('alerts', rule=rule.name, kind=kind)
+
+def check_live_matches(stats, store):
+    """Canlı maçları kontrol et, çekilen canlı maçları döndür"""
     global notified_fixtures
     
     print(f"\n[{now_istanbul().strftime('%H:%M:%S')}] Canlı maçlar kontrol ediliyor...")
     
-    # Geçmiş verileri yükle
-    team_goals, team_goals_home, team_goals_away, existing_fixture_ids = load_historical_data()
-    
-    # Canlı maçları çek
-    league_ids = "-".join(str(lid) for lid in LEAGUES.keys())
-    data = api_request(f"/fixtures?live={league_ids}")
-    
-    live_matches = data.get('response', [])
-    print(f"  {len(live_matches)} canlı maç bulundu")
+    # Tüm abonelerin ligleri tek sorguda çekilir
+    league_ids = "-".join(str(lid) for lid in polled_league_ids())
+    live_matches = parse_fixtures(api_request(f"/fixtures?live={league_ids}"))
+    print(f"  {len(live_matches)} canlı maç bulundu (kalan kota: {api.quota_summary()})")
+    metrics.inc('fixtures_seen', len(live_matches))
     
+    seen = set()
+    live_changed = False
+    alerts = []  # (maç, hazırlık, bekleyen (kural, abone) çiftleri)
     for match in live_matches:
-        fixture = match['fixture']
-        fixture_id = fixture['id']
-        status = fixture['status']['short']
-        elapsed = fixture['status']['elapsed'] or 0
+        fixture_id = match.id
+        status = match.status
+        home_team = match.home_name
+        away_team = match.away_name
         
-        league = match['league']
-        teams = match['teams']
-        goals = match['goals']
-        score = match['score']
-        
-        home_team = teams['home']['name']
-        away_team = teams['away']['name']
+        # Önceki turla karşılaştır: değişmeyen maç yeniden değerlendirilmez
+        seen.add(fixture_id)
+        changed, events, finished = fixture_tracker.update(match)
+        report_events(events, finished, home_team, away_team)
+        if not changed:
+            metrics.inc('filtered', reason='unchanged')
+            continue
+        live_changed = True
         
         # Biten maçları kaydet
         if status == 'FT':
-            save_finished_match(match, team_goals, team_goals_home, team_goals_away, existing_fixture_ids)
+            save_finished_match(match, stats, store)
             continue
         
-        # Devre arası veya 2. yarıda mı kontrol et
-        if status not in ['HT', '2H', 'ET', 'BT', 'P']:
+        # Yalnızca maçın durumuna uyan kurallar (durum -> kural indeksi)
+        candidates = rules.for_status(status)
+        if not candidates:
+            metrics.inc('filtered', reason='status')
             continue
         
-        # HT 0-0 mi kontrol et
-        ht_home = score['halftime']['home']
-        ht_away = score['halftime']['away']
-        
-        if ht_home != 0 or ht_away != 0:
-            continue
-        
-        # Daha önce bildirim gönderilmiş mi
-        if fixture_id in notified_fixtures:
-            continue
-        
-        # Özellikleri hesapla
-        home_team_id = teams['home']['id']
-        away_team_id = teams['away']['id']
-        features = calculate_features(home_team_id, away_team_id, team_goals, team_goals_home, team_goals_away)
-        
-        avg_combined = features['avg_goal_combined_home_away']
-        home_no_goal = features['home_team_no_goal_last5']
-        away_no_goal = features['away_team_no_goal_last5']
-        
-        # Kriterleri kontrol et
-        current_score = f"{goals['home']}-{goals['away']}"
-        
-        # Veri yoksa uyarı ile bildirim gönder
-        if avg_combined is None:
-            message = f"""⚠️ <b>HT 0-0 - Veri Yetersiz</b>
-
-⚽ <b>{home_team}</b> vs <b>{away_team}</b>
-🏆 {league['name']} ({league['country']})
-📊 Skor: {current_score} (HT: 0-0)
-⏱️ Dakika: {elapsed}'
-
-⚠️ Yeterli geçmiş veri yok!"""
-            sent = send_telegram(message)
-            if sent:
-                print(f"  ⚠ BİLDİRİM (veri yok): {home_team} vs {away_team}")
-                notified_fixtures.add(fixture_id)
+        # Skor ve dakika koşulları kural başına bir kez
+        matched = []
+        for rule in candidates:
+            reason = rule.match(match)
+            if reason:
+                metrics.inc('filtered', rule=rule.name, reason=reason)
             else:
-                print(f"  ✗ Bildirim GÖNDERİLEMEDİ (sonra tekrar denenecek): {home_team} vs {away_team}")
-            continue
-        
-        if avg_combined <= 2.5:
-            print(f"  ✗ {home_team} vs {away_team}: avg_combined={avg_combined:.2f} (<=2.5)")
-            continue
-        
-        if home_no_goal == 1 or away_no_goal == 1:
-            print(f"  ✗ {home_team} vs {away_team}: Son 5 maçta gol yok")
+                metrics.inc('rule_hits', rule=rule.name)
+                matched.append(rule)
+        if not matched:
             continue
         
-        # Son 5 maç verisi yoksa uyarı ile bildirim
-        if home_no_goal is None or away_no_goal is None:
-            message = f"""⚠️ <b>HT 0-0 - Kısmi Veri</b>
-
-⚽ <b>{home_team}</b> vs <b>{away_team}</b>
-🏆 {league['name']} ({league['country']})
-📊 Skor: {current_score} (HT: 0-0)
-⏱️ Dakika: {elapsed}'
-
-📈 <b>İstatistikler:</b>
-• Avg Goal Combined: <b>{avg_combined:.2f}</b>
-⚠️ Son 5 maç verisi eksik!"""
-            sent = send_telegram(message)
-            if sent:
-                print(f"  ⚠ BİLDİRİM (kısmi veri): {home_team} vs {away_team}")
-                notified_fixtures.add(fixture_id)
-            else:
-                print(f"  ✗ Bildirim GÖNDERİLEMEDİ (sonra tekrar denenecek): {home_team} vs {away_team}")
+        # Bu maçı bu kural için henüz almamış aboneler (lig -> abonelik indeksi)
+        subs = subscriptions.for_league(match.league_id)
+        pending = [(rule, sub) for rule in matched for sub in subs
+                   if sub.accepts(rule.name) and (sub.chat_id, rule.name, fixture_id) not in notified_fixtures]
+        if not pending:
+            metrics.inc('filtered', reason='already_notified')
             continue
         
-        # TÜM KRİTERLER SAĞLANDI - Bildirim gönder!
-        message = f"""🔔 <b>HT 0-0 Fırsat!</b>
+        # Kararlar ve mesaj iskeletleri maç öncesi hazırlandı: burada yalnızca sözlük araması
+        prepared = prematch.get(fixture_id)
+        if prepared is None:
+            # Günlük listede olmayan maç (ör. önceki günden sarkan): şimdi hazırla
+            metrics.inc('prematch', result='miss')
+            with metrics.timer('phase', phase='features'):
+                prepared = prematch.add(match, stats)
+        else:
+            metrics.inc('prematch', result='hit')
+        alerts.append((match, prepared, pending))
+    
+    # Devre arasındaki adayların ilk yarı verisi tek seferde, eşzamanlı ve süre sınırıyla çekilir;
+    # yetişmeyen veri beklenmez, bildirim onsuz gider
+    ht_candidates = [match for match, prepared, pending in alerts
+                     if match.status == 'HT' and any(rule.name in enriched_rules or
+                                                     prepared.verdicts[(rule.name, sub)][0] is not None
+                                                     for rule, sub in pending)]
+    enriched = enricher.enrich(ht_candidates)
+    
+    for match, prepared, pending in alerts:
+        send_alerts(match, prepared, pending, enriched.get(match.id), store)
+    
+    # Canlı yanıttan düşen maçların son durumu id ile çekilir: bitenler kaydedilir, sonuç son skorla yazılır
+    live_changed |= check_dropped_matches(seen, stats, store)
+    
+    # Canlı yanıttan düşen maçlar bırakılır (bildirimli olanların sonucu yazılır)
+    for record in fixture_tracker.sweep(seen):
+        report_outcome(record)
+    enricher.retain(seen)
+    if live_changed:
+        commands.live_changed()
+    
+    return live_matches
 
-⚽ <b>{home_team}</b> vs <b>{away_team}</b>
-🏆 {league['name']} ({league['country']})
-📊 Skor: {current_score} (HT: 0-0)
-⏱️ Dakika: {elapsed}'
+def check_dropped_matches(seen, stats, store):
+    """Canlı yanıttan düşen maçlar (biten maçlar 'live' yanıtında görünmeyebilir) tek sorguda kontrol edilir
 
-📈 <b>İstatistikler:</b>
-• Avg Goal Combined: <b>{avg_combined:.2f}</b>
-• Home Avg (Home): {features['avg_goal_home_team_home']:.2f}
-• Away Avg (Away): {features['avg_goal_away_team_away']:.2f}"""
-        
-        sent = send_telegram(message)
-        if sent:
-            print(f"  ✓ BİLDİRİM: {home_team} vs {away_team}")
-            notified_fixtures.add(fixture_id)
-        else:
-            print(f"  ✗ Bildirim GÖNDERİLEMEDİ (sonra tekrar denenecek): {home_team} vs {away_team}")
+    Hâlâ canlı olanlar seen kümesine eklenir (bırakılmaz). Bir maç değiştiyse True döner.
+    """
+    dropped = [fixture_id for fixture_id, (snapshot, _) in fixture_tracker.states.items()
+               if fixture_id not in seen and snapshot.status not in FINAL_STATUSES]
+    changed_any = False
+    for i in range(0, len(dropped), DROPPED_BATCH):
+        ids = "-".join(str(fixture_id) for fixture_id in dropped[i:i + DROPPED_BATCH])
+        try:
+            matches = parse_fixtures(api_request(f"/fixtures?ids={ids}"))
+        except ApiError as e:
+            print(f"  ✗ Canlı yanıttan düşen maçlar çekilemedi: {e}")
+            return changed_any
+        for match in matches:
+            changed, events, finished = fixture_tracker.update(match)
+            report_events(events, finished, match.home_name, match.away_name)
+            changed_any |= changed
+            if match.status == 'FT':
+                save_finished_match(match, stats, store)
+            elif match.status not in FINAL_STATUSES and match.status in LIVE_STATUSES:
+                seen.add(match.id)
+    return changed_any
 
 def get_todays_fixtures():
-    """Bugünkü maçları çek ve çalışma saatlerini belirle"""
+    """Bugünkü maçları çek (hiçbir lig çekilemezse None)"""
     today = now_istanbul().strftime("%Y-%m-%d")
     
-    all_fixtures = []
-    
-    # Her lig için sonraki 10 maçı çek ve bugüne ait olanları filtrele
-    for league_id in LEAGUES.keys():
-        data = api_request(f"/fixtures?league={league_id}&season=2025&next=10&timezone={TIMEZONE}")
-        fixtures = data.get('response', [])
-        for f in fixtures:
-            # Sadece bugünkü maçları al
-            if f['fixture']['date'][:10] == today:
-                all_fixtures.append(f)
-    
-    if not all_fixtures:
-        return None, None, []
+    # Tek tarih sorgusu, olmazsa ligler paralel çekilir
+    all_fixtures, results, seconds = load_fixtures(api, subscriptions.league_ids(), today, TIMEZONE, SEASON,
+                                                   workers=FIXTURE_WORKERS)
     
-    # Maç saatlerini topla
-    match_times = []
-    for f in all_fixtures:
-        match_time = f['fixture']['date'][11:16]  # HH:MM
-        match_times.append(match_time)
+    failed = [r for r in results if r.error]
+    timed = [r for r in results if r.seconds is not None]
+    slowest = f", en yavaş lig {max(r.seconds for r in timed):.2f} sn" if timed else ""
+    print(f"  Fikstür yükleme: {len(results) - len(failed)}/{len(results)} lig, {seconds:.2f} sn{slowest}")
+    for r in failed:
+        print(f"  ✗ {LEAGUES.get(r.league_id, r.league_id)} fikstürü çekilemedi: {r.error}")
     
-    if not match_times:
-        return None, None, []
+    # Hiçbir lig çekilemediyse günü "maç yok" sayma, tekrar denensin
+    if failed and len(failed) == len(results):
+        return None
     
-    # İlk ve son maç saatini bul
-    match_times.sort()
-    first_match = match_times[0]
-    last_match = match_times[-1]
-    
-    # İlk maçtan 45 dk önce başla
-    first_hour, first_min = map(int, first_match.split(':'))
-    start_time = now_istanbul().replace(hour=first_hour, minute=first_min, second=0, microsecond=0)
-    start_time = start_time - timedelta(minutes=45)
-    
-    # Son maçtan 2 saat sonra bitir
-    last_hour, last_min = map(int, last_match.split(':'))
-    end_time = now_istanbul().replace(hour=last_hour, minute=last_min, second=0, microsecond=0)
-    end_time = end_time + timedelta(hours=2)
-    
-    return start_time, end_time, all_fixtures
+    return all_fixtures
 
-def is_within_schedule(start_time, end_time):
-    """Şu an çalışma saatleri içinde mi?"""
-    if start_time is None or end_time is None:
-        return False
-    now = now_istanbul()
-    return start_time <= now <= end_time
+def seconds_until_midnight(now):
+    """Ertesi günün başına kalan saniye"""
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
 
-def main():
-    """Ana döngü"""
-    print("=" * 50)
-    print("HT 0-0 TAKTİĞİ TELEGRAM BOTU (Akıllı Zamanlama)")
-    print("=" * 50)
-    print(f"Kontrol aralığı: {CHECK_INTERVAL // 60} dakika")
-    print(f"İzlenen lig sayısı: {len(LEAGUES)}")
-    print("=" * 50)
-    
-    last_fixture_check = None
-    start_time = None
-    end_time = None
-    fixtures = []
+def announce_day(fixtures, now):
+    """Günlük fikstür özetini tüm abonelere gönder"""
+    if not fixtures:
+        print("  ✗ Bugün maç yok, bot uyuyor...")
+        broadcast("😴 Bugün izlenen liglerde maç yok.")
+        return
+    day = PollScheduler(HT_POLL_INTERVAL, FT_POLL_INTERVAL, rules.minute_ranges())
+    day.add_fixtures(fixtures, now)
+    start_time, end_time = day.span()
+    print(f"  ✓ {len(fixtures)} maç bulundu")
+    if start_time is None:
+        return  # Bugünün tüm pencereleri geçmiş
+    print(f"  ⏰ Çalışma: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}")
+    broadcast(f"📅 <b>Günlük Fikstür</b>\n\n"
+              f"📊 {len(fixtures)} maç\n"
+              f"⏰ {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}")
+
+def restore_state(scheduler, stats, store, now):
+    """Durum günlüğünden sıcak başlangıç; günün fikstürü yüklüyse o gün döner (yoksa None)
+
+    Sonucu bekleyen bildirimler bildirim anındaki görüntüyle izlenmeye devam eder. Penceresi kalmamış
+    maçların son durumu tek sorguda çekilir: bitenlerin sonucu yazılır, canlı olanlar izlenir,
+    diğerleri (ertelenen maç, çekilemeyen yanıt) son bilinen skorla kapatılır.
+    """
+    global todays_fixtures
+    state, count, seconds = journal.load()
+    if state.date is None:
+        return None
+    fixtures = [Fixture.from_record(record) for record in state.fixtures.values()]
+    scheduler.add_fixtures(fixtures, now)
+    todays_fixtures = fixtures
+    for key, (start, end, interval) in state.windows.items():
+        scheduler.restore_window(key, datetime.fromisoformat(start), datetime.fromisoformat(end), interval, now)
+    notified_fixtures.update(state.notified)
+    for record, rule_names in state.alerts.values():
+        match = Fixture.from_record(record)
+        fixture_tracker.update(match)
+        for rule_name in rule_names:
+            fixture_tracker.record_alert(match, rule_name)
+    seen = {fixture_id for fixture_id, _ in scheduler.windows}
+    if any(fixture_id not in seen for fixture_id in fixture_tracker.states):
+        check_dropped_matches(seen, stats, store)
+        for record in fixture_tracker.sweep(seen):
+            report_outcome(record)
+    with metrics.timer('phase', phase='prematch_warmup'):
+        prematch.warm(fixtures, stats, state.date)
+    print(f"Durum günlüğünden yüklendi ({state.date}): {len(fixtures)} maç, {len(state.notified)} bildirim, "
+          f"{len(fixture_tracker.outcomes)} bekleyen sonuç ({count} kayıt, {seconds * 1000:.1f} ms)")
+    return state.date
+
+def run_bot():
+    """Bot döngüsü (parça modunda yalnızca parçanın ligleri)"""
+    global todays_fixtures
+    
+    # Geçmiş verileri bir kez yükle, sonrasında biten maçlarla güncellenir
+    if METRICS_PORT:
+        metrics.start_server(METRICS_PORT + shard_index)
+        print(f"Metrikler: http://0.0.0.0:{METRICS_PORT + shard_index}/metrics")
+    metrics.start_logging(METRICS_LOG_INTERVAL)
+    
+    store = MatchStore(DB_FILE)
+    with metrics.timer('phase', phase='history_load'):
+        stats = load_historical_data(store)
+    print(f"Geçmiş veri: {store.count()} maç, {len(stats.teams)} takım")
+    
+    # Komutlar ayrı iş parçacığında; getUpdates tek tüketici ister, parça modunda ilk parça yanıtlar
+    commands.attach(store, stats)
+    if COMMANDS_ENABLED and TELEGRAM_TOKEN and shard_index == 0:
+        CommandPoller(TELEGRAM_TOKEN, commands, send_telegram,
+                      [sub.chat_id for sub in subscriptions.subscriptions]).start()
+    
+    # Gün değişse de önceki günün (gece yarısını aşan) pencereleri korunur
+    scheduler = PollScheduler(HT_POLL_INTERVAL, FT_POLL_INTERVAL, rules.minute_ranges())
+    
+    # Yeniden başlatmada günün fikstürü, pencereler ve bildirimler günlükten
+    # (API çağrısı yalnızca penceresi kalmamış maçların bekleyen sonuçları için)
+    last_fixture_check = restore_state(scheduler, stats, store, now_istanbul())
+    
+    # Giden kutusu günlük yüklendikten sonra başlar: kuyrukta kalan bildirimlerin sonucu da günlüğe yazılır
+    outbox.on_result = lambda meta, sent: alert_result(meta, sent, store)
+    outbox.start()
+    if outbox.pending():
+        print(f"Gönderilmemiş {outbox.pending()} Telegram mesajı kuyrukta")
     
     while True:
         now = now_istanbul()
@@ -450,47 +578,118 @@ def main():
         # Günde 1 kez fikstür çek
         if last_fixture_check != today:
             print(f"\n[{now.strftime('%H:%M:%S')}] Günlük fikstür çekiliyor...")
-            start_time, end_time, fixtures = get_todays_fixtures()
+            fixtures = get_todays_fixtures()
+            if fixtures is None:
+                print(f"  ✗ Fikstür çekilemedi, {CHECK_INTERVAL // 60} dakika sonra tekrar denenecek")
+                clock.sleep(CHECK_INTERVAL)
+                continue
             last_fixture_check = today
+            todays_fixtures = fixtures
             
-            if fixtures:
-                print(f"  ✓ {len(fixtures)} maç bulundu")
-                print(f"  ⏰ Çalışma: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}")
-                send_telegram(f"📅 <b>Günlük Fikstür</b>\n\n"
-                            f"📊 {len(fixtures)} maç\n"
-                            f"⏰ {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}")
+            # Parça yalnızca kendi liglerinin pencerelerini kurar; özeti ilk parça gönderir
+            if shard_leagues is None:
+                own = fixtures
             else:
-                print("  ✗ Bugün maç yok, bot uyuyor...")
-                send_telegram("😴 Bugün izlenen liglerde maç yok.")
-                # Gece yarısına kadar uyu
-                sleep_until = now.replace(hour=23, minute=59, second=59)
-                sleep_seconds = (sleep_until - now).total_seconds()
-                if sleep_seconds > 0:
-                    time.sleep(sleep_seconds)
-                continue
+                own = [f for f in fixtures if f.league_id in shard_leagues]
+                print(f"  Parça {shard_index}: {len(own)} maç")
+            scheduler.add_fixtures(own, now)
+            with state_lock:
+                journal.day(today, own)
+            try:
+                sync_stats(store, stats)
+            except sqlite3.OperationalError as e:
+                print(f"Takım istatistikleri güncellenemedi: {e}")
+            
+            # Devre arasında yalnızca sözlük araması kalsın: özellikler/kararlar şimdi hazırlanır
+            with metrics.timer('phase', phase='prematch_warmup'):
+                prematch.warm(own, stats, today)
+            if shard_index == 0:
+                announce_day(fixtures, now)
+        
+        wake = scheduler.next_wake()
+        if wake is None:
+            # Pencere kalmadı: ertesi günün fikstürüne kadar uyu
+            print(f"\n[{now.strftime('%H:%M:%S')}] Günlük maçlar bitti. Yarın tekrar...")
+            clock.sleep(seconds_until_midnight(now) + 1)
+            continue
+        
+        if wake > now:
+            # Sonraki pencereye kadar (en geç gece yarısı fikstür yenilemesine kadar) uyu
+            wait_seconds = min((wake - now).total_seconds(), seconds_until_midnight(now) + 1)
+            print(f"\n[{now.strftime('%H:%M:%S')}] Sonraki kontrol: {wake.strftime('%H:%M:%S')}")
+            clock.sleep(wait_seconds)
+            continue
         
-        # Çalışma saatleri içinde mi?
-        if is_within_schedule(start_time, end_time):
+        with state_lock:
             try:
-                check_live_matches()
+                with metrics.timer('phase', phase='tick'):
+                    live_matches = check_live_matches(stats, store)
+                for key in scheduler.observe(live_matches, now_istanbul()):
+                    journal.window(key, scheduler.windows[key])
             except Exception as e:
                 print(f"Hata: {e}")
-            
-            print(f"  Sonraki kontrol: {CHECK_INTERVAL // 60} dakika sonra")
-            time.sleep(CHECK_INTERVAL)
-        else:
-            # Çalışma saatleri dışında
-            if now < start_time:
-                wait_seconds = (start_time - now).total_seconds()
-                print(f"\n[{now.strftime('%H:%M:%S')}] Maçlar başlamadı. {start_time.strftime('%H:%M')}'de başlayacak...")
-                time.sleep(min(wait_seconds, 300))  # Max 5 dk bekle
-            else:
-                print(f"\n[{now.strftime('%H:%M:%S')}] Günlük maçlar bitti. Yarın tekrar...")
-                # Gece yarısına kadar uyu
-                sleep_until = now.replace(hour=23, minute=59, second=59)
-                sleep_seconds = (sleep_until - now).total_seconds()
-                if sleep_seconds > 0:
-                    time.sleep(min(sleep_seconds, 3600))  # Max 1 saat bekle
+                metrics.inc('tick_errors')
+            finally:
+                try:
+                    store.flush(stats)
+                    sync_stats(store, stats)
+                except sqlite3.OperationalError as e:
+                    # Depo başka süreçte kilitli (ör. fetch_matches.py yeniden hesaplıyor): maçlar kuyrukta kalır
+                    print(f"Depo yazılamadı: {e}, sonraki turda tekrar denenecek")
+                    metrics.inc('store_busy')
+        scheduler.mark_polled(now_istanbul())
+
+def start_shard(index, league_ids, budget):
+    """Parça süreci: kendi ligleri, ortak kota bütçesi, ayrı giden kutusu"""
+    global api, outbox, journal, enricher, shard_leagues, shard_index
+    shard_index = index
+    shard_leagues = frozenset(league_ids)
+    api = ApiFootballClient(API_KEY, pool_size=FIXTURE_WORKERS, cache=ResponseCache(), budget=budget)
+    enricher = HalftimeEnricher(api)
+    # İlk parça tek süreçli moddan kalan giden kutusunu ve durum günlüğünü devralır
+    outbox = TelegramOutbox(TELEGRAM_TOKEN, OUTBOX_FILE if index == 0 else f"{OUTBOX_FILE}.{index}")
+    journal = StateJournal(JOURNAL_FILE if index == 0 else f"{JOURNAL_FILE}.{index}")
+    run_bot()
+
+def run_shards(count):
+    """Ligleri parçalara böl, her parçayı ayrı süreçte çalıştır; duran parçayı yeniden başlat"""
+    parts = split_leagues(subscriptions.league_ids(), count)
+    budget = QuotaBudget()
+    processes = {}
+    
+    def start(index):
+        process = multiprocessing.Process(target=start_shard, args=(index, parts[index], budget),
+                                          name=f"shard-{index}", daemon=True)
+        process.start()
+        processes[index] = process
+    
+    for index, part in enumerate(parts):
+        print(f"Parça {index}: {len(part)} lig ({', '.join(str(lid) for lid in part)})")
+        start(index)
+    
+    while True:
+        clock.sleep(CHECK_INTERVAL)
+        for index, process in list(processes.items()):
+            if not process.is_alive():
+                print(f"✗ Parça {index} durdu (çıkış kodu {process.exitcode}), yeniden başlatılıyor")
+                start(index)
+
+def main():
+    """Ana döngü"""
+    print("=" * 50)
+    print("HT 0-0 TAKTİĞİ TELEGRAM BOTU (Akıllı Zamanlama)")
+    print("=" * 50)
+    print(f"HT penceresinde kontrol: {HT_POLL_INTERVAL} sn, FT penceresinde: {FT_POLL_INTERVAL // 60} dakika")
+    print(f"İzlenen lig sayısı: {len(subscriptions.league_ids())}, abone sayısı: {len(subscriptions)}")
+    print(f"Kurallar: {', '.join(rules.names())}")
+    if LIVE_SHARDS > 1:
+        print(f"Parça sayısı: {LIVE_SHARDS}")
+    print("=" * 50)
+    
+    if LIVE_SHARDS > 1:
+        run_shards(LIVE_SHARDS)
+    else:
+        run_bot()
 
 if __name__ == "__main__":
     main()
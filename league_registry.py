@@ -0,0 +1,27 @@
+"""
+Lig kaydı
+- İzlenen ligler tek dosyada (leagues.json): ht_bot.py ve fetch_matches.py buradan okur
+- Her lig: API id, görünen ad, kısa ad (slug) ve API'deki adı
+"""
+
+import json
+import os
+from collections import namedtuple
+
+LEAGUES_FILE = os.environ.get("LEAGUES_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                           "leagues.json"))
+
+League = namedtuple('League', ['id', 'name', 'slug', 'api_name'])
+
+
+def load_leagues(path=LEAGUES_FILE):
+    """Lig kaydını yükle: id -> League (dosyadaki sırayla)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    leagues = {}
+    for entry in entries:
+        league = League(int(entry['id']), entry['name'], entry.get('slug', ''), entry.get('api_name', entry['name']))
+        if league.id in leagues:
+            raise ValueError(f"Lig iki kez tanımlı: {league.id} ({path})")
+        leagues[league.id] = league
+    return leagues
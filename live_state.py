@@ -0,0 +1,141 @@
+"""
+Canlı maç durum önbelleği
+- Her maçın önceki turdaki kompakt anlık görüntüsü (durum, dakika, skor) tutulur
+- Yeni yanıt bununla karşılaştırılır: yalnızca değişen maçlar kural/bildirim yolundan geçer
+- Durum geçişleri (1H→HT, HT→2H, 2H→FT ...) ve goller olay olarak üretilir
+- Bildirim sonrası olanlar (ikinci yarı golü, son skor) ek API çağrısı olmadan
+  sonuç günlüğüne (alert_outcomes.jsonl) yazılır
+"""
+
+import json
+import os
+from collections import namedtuple
+
+import clock
+
+OUTCOMES_FILE = os.environ.get("ALERT_OUTCOMES_FILE", "alert_outcomes.jsonl")
+FINAL_STATUSES = {'FT', 'AET', 'PEN'}
+
+Snapshot = namedtuple('Snapshot', 'status elapsed home away ht_home ht_away')
+
+# kind: 'transition' (old/new: durum) veya 'goal' (old/new: Snapshot)
+Event = namedtuple('Event', 'kind fixture_id old new')
+
+
+def snapshot_of(match):
+    """Maçın kompakt anlık görüntüsü"""
+    return Snapshot(match.status, match.elapsed, match.home_goals, match.away_goals,
+                    match.ht_home, match.ht_away)
+
+
+def _total(home, away):
+    return (home or 0) + (away or 0)
+
+
+class AlertOutcome:
+    """Bildirim gönderilmiş maçın sonrası"""
+    __slots__ = ('fixture_id', 'home_team', 'away_team', 'league', 'rules', 'alert', 'goals', 'last')
+
+    def __init__(self, match, snapshot):
+        self.fixture_id = match.id
+        self.home_team = match.home_name
+        self.away_team = match.away_name
+        self.league = match.league_name
+        self.rules = set()
+        self.alert = snapshot
+        self.goals = []
+        self.last = snapshot
+
+    def record(self):
+        last = self.last
+        ht_total = _total(last.ht_home, last.ht_away) if last.ht_home is not None else None
+        return {
+            'fixture_id': self.fixture_id,
+            'home_team': self.home_team,
+            'away_team': self.away_team,
+            'league': self.league,
+            'rules': sorted(self.rules),
+            'alert_minute': self.alert.elapsed,
+            'alert_score': f"{self.alert.home}-{self.alert.away}",
+            'goals_after_alert': [{'minute': s.elapsed, 'score': f"{s.home}-{s.away}"} for s in self.goals],
+            'second_half_goal': (None if ht_total is None
+                                 else _total(last.home, last.away) > ht_total),
+            'final_score': f"{last.home}-{last.away}",
+            'final_status': last.status,
+            'recorded_at': clock.now().isoformat(timespec='seconds'),
+        }
+
+
+class FixtureTracker:
+    """Maç başına önceki anlık görüntü, olaylar ve bildirim sonuçları"""
+
+    def __init__(self, track_elapsed=False, outcomes_file=OUTCOMES_FILE):
+        # Dakika koşulu olan kural yoksa dakika ilerlemesi "değişiklik" sayılmaz
+        self.track_elapsed = track_elapsed
+        self.outcomes_file = outcomes_file
+        self.states = {}    # fixture_id -> (Snapshot, karşılaştırma anahtarı)
+        self.outcomes = {}  # fixture_id -> AlertOutcome
+
+    def clear(self):
+        self.states.clear()
+        self.outcomes.clear()
+
+    def update(self, match):
+        """Maçın yeni görüntüsünü kaydet: (değişti mi, olaylar, biten bildirim sonucu)"""
+        fixture_id = match.id
+        snapshot = snapshot_of(match)
+        key = snapshot if self.track_elapsed else snapshot._replace(elapsed=None)
+        previous = self.states.get(fixture_id)
+        self.states[fixture_id] = (snapshot, key)
+
+        events = []
+        if previous is not None:
+            old = previous[0]
+            if old.status != snapshot.status:
+                events.append(Event('transition', fixture_id, old.status, snapshot.status))
+            if _total(snapshot.home, snapshot.away) > _total(old.home, old.away):
+                events.append(Event('goal', fixture_id, old, snapshot))
+
+        finished = None
+        outcome = self.outcomes.get(fixture_id)
+        if outcome is not None:
+            outcome.last = snapshot
+            outcome.goals.extend(event.new for event in events if event.kind == 'goal')
+            if snapshot.status in FINAL_STATUSES:
+                finished = self._finish(fixture_id)
+        return previous is None or previous[1] != key, events, finished
+
+    def snapshot(self, fixture_id):
+        """Maçın son görüntüsü (canlı yanıtta yoksa None)"""
+        state = self.states.get(fixture_id)
+        return state[0] if state is not None else None
+
+    def invalidate(self, fixture_id):
+        """Sonraki turda maç değişmemiş olsa da yeniden işlensin (ör. gönderilemeyen bildirim)"""
+        state = self.states.get(fixture_id)
+        if state is not None:
+            self.states[fixture_id] = (state[0], None)
+
+    def record_alert(self, match, rule_name):
+        """Maç için bildirim gönderildi: sonucu izlenmeye başlansın"""
+        fixture_id = match.id
+        outcome = self.outcomes.get(fixture_id)
+        if outcome is None:
+            snapshot = self.states[fixture_id][0] if fixture_id in self.states else snapshot_of(match)
+            outcome = self.outcomes[fixture_id] = AlertOutcome(match, snapshot)
+        outcome.rules.add(rule_name)
+
+    def sweep(self, seen_ids):
+        """Canlı yanıttan düşen maçları bırak; bildirimli olanların sonucunu son görüntüyle yaz"""
+        finished = []
+        for fixture_id in [fid for fid in self.states if fid not in seen_ids]:
+            del self.states[fixture_id]
+            if fixture_id in self.outcomes:
+                finished.append(self._finish(fixture_id))
+        return finished
+
+    def _finish(self, fixture_id):
+        record = self.outcomes.pop(fixture_id).record()
+        with open(self.outcomes_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Maç veri deposu (SQLite)
+- fixture_id birincil anahtar, takım ve tarih indeksleri
+- Yazmalar tick başına toplu (batch) yapılır
+- Takım istatistikleri ayrı tabloda tutulur, açılışta tüm maçlar taranmaz
+- Aynı depoya birden çok süreç yazabilir (parçalar, fetch_matches.py): takım satırları işlem içinde
+  kayıtlı satırın üzerine yeni maçlarla güncellenir, sürüm sayacıyla diğer süreçlerin yazdıkları belleğe alınır
+- Mevcut CSV şemasından tek seferlik içe aktarma
+- Türetilmiş özellik sütunlarının tüm geçmiş için tek kronolojik geçişte doldurulması (backfill)
+- Gönderilen bildirimler notified tablosunda: süreçler (parçalar) arası tekrar önleme
+- Telegram komutları için indeksli sorgular (takımın son maçları, günün sonuçları, lig özeti)
+
+Kullanım:
+  python3 match_store.py import matches_2025.csv
+  python3 match_store.py backfill
+"""
+
+import csv
+import os
+import sqlite3
+import sys
+import threading
+
+from metrics import metrics
+from team_stats import TeamStatsIndex, FEATURE_COLUMNS, feature_row
+
+DB_FILE = os.environ.get("MATCH_DB_FILE", "matches.db")
+
+# team_stats satırından TeamStats.from_state() argümanları
+STATE_COLUMNS = "home_sum, home_count, away_sum, away_count, recent, windows"
+
+# CSV şemasıyla aynı sıra
+FIELDS = [
+    'fixture_id', 'date', 'time', 'league_id', 'league_name', 'country', 'round',
+    'home_team_id', 'home_team', 'away_team_id', 'away_team',
+    'home_goals', 'away_goals', 'ht_home', 'ht_away', 'ft_home', 'ft_away',
+    'avg_goal_home_team', 'avg_goal_away_team', 'avg_goal_combined',
+    'avg_goal_home_team_home', 'avg_goal_away_team_away', 'avg_goal_combined_home_away',
+    'home_team_no_goal_last5', 'away_team_no_goal_last5',
+]
+
+HOME_TEAM = FIELDS.index('home_team_id')
+AWAY_TEAM = FIELDS.index('away_team_id')
+
+INT_FIELDS = {'fixture_id', 'league_id', 'home_team_id', 'away_team_id', 'home_goals', 'away_goals',
+              'ht_home', 'ht_away', 'ft_home', 'ft_away',
+              'home_team_no_goal_last5', 'away_team_no_goal_last5'}
+REAL_FIELDS = {'avg_goal_home_team', 'avg_goal_away_team', 'avg_goal_combined',
+               'avg_goal_home_team_home', 'avg_goal_away_team_away', 'avg_goal_combined_home_away'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    fixture_id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    league_id INTEGER,
+    league_name TEXT,
+    country TEXT,
+    round TEXT,
+    home_team_id INTEGER NOT NULL,
+    home_team TEXT,
+    away_team_id INTEGER NOT NULL,
+    away_team TEXT,
+    home_goals INTEGER,
+    away_goals INTEGER,
+    ht_home INTEGER,
+    ht_away INTEGER,
+    ft_home INTEGER,
+    ft_away INTEGER,
+    avg_goal_home_team REAL,
+    avg_goal_away_team REAL,
+    avg_goal_combined REAL,
+    avg_goal_home_team_home REAL,
+    avg_goal_away_team_away REAL,
+    avg_goal_combined_home_away REAL,
+    home_team_no_goal_last5 INTEGER,
+    away_team_no_goal_last5 INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_matches_home_team ON matches (home_team_id, date, time);
+CREATE INDEX IF NOT EXISTS idx_matches_away_team ON matches (away_team_id, date, time);
+CREATE INDEX IF NOT EXISTS idx_matches_date ON matches (date, time);
+CREATE INDEX IF NOT EXISTS idx_matches_league ON matches (league_id, date);
+CREATE TABLE IF NOT EXISTS team_stats (
+    team_id INTEGER PRIMARY KEY,
+    home_sum INTEGER NOT NULL,
+    home_count INTEGER NOT NULL,
+    away_sum INTEGER NOT NULL,
+    away_count INTEGER NOT NULL,
+    recent TEXT NOT NULL,
+    windows TEXT,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS notified (
+    chat_id TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    fixture_id INTEGER NOT NULL,
+    PRIMARY KEY (chat_id, rule, fixture_id)
+);
+"""
+
+
+def _convert(field, value):
+    """CSV/API değerini veritabanı tipine çevir (boş -> NULL)"""
+    if value is None or value == '':
+        return None
+    if field in INT_FIELDS:
+        return int(value)
+    if field in REAL_FIELDS:
+        return float(value)
+    return value
+
+
+class MatchStore:
+    """Maç deposu"""
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.executescript(SCHEMA)
+        # Eski depolar: kayan pencere/EWMA durumu sütunu (boşsa ilk yüklemede yeniden hesaplanır)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(team_stats)")}
+        if 'windows' not in columns:
+            self.conn.execute("ALTER TABLE team_stats ADD COLUMN windows TEXT")
+        if 'version' not in columns:
+            self.conn.execute("ALTER TABLE team_stats ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_team_stats_version ON team_stats (version)")
+        # matches: eklenen maç sayacı, stats: takım istatistiklerinin eksiksiz olduğu sayaç değeri
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO store_meta SELECT 'matches', COUNT(*) FROM matches")
+            self.conn.execute("INSERT OR IGNORE INTO store_meta VALUES ('stats', 0)")
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def count(self):
+        """Kayıtlı + bekleyen maç sayısı (tablo taranmaz, store_meta sayacı okunur)"""
+        with self.lock:
+            return self._meta('matches') + len(self.pending)
+
+    def has(self, fixture_id):
+        """Maç kayıtlı mı? (birincil anahtar araması)"""
+        fixture_id = int(fixture_id)
+        with self.lock:
+            if fixture_id in self.pending:
+                return True
+            row = self.conn.execute("SELECT 1 FROM matches WHERE fixture_id = ?", (fixture_id,)).fetchone()
+        return row is not None
+
+    def latest_date(self, league_id, date_from, date_to):
+        """Ligin verilen aralıktaki en son kayıtlı maç tarihi (yoksa None)"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MAX(date) FROM matches WHERE league_id = ? AND date BETWEEN ? AND ?",
+                (league_id, date_from, date_to)).fetchone()
+        return row[0]
+
+    def claim_notification(self, chat_id, rule, fixture_id):
+        """Bildirimi sahiplen: daha önce (başka bir süreçte de) sahiplenilmediyse True"""
+        with self.lock, self.conn:
+            cursor = self.conn.execute("INSERT OR IGNORE INTO notified VALUES (?, ?, ?)",
+                                       (str(chat_id), rule, int(fixture_id)))
+        return cursor.rowcount == 1
+
+    def release_notification(self, chat_id, rule, fixture_id):
+        """Gönderilemeyen bildirimin sahipliğini bırak (sonra tekrar denensin)"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM notified WHERE chat_id = ? AND rule = ? AND fixture_id = ?",
+                              (str(chat_id), rule, int(fixture_id)))
+
+    def add(self, row):
+        """Maçı bir sonraki flush() için sıraya al"""
+        values = tuple(_convert(f, row.get(f)) for f in FIELDS)
+        with self.lock:
+            self.pending[values[0]] = values
+
+    def flush(self, stats=None):
+        """Bekleyen maçları ve (stats verilirse) değişen takımların istatistiklerini tek işlemde yaz
+
+        Takım satırları bellekteki durumdan değil, işlem içinde kayıtlı satırdan güncellenir: aynı takımın
+        başka süreçlerce kaydedilen maçları ezilmez. Bellekteki indeks sync_stats() ile güncellenir.
+        """
+        placeholders = ",".join("?" * len(FIELDS))
+        insert = f"INSERT OR IGNORE INTO matches ({','.join(FIELDS)}) VALUES ({placeholders})"
+        with metrics.timer('phase', phase='store_write'), self.lock:
+            if not self.pending:
+                return 0
+            rows = list(self.pending.values())
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                before = self._meta('matches')
+                if stats is None:
+                    version = before + self.conn.executemany(insert, rows).rowcount
+                else:
+                    # Başka süreçte zaten kaydedilmiş maçlar atlanır, takım satırlarına yalnızca yeni eklenenler işlenir
+                    inserted = [row for row in rows if self.conn.execute(insert, row).rowcount]
+                    version = before + len(inserted)
+                self.conn.execute("UPDATE store_meta SET value = ? WHERE key = 'matches'", (version,))
+                if stats is not None:
+                    complete = self._meta('stats') == before
+                    self._update_team_stats(inserted, complete, version)
+                    if complete:
+                        # Yeni maçların takımları güncel: istatistikler yine eksiksiz
+                        self.conn.execute("UPDATE store_meta SET value = ? WHERE key = 'stats'", (version,))
+            # İşlem yazılamazsa (depo kilitli) maçlar sonraki flush() için kuyrukta kalır
+            self.pending.clear()
+        return len(rows)
+
+    def _update_team_stats(self, rows, complete, version):
+        """Yeni eklenen maçların takım satırlarını güncelle (flush() işlemi içinde)
+
+        Takım satırları eksiksizse ve yeni maçlar takımın en son maçlarıysa kayıtlı duruma yalnızca onlar
+        eklenir (maç başına O(1)). Eski tarihli maç, eksik ya da farklı pencere ayarıyla yazılmış satırda
+        takım tüm maçlarından yeniden hesaplanır.
+        """
+        new_ids = {}  # takım -> bu işlemde eklenen maçları
+        for row in rows:
+            for team_id in (row[HOME_TEAM], row[AWAY_TEAM]):
+                new_ids.setdefault(team_id, set()).add(row[0])
+        updated = TeamStatsIndex()
+        for team_id, fixture_ids in new_ids.items():
+            latest = self._team_latest(team_id, len(fixture_ids) + 1)
+            newest = latest[:len(fixture_ids)]
+            if complete and {match[0] for match in newest} == fixture_ids:
+                state = self.conn.execute(f"SELECT {STATE_COLUMNS} FROM team_stats WHERE team_id = ?",
+                                          (team_id,)).fetchone()
+                if state is None:
+                    usable = len(latest) == len(fixture_ids)  # Takımın ilk maçları
+                else:
+                    usable = len(latest) > len(fixture_ids) and updated.load_team(team_id, state)
+                if usable:
+                    updated.extend_team(team_id, [match[1:] for match in reversed(newest)])
+                    continue
+            updated.replay_team(team_id, self._team_history(team_id))
+        self._write_team_stats(updated, updated.teams.keys(), version)
+
+    def sync_stats(self, stats):
+        """Indeksin sürümünden sonra (bu veya başka süreçlerce) yazılan takım satırlarını belleğe al
+
+        Değişen takım id'leri döner. Farklı pencere ayarıyla yazılmış satırlar maçlardan hesaplanır.
+        """
+        changed = set()
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN")  # Sayaç ve satırlar aynı anlık görüntüden okunsun
+            version = self._meta('matches')
+            if version == stats.version:
+                return changed
+            for team_id, *state in self.conn.execute(
+                    f"SELECT team_id, {STATE_COLUMNS} FROM team_stats WHERE version > ?", (stats.version,)):
+                if not stats.load_team(team_id, state):
+                    stats.replay_team(team_id, self._team_history(team_id))
+                changed.add(str(team_id))
+        stats.version = version
+        return changed
+
+    def _meta(self, key):
+        return self.conn.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def _team_latest(self, team_id, limit):
+        """Takımın en son maçları (yeniden eskiye): fixture_id, ev id, deplasman id, ev gol, deplasman gol
+
+        Ev ve deplasman indeksleri ayrı ayrı sondan okunur: takımın maç sayısından bağımsız.
+        """
+        columns = "fixture_id, home_team_id, away_team_id, home_goals, away_goals, date, time"
+        order = "ORDER BY date DESC, time DESC, fixture_id DESC"
+        return [row[:5] for row in self.conn.execute(
+            f"SELECT * FROM (SELECT {columns} FROM matches WHERE home_team_id = ? {order} LIMIT ?) UNION ALL "
+            f"SELECT * FROM (SELECT {columns} FROM matches WHERE away_team_id = ? {order} LIMIT ?) {order} LIMIT ?",
+            (int(team_id), limit, int(team_id), limit, limit))]
+
+    def _team_history(self, team_id):
+        return self.conn.execute(
+            "SELECT home_team_id, away_team_id, home_goals, away_goals FROM matches "
+            "WHERE home_team_id = ? OR away_team_id = ? ORDER BY date, time, fixture_id",
+            (int(team_id), int(team_id))).fetchall()
+
+    def _write_team_stats(self, stats, team_ids, version):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO team_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(int(t),) + stats.teams[t].state() + (version,) for t in team_ids if t in stats.teams])
+
+    def team_matches(self, team_id, limit=5):
+        """Takımın en son maçları (yeniden eskiye): tarih, ev, deplasman, skor, HT skoru"""
+        team_id = int(team_id)
+        with self.lock:
+            return self.conn.execute(
+                "SELECT date, home_team, away_team, home_goals, away_goals, ht_home, ht_away FROM matches "
+                "WHERE home_team_id = ? OR away_team_id = ? ORDER BY date DESC, time DESC LIMIT ?",
+                (team_id, team_id, limit)).fetchall()
+
+    def team_names(self):
+        """Takım id'si -> en yeni maçtaki adı (adı değişen takımlar güncel adla çözülür)"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT team_id, name FROM ("
+                "SELECT home_team_id AS team_id, home_team AS name, date, time, fixture_id FROM matches UNION ALL "
+                "SELECT away_team_id, away_team, date, time, fixture_id FROM matches) "
+                "ORDER BY date, time, fixture_id").fetchall()
+        # Sıralı satırlardan sözlükte son (en yeni) ad kalır
+        return dict(rows)
+
+    def results_on(self, date):
+        """Günün kayıtlı maç sonuçları: fixture_id -> (ev gol, deplasman gol)"""
+        with self.lock:
+            rows = self.conn.execute("SELECT fixture_id, home_goals, away_goals FROM matches WHERE date = ?",
+                                     (date,)).fetchall()
+        return {fixture_id: (home, away) for fixture_id, home, away in rows}
+
+    def league_summary(self, league_id):
+        """Ligin maç sayısı, HT 0-0 sayısı ve bunlardan ikinci yarıda gol olanlar"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*), "
+                "COALESCE(SUM(ht_home = 0 AND ht_away = 0), 0), "
+                "COALESCE(SUM(ht_home = 0 AND ht_away = 0 AND home_goals + away_goals > 0), 0) "
+                "FROM matches WHERE league_id = ?", (int(league_id),)).fetchone()
+
+    def load_stats(self):
+        """Takım istatistik indeksini kayıtlı durumdan kur (takım sayısı kadar satır)
+
+        Pencere durumu eksik, farklı pencere/EWMA ayarıyla yazılmış ya da takım istatistikleri olmadan
+        maç eklenmişse (yarıda kalmış içe aktarma) maçlardan yeniden hesaplanır.
+        """
+        stats = TeamStatsIndex()
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN")
+            stats.version = self._meta('matches')
+            current = self._meta('stats') == stats.version and all([
+                stats.load_team(team_id, state)
+                for team_id, *state in self.conn.execute(f"SELECT team_id, {STATE_COLUMNS} FROM team_stats")])
+        if not current:
+            print("  Takım istatistikleri maçlardan yeniden hesaplanıyor...")
+            return self.rebuild_stats()
+        return stats
+
+    def iter_matches(self, columns=FIELDS):
+        """Maçları kronolojik sırada döndür"""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {','.join(columns)} FROM matches ORDER BY date, time, fixture_id").fetchall()
+        return rows
+
+    def rebuild_stats(self):
+        """Takım istatistiklerini tüm maçlardan yeniden hesapla ve kaydet"""
+        stats = TeamStatsIndex()
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")  # Hesap sırasında başka süreç maç eklemesin
+            for home_team, away_team, home_goals, away_goals in self.conn.execute(
+                    "SELECT home_team_id, away_team_id, home_goals, away_goals FROM matches "
+                    "ORDER BY date, time, fixture_id"):
+                stats.add_match(home_team, away_team, home_goals, away_goals)
+            self._replace_team_stats(stats)
+        return stats
+
+    def _replace_team_stats(self, stats):
+        """Tüm takım satırlarını yaz, istatistikleri güncel sayaçla eksiksiz işaretle"""
+        stats.version = self._meta('matches')
+        self.conn.execute("DELETE FROM team_stats")
+        self._write_team_stats(stats, stats.teams.keys(), stats.version)
+        self.conn.execute("UPDATE store_meta SET value = ? WHERE key = 'stats'", (stats.version,))
+
+    def backfill_features(self):
+        """Tüm maçların maç öncesi özellik sütunlarını tek kronolojik geçişte hesapla
+
+        Her maçın özellikleri o maç eklenmeden önceki takım toplamlarından okunur (O(1)),
+        sonra maç toplamlara eklenir. Sütunlar ve takım istatistikleri tek işlemde yazılır:
+        yarıda kalırsa depo eski haliyle kalır.
+        """
+        self.flush()
+        stats = TeamStatsIndex()
+        updates = []
+        assignments = ", ".join(f"{c} = ?" for c in FEATURE_COLUMNS)
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")  # Hesap sırasında başka süreç maç eklemesin
+            for fixture_id, home_team, away_team, home_goals, away_goals in self.conn.execute(
+                    "SELECT fixture_id, home_team_id, away_team_id, home_goals, away_goals FROM matches "
+                    "ORDER BY date, time, fixture_id").fetchall():
+                row = feature_row(stats.features(home_team, away_team))
+                updates.append(tuple(row[c] for c in FEATURE_COLUMNS) + (fixture_id,))
+                stats.add_match(home_team, away_team, home_goals, away_goals)
+            self.conn.executemany(f"UPDATE matches SET {assignments} WHERE fixture_id = ?", updates)
+            self._replace_team_stats(stats)
+        return len(updates), stats
+
+    def import_csv(self, csv_file):
+        """Mevcut CSV şemasındaki maçları içe aktar (türetilmiş sütunlar dahil)"""
+        with open(csv_file, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                self.add(row)
+        count = self.flush()
+        self.rebuild_stats()
+        return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "import":
+        store = MatchStore()
+        imported = store.import_csv(sys.argv[2])
+        print(f"✓ {imported} satır içe aktarıldı, depoda {store.count()} maç var.")
+        store.close()
+    elif len(sys.argv) == 2 and sys.argv[1] == "backfill":
+        store = MatchStore()
+        updated, stats = store.backfill_features()
+        print(f"✓ {updated} maçın özellik sütunları yeniden hesaplandı ({len(stats.teams)} takım).")
+        store.close()
+    else:
+        print(__doc__)
+        sys.exit(1)
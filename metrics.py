@@ -0,0 +1,156 @@
+"""
+Bot metrikleri
+- Tur (tick) aşamalarının süreleri, sayaçlar ve göstergeler
+- Prometheus metin formatında küçük bir http.server uç noktası (/metrics)
+- Periyodik kısa log özeti
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels:
+        value = str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{k}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class Metrics:
+    """İş parçacığı güvenli metrik kaydı"""
+
+    def __init__(self, prefix="ht_"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.timings = {}  # anahtar -> [adet, toplam, en büyük]
+        self.window = {}   # Son log özetinden beri süreler: anahtar -> [adet, toplam]
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[_key(name, labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        with self.lock:
+            timing = self.timings.get(key)
+            if timing is None:
+                timing = self.timings[key] = [0, 0.0, 0.0]
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+            window = self.window.setdefault(key, [0, 0.0])
+            window[0] += 1
+            window[1] += seconds
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def render(self):
+        """Prometheus metin formatı"""
+        with self.lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            timings = sorted(self.timings.items())
+        lines = []
+        declared = set()
+
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            full = f"{self.prefix}{name}_total"
+            declare(full, "counter")
+            lines.append(f"{full}{_format_labels(labels)} {value}")
+        for (name, labels), value in gauges:
+            full = self.prefix + name
+            declare(full, "gauge")
+            lines.append(f"{full}{_format_labels(labels)} {value}")
+        for (name, labels), (count, total, _) in timings:
+            full = f"{self.prefix}{name}_seconds"
+            declare(full, "summary")
+            lines.append(f"{full}_count{_format_labels(labels)} {count}")
+            lines.append(f"{full}_sum{_format_labels(labels)} {total:.6f}")
+        # Aynı ailenin satırları bir arada olmalı: en büyük süreler ayrı gösterge ailesi
+        for (name, labels), (_, _, largest) in timings:
+            full = f"{self.prefix}{name}_seconds_max"
+            declare(full, "gauge")
+            lines.append(f"{full}{_format_labels(labels)} {largest:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Son özetten beri ortalama süreler + sayaçlar (tek satır)"""
+        with self.lock:
+            window, self.window = self.window, {}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        parts = []
+        for (name, labels), (count, total) in sorted(window.items()):
+            label = ",".join(str(v) for _, v in labels)
+            parts.append(f"{name}{'[' + label + ']' if label else ''}={1000 * total / count:.1f}ms×{count}")
+        for (name, labels), value in sorted(counters.items()):
+            label = ",".join(str(v) for _, v in labels)
+            parts.append(f"{name}{'[' + label + ']' if label else ''}={value}")
+        for (name, labels), value in sorted(gauges.items()):
+            parts.append(f"{name}={value}")
+        return " ".join(parts)
+
+    def start_server(self, port, host="0.0.0.0"):
+        """/metrics uç noktasını arka planda başlat"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+    def start_logging(self, interval):
+        """Her interval saniyede bir özet satırı yazdır"""
+        def run():
+            while True:
+                time.sleep(interval)
+                line = self.summary()
+                if line:
+                    print(f"[metrik] {line}")
+
+        threading.Thread(target=run, name="metrics-log", daemon=True).start()
+
+
+# Tüm modüllerin paylaştığı kayıt
+metrics = Metrics()
@@ -0,0 +1,71 @@
+"""
+Maç öncesi hazırlık önbelleği
+- Günlük fikstür yüklenince her maçın özellikleri, kural kararları ve mesaj iskeletleri hazırlanır
+  (girdiler başlama saatinde bellidir: takımlar ve maç sırasında değişmeyen geçmiş)
+- Aynı gün bir takımın önceki maçı bitince o takımın maçları yeniden hazırlanır
+- Devre arasında karar, sözlük araması + skor kontrolüne iner
+"""
+
+from collections import namedtuple
+from datetime import date, timedelta
+
+# verdicts: (kural adı, abonelik) -> (bildirim türü, eleme nedeni)
+# skeletons: (kural adı, bildirim türü, format) -> (baş, son)
+Prepared = namedtuple('Prepared', ['features', 'verdicts', 'skeletons'])
+
+
+class PrematchCache:
+    """fixture_id -> Prepared, takım -> maç indeksiyle"""
+
+    def __init__(self, prepare):
+        self.prepare = prepare  # prepare(fixture, stats) -> Prepared
+        self.fixtures = {}
+        self.entries = {}
+        self.by_team = {}
+
+    def clear(self):
+        self.fixtures.clear()
+        self.entries.clear()
+        self.by_team.clear()
+
+    def get(self, fixture_id):
+        return self.entries.get(fixture_id)
+
+    def add(self, fixture, stats):
+        """Maçı hazırla ve önbelleğe al"""
+        self.fixtures[fixture.id] = fixture
+        for team_id in (fixture.home_id, fixture.away_id):
+            self.by_team.setdefault(team_id, set()).add(fixture.id)
+        prepared = self.entries[fixture.id] = self.prepare(fixture, stats)
+        return prepared
+
+    def warm(self, fixtures, stats, today):
+        """Günün maçlarını hazırla; dünden eski maçların kayıtları atılır"""
+        cutoff = (date.fromisoformat(today) - timedelta(days=1)).isoformat()
+        for fixture_id in [fid for fid, f in self.fixtures.items() if f.date[:10] < cutoff]:
+            self.discard(fixture_id)
+        for fixture in fixtures:
+            self.add(fixture, stats)
+        return len(self.entries)
+
+    def refresh_teams(self, team_ids, stats):
+        """Takımların istatistiği değişti: bekleyen maçlarını yeniden hazırla"""
+        fixture_ids = set()
+        for team_id in team_ids:
+            fixture_ids |= self.by_team.get(team_id, set())
+        for fixture_id in fixture_ids:
+            self.entries[fixture_id] = self.prepare(self.fixtures[fixture_id], stats)
+        return len(fixture_ids)
+
+    def discard(self, fixture_id):
+        """Biten maçın kaydını at"""
+        fixture = self.fixtures.pop(fixture_id, None)
+        self.entries.pop(fixture_id, None)
+        if fixture is None:
+            return
+        for team_id in (fixture.home_id, fixture.away_id):
+            ids = self.by_team.get(team_id)
+            if ids is not None:
+                ids.discard(fixture_id)
+                if not ids:
+                    del self.by_team[team_id]
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+API-Football ve Telegram için yerel replay sunucusu
+- Kayıtlı (API yanıtı JSON) veya sentetik fikstürleri sanal saate göre oynatır
+- /fixtures (live, date, league+next/date/from/to, id, ids, status), /fixtures/events ve /fixtures/statistics
+  sorgularını yanıtlar (--detail-delay: maç detayı yanıtlarına gecikme, süre sınırı testi için)
+- Gerçek API gibi biten maçlar live yanıtında yer almaz; bot onları ids sorgusuyla çeker
+- Telegram sendMessage çağrılarını kaydeder; POST /_command ile verilen komutları getUpdates'te döndürür
+- Sonunda API çağrısı, mesaj ve bildirim gecikmesi özetini yazar (/_stats ile anlık)
+
+Kullanım:
+  python3 replay_server.py --synthetic 300 --date 2026-10-17 --speed 60
+  python3 replay_server.py --fixtures kayit.json --speed 120
+Sunucunun yazdırdığı ortam değişkenleriyle bot aynı sanal saatte başlatılır
+(MATCH_DB_FILE ve OUTBOX_FILE için ayrı dosyalar kullanın).
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from match_store import MatchStore, DB_FILE
+
+TZ_OFFSET = timezone(timedelta(hours=3))
+KICKOFF_SLOTS = ["13:00", "14:30", "15:00", "16:00", "17:00", "17:30", "18:30",
+                 "19:00", "20:00", "20:45", "21:00", "22:00", "23:30"]
+LIVE_STATUSES = {'1H', 'HT', '2H', 'ET', 'BT', 'P'}
+DAILY_QUOTA = 7500
+
+# Başlamadan sonra dakika: 1. yarı (2 dk uzatma dahil), devre arası, 2. yarı
+HT_START = 47
+SECOND_HALF_START = 62
+FT_START = 111
+
+
+class SimFixture:
+    """Gol zaman çizelgesiyle oynatılan bir maç"""
+
+    def __init__(self, fixture_id, kickoff, league, home, away, goals):
+        self.id = fixture_id
+        self.kickoff = kickoff
+        self.league = league  # {'id', 'name', 'country', 'round'}
+        self.home = home      # {'id', 'name'}
+        self.away = away
+        self.goals = sorted(goals)  # [(dakika, 'home'|'away')]
+
+    def ht_start_ts(self):
+        return self.kickoff.timestamp() + HT_START * 60
+
+    def phase(self, ts):
+        """(durum, dakika) sanal zamanda"""
+        minutes = (ts - self.kickoff.timestamp()) / 60
+        if minutes < 0:
+            return 'NS', None
+        if minutes < HT_START:
+            return '1H', min(int(minutes) + 1, 45)
+        if minutes < SECOND_HALF_START:
+            return 'HT', 45
+        if minutes < FT_START:
+            return '2H', min(46 + int(minutes - SECOND_HALF_START), 90)
+        return 'FT', 90
+
+    def score_at(self, minute):
+        home = sum(1 for m, side in self.goals if m <= minute and side == 'home')
+        away = sum(1 for m, side in self.goals if m <= minute and side == 'away')
+        return home, away
+
+    def to_api(self, ts):
+        status, elapsed = self.phase(ts)
+        if status == 'NS':
+            goals = {'home': None, 'away': None}
+        else:
+            home, away = self.score_at(elapsed)
+            goals = {'home': home, 'away': away}
+        halftime = dict(zip(('home', 'away'), self.score_at(45))) if status in ('HT', '2H', 'FT') \
+            else {'home': None, 'away': None}
+        fulltime = goals if status == 'FT' else {'home': None, 'away': None}
+        return {
+            'fixture': {'id': self.id, 'date': self.kickoff.isoformat(),
+                        'status': {'short': status, 'elapsed': elapsed}},
+            'league': dict(self.league),
+            'teams': {'home': dict(self.home), 'away': dict(self.away)},
+            'goals': goals,
+            'score': {'halftime': halftime, 'fulltime': fulltime},
+        }
+
+    def events(self, ts):
+        _, elapsed = self.phase(ts)
+        team = {'home': self.home, 'away': self.away}
+        return [{'time': {'elapsed': m}, 'team': dict(team[side]), 'type': 'Goal', 'detail': 'Normal Goal'}
+                for m, side in self.goals if elapsed is not None and m <= elapsed]
+
+    def statistics(self, ts):
+        """Maç id'sinden türetilen, dakikayla artan şut/isabet/topla oynama sayıları"""
+        _, elapsed = self.phase(ts)
+        if elapsed is None:
+            return []
+        rng = random.Random(self.id)
+        possession = rng.randint(35, 65)
+        result = []
+        for side, share in (('home', possession), ('away', 100 - possession)):
+            goals = sum(1 for m, s in self.goals if s == side and m <= elapsed)
+            on_target = goals + int(rng.randint(0, 4) * elapsed / 45)
+            shots = on_target + int(rng.randint(1, 6) * elapsed / 45)
+            result.append({'team': {'id': getattr(self, side)['id'], 'name': getattr(self, side)['name']},
+                           'statistics': [{'type': 'Shots on Goal', 'value': on_target},
+                                          {'type': 'Total Shots', 'value': shots},
+                                          {'type': 'Ball Possession', 'value': f"{share}%"}]})
+        return result
+
+
+# ==================== FİKSTÜR ÜRETİMİ ====================
+
+def poisson(rng, lam):
+    limit, k, p = math.exp(-lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def team_pool(db_file):
+    """Depodaki gerçek takım/lig eşleşmeleri (geçmiş özellikler hesaplanabilsin diye)"""
+    if not os.path.exists(db_file):
+        return []
+    rows = MatchStore(db_file).iter_matches(
+        ('league_id', 'league_name', 'country', 'round', 'home_team_id', 'home_team', 'away_team_id', 'away_team'))
+    return [({'id': r[0], 'name': r[1], 'country': r[2], 'round': r[3]},
+             {'id': r[4], 'name': r[5]}, {'id': r[6], 'name': r[7]}) for r in rows]
+
+
+def synthesize(count, date, rng, db_file=DB_FILE):
+    pool = team_pool(db_file)
+    fixtures = []
+    for i in range(count):
+        if pool:
+            league, home, away = rng.choice(pool)
+        else:
+            league = {'id': 39, 'name': 'Premier League', 'country': 'England', 'round': ''}
+            home = {'id': 100000 + 2 * i, 'name': f"Home {i}"}
+            away = {'id': 100001 + 2 * i, 'name': f"Away {i}"}
+        hour, minute = map(int, rng.choice(KICKOFF_SLOTS).split(':'))
+        kickoff = datetime.fromisoformat(date).replace(hour=hour, minute=minute, tzinfo=TZ_OFFSET)
+        goals = [(rng.randint(1, 90), side) for side, lam in (('home', 1.45), ('away', 1.15))
+                 for _ in range(poisson(rng, lam))]
+        fixtures.append(SimFixture(900000000 + i, kickoff, league, home, away, goals))
+    return fixtures
+
+
+def load_recorded(path, rng):
+    """Kayıtlı API yanıtından fikstürler; goller ilk/ikinci yarıya rastgele dakikalarla dağıtılır"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    fixtures = []
+    for m in data['response'] if isinstance(data, dict) else data:
+        ht = m['score']['halftime']
+        ft = m['goals']
+        goals = []
+        for side in ('home', 'away'):
+            first = ht[side] or 0
+            goals += [(rng.randint(1, 45), side) for _ in range(first)]
+            goals += [(rng.randint(46, 90), side) for _ in range((ft[side] or 0) - first)]
+        league = {k: m['league'].get(k, '') for k in ('id', 'name', 'country', 'round')}
+        home = {'id': m['teams']['home']['id'], 'name': m['teams']['home']['name']}
+        away = {'id': m['teams']['away']['id'], 'name': m['teams']['away']['name']}
+        kickoff = datetime.fromisoformat(m['fixture']['date'])
+        fixtures.append(SimFixture(m['fixture']['id'], kickoff, league, home, away, goals))
+    return fixtures
+
+
+# ==================== SUNUCU ====================
+
+class ReplayState:
+    """Fikstürler ve toplanan istatistikler"""
+
+    def __init__(self, fixtures, clock, detail_delay=0.0):
+        self.fixtures = fixtures
+        self.detail_delay = detail_delay
+        self.by_id = {f.id: f for f in fixtures}
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.api_calls = {}
+        self.quota = DAILY_QUOTA
+        self.messages = []  # (sanal zaman, sohbet, metin)
+        self.updates = []   # getUpdates kuyruğu (Telegram güncelleme biçiminde)
+        self.updates_ready = threading.Condition(self.lock)
+
+    def count_call(self, path):
+        with self.lock:
+            self.api_calls[path] = self.api_calls.get(path, 0) + 1
+            self.quota -= 1
+            return self.quota
+
+    def query_fixtures(self, params):
+        ts = self.clock.timestamp()
+        result = self.fixtures
+        if 'id' in params:
+            result = [self.by_id[int(params['id'])]] if int(params['id']) in self.by_id else []
+        if 'ids' in params:
+            ids = [int(fixture_id) for fixture_id in params['ids'].split('-')[:20]]
+            result = [self.by_id[fixture_id] for fixture_id in ids if fixture_id in self.by_id]
+        if 'league' in params:
+            result = [f for f in result if str(f.league['id']) == params['league']]
+        if 'date' in params:
+            result = [f for f in result if f.kickoff.date().isoformat() == params['date']]
+        if 'from' in params:
+            result = [f for f in result if f.kickoff.date().isoformat() >= params['from']]
+        if 'to' in params:
+            result = [f for f in result if f.kickoff.date().isoformat() <= params['to']]
+        if 'live' in params:
+            leagues = None if params['live'] == 'all' else set(params['live'].split('-'))
+            result = [f for f in result if f.phase(ts)[0] in LIVE_STATUSES
+                      and (leagues is None or str(f.league['id']) in leagues)]
+        if 'status' in params:
+            wanted = set(params['status'].split('-'))
+            result = [f for f in result if f.phase(ts)[0] in wanted]
+        if 'next' in params:
+            upcoming = sorted((f for f in result if f.phase(ts)[0] == 'NS'), key=lambda f: f.kickoff)
+            result = upcoming[:int(params['next'])]
+        return [f.to_api(ts) for f in result]
+
+    def add_command(self, chat_id, text):
+        with self.lock:
+            update_id = len(self.updates) + 1
+            self.updates.append({'update_id': update_id, 'message': {
+                'message_id': update_id, 'date': int(time.time()), 'chat': {'id': chat_id}, 'text': text}})
+            self.updates_ready.notify_all()
+
+    def get_updates(self, offset, timeout):
+        """offset'ten itibaren güncellemeler; yoksa en fazla timeout (gerçek) saniye bekle"""
+        with self.lock:
+            self.updates_ready.wait_for(lambda: len(self.updates) >= offset, timeout)
+            return self.updates[offset - 1:]
+
+    def record_message(self, chat_id, text):
+        with self.lock:
+            self.messages.append((self.clock.timestamp(), str(chat_id), text))
+
+    def summary(self):
+        with self.lock:
+            messages = list(self.messages)
+            api_calls = dict(self.api_calls)
+        # Bot takım adlarını HTML olarak kaçışlar; mesajda düz metin (alt dize) olarak aranır
+        keys = [(f, f"<b>{html.escape(f.home['name'])}</b> vs <b>{html.escape(f.away['name'])}</b>")
+                for f in self.fixtures]
+        latencies = []
+        for ts, _, text in messages:
+            # Aynı eşleşme birden çok kez olabilir: mesajdan önceki en son devre arası
+            started = {}
+            for f, key in keys:
+                if f.ht_start_ts() <= ts and key in text:
+                    started[key] = max(started.get(key, 0), f.ht_start_ts())
+            latencies.extend(ts - ht_start for ht_start in started.values())
+        latencies.sort()
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1) if latencies else None
+
+        return {
+            'fixtures': len(self.fixtures),
+            'virtual_time': self.clock.now(TZ_OFFSET).isoformat(),
+            'api_calls': sum(api_calls.values()),
+            'api_calls_by_endpoint': api_calls,
+            'telegram_messages': len(messages),
+            'alerts_matched': len(latencies),
+            'alert_latency_seconds': {'p50': percentile(0.5), 'p95': percentile(0.95),
+                                      'max': latencies[-1] if latencies else None},
+        }
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, payload, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                for name, value in (headers or {}).items():
+                    self.send_header(name, str(value))
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, str(value))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            if url.path == '/_stats':
+                return self._reply(state.summary())
+            if re.fullmatch(r'/bot[^/]*/getUpdates', url.path):
+                timeout = min(float(params.get('timeout', 0)), 5)
+                return self._reply({'ok': True, 'result': state.get_updates(int(params.get('offset', 1)), timeout)})
+            remaining = state.count_call(url.path)
+            quota = {'x-ratelimit-requests-limit': DAILY_QUOTA, 'x-ratelimit-requests-remaining': remaining}
+            if url.path == '/fixtures':
+                response = state.query_fixtures(params)
+            elif url.path in ('/fixtures/events', '/fixtures/statistics'):
+                time.sleep(state.detail_delay)
+                fixture = state.by_id.get(int(params.get('fixture', 0)))
+                if fixture is None:
+                    response = []
+                elif url.path == '/fixtures/events':
+                    response = fixture.events(state.clock.timestamp())
+                else:
+                    response = fixture.statistics(state.clock.timestamp())
+            else:
+                response = []
+            self._reply({'get': url.path, 'parameters': params, 'errors': [],
+                         'results': len(response), 'response': response}, quota)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if self.path == '/_command':
+                state.add_command(body.get('chat_id'), body.get('text', ''))
+                return self._reply({'ok': True})
+            if re.fullmatch(r'/bot[^/]*/sendMessage', self.path):
+                state.record_message(body.get('chat_id'), body.get('text', ''))
+                return self._reply({'ok': True, 'result': {'message_id': len(state.messages)}})
+            self._reply({'ok': False})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API-Football/Telegram replay sunucusu")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--fixtures', help="Kayıtlı API yanıtı (JSON)")
+    source.add_argument('--synthetic', type=int, help="Sentetik fikstür sayısı")
+    parser.add_argument('--date', default=datetime.now(TZ_OFFSET).date().isoformat())
+    parser.add_argument('--speed', type=float, default=60, help="Sanal saat hız katı")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--report', help="Özetin yazılacağı JSON dosyası")
+    parser.add_argument('--detail-delay', type=float, default=0.0,
+                        help="Maç detayı (events/statistics) yanıtlarına eklenecek gecikme (gerçek saniye)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    fixtures = load_recorded(args.fixtures, rng) if args.fixtures else synthesize(args.synthetic, args.date, rng)
+    if not fixtures:
+        parser.error("fikstür yok")
+
+    # Sanal saat ilk maçtan 1 saat önce başlar; bot aynı değerlerle başlatılmalı
+    first_kickoff = min(f.kickoff for f in fixtures)
+    last_end = max(f.kickoff for f in fixtures) + timedelta(minutes=FT_START + 30)
+    os.environ.setdefault("CLOCK_START", (first_kickoff - timedelta(hours=1)).isoformat())
+    os.environ["CLOCK_SPEED"] = str(args.speed)
+    os.environ.setdefault("CLOCK_ORIGIN", str(time.time()))
+    import clock
+
+    state = ReplayState(fixtures, clock, args.detail_delay)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    base = f"http://127.0.0.1:{args.port}"
+    print(f"{len(fixtures)} fikstür, sanal saat {args.speed:g}x. Bot için:")
+    for name in ("CLOCK_START", "CLOCK_SPEED", "CLOCK_ORIGIN"):
+        print(f"  export {name}='{os.environ[name]}'")
+    print(f"  export API_FOOTBALL_URL={base} TELEGRAM_API_URL={base}")
+
+    # Saat zaten maçların sonrasındaysa (örn. biten maç çekimi testi) Ctrl-C'ye kadar çalış
+    replay_done = clock.now(TZ_OFFSET) < last_end
+    try:
+        while not replay_done or clock.now(TZ_OFFSET) < last_end:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+
+    summary = state.summary()
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
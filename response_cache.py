@@ -0,0 +1,130 @@
+"""
+API-Football yanıt önbelleği (disk)
+- Anahtar: uç nokta + sıralanmış sorgu parametreleri
+- Uç nokta sınıfına göre TTL: canlı veri önbelleğe alınmaz, fikstür listeleri saatlerce tutulur
+- Süresi dolan kayıtlar ETag/Last-Modified varsa koşullu istekle yenilenir
+- Toplam boyut sınırı aşılınca en uzun süredir kullanılmayan kayıtlar silinir (LRU)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+CACHE_DIR = os.environ.get("API_CACHE_DIR", ".api_cache")
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+
+def ttl_for(endpoint):
+    """Uç nokta sınıfına göre önbellek süresi (saniye, 0: önbelleğe alma)"""
+    parts = urlsplit(endpoint)
+    params = dict(parse_qsl(parts.query))
+    if parts.path == "/fixtures":
+        if 'live' in params:
+            return 0
+        if params.get('status') == 'FT':
+            return 6 * 3600        # Biten maç listeleri (sezon çekimi)
+        if 'date' in params or 'next' in params or 'from' in params:
+            return 3 * 3600        # Günlük fikstür listeleri
+        return 0
+    if parts.path in ("/fixtures/statistics", "/fixtures/events"):
+        return 30
+    return 0
+
+
+def cache_key(endpoint):
+    parts = urlsplit(endpoint)
+    return f"{parts.path}?{urlencode(sorted(parse_qsl(parts.query)))}"
+
+
+class CacheEntry:
+    __slots__ = ('key', 'stored_at', 'etag', 'last_modified', 'data')
+
+    def __init__(self, key, stored_at, etag, last_modified, data):
+        self.key = key
+        self.stored_at = stored_at
+        self.etag = etag
+        self.last_modified = last_modified
+        self.data = data
+
+    def is_fresh(self, ttl):
+        return time.time() - self.stored_at < ttl
+
+
+class ResponseCache:
+    """Boyut sınırlı, disk tabanlı LRU yanıt önbelleği"""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # dosya adı -> (son kullanım, boyut)
+        self.index = {}
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                st = os.stat(os.path.join(directory, name))
+                self.index[name] = (st.st_mtime, st.st_size)
+        self.total = sum(size for _, size in self.index.values())
+
+    def _filename(self, key):
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json"
+
+    def get(self, endpoint):
+        """Kaydı döndür (yoksa None); kullanım zamanı güncellenir"""
+        key = cache_key(endpoint)
+        name = self._filename(key)
+        path = os.path.join(self.directory, name)
+        with self.lock:
+            if name not in self.index:
+                return None
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+            except (OSError, ValueError):
+                self._remove(name)
+                return None
+            if raw.get('key') != key:
+                return None
+            now = time.time()
+            os.utime(path, (now, now))
+            self.index[name] = (now, self.index[name][1])
+        return CacheEntry(key, raw['stored_at'], raw.get('etag'), raw.get('last_modified'), raw['data'])
+
+    def put(self, endpoint, data, etag=None, last_modified=None):
+        key = cache_key(endpoint)
+        name = self._filename(key)
+        path = os.path.join(self.directory, name)
+        body = json.dumps({'key': key, 'stored_at': time.time(), 'etag': etag,
+                           'last_modified': last_modified, 'data': data}, ensure_ascii=False)
+        with self.lock:
+            tmp = f"{path}.{os.getpid()}.tmp"  # Aynı dizini paylaşan süreçler çakışmasın
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(body)
+            os.replace(tmp, path)
+            size = os.path.getsize(path)
+            self.total += size - self.index.get(name, (0, 0))[1]
+            self.index[name] = (time.time(), size)
+            self._evict()
+
+    def revalidated(self, entry):
+        """304 sonrası: kaydın saklanma zamanını yenile"""
+        self.put(entry.key, entry.data, entry.etag, entry.last_modified)
+
+    def _remove(self, name):
+        _, size = self.index.pop(name, (0, 0))
+        self.total -= size
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+    def _evict(self):
+        if self.total <= self.max_bytes:
+            return
+        for name, _ in sorted(self.index.items(), key=lambda item: item[1][0]):
+            self._remove(name)
+            if self.total <= self.max_bytes:
+                break
@@ -0,0 +1,200 @@
+"""
+Strateji kuralları
+- Kurallar bir JSON dosyasında tanımlanır (durum, skor, dakika ve özellik koşulları)
+- Açılışta bir kez closure'lara derlenir; canlı yanıt tek geçişte değerlendirilir
+- Durum -> kural indeksi: her maç yalnızca durumuna uyan kurallardan geçer
+
+rules.json örneği:
+[
+  {"name": "ht00", "title": "HT 0-0",
+   "status": ["HT", "2H", "ET", "BT", "P"], "ht_score": [0, 0],
+   "features": [
+     {"feature": "avg_goal_combined_home_away", "op": ">", "value": "$threshold",
+      "missing": "no_data", "reason": "avg_goal_low"},
+     {"feature": "home_team_no_goal_last5", "op": "!=", "value": 1, "missing": "partial", "reason": "no_goal_last5"},
+     {"feature": "away_team_no_goal_last5", "op": "!=", "value": 1, "missing": "partial", "reason": "no_goal_last5"}
+   ]},
+  {"name": "ht10_away", "title": "HT 1-0 Deplasman", "status": ["HT"], "ht_score": [1, 0],
+   "features": [{"feature": "avg_goal_away_team_away", "op": ">=", "value": 1.5}]},
+  {"name": "00_60", "title": "60' 0-0", "status": ["2H"], "score": [0, 0], "minute": [60, 70]}
+]
+
+- "$threshold" gibi değerler aboneliğin parametresinden okunur
+- Skor listelerinde null: o taraf için koşul yok
+- missing: özellik yoksa "fail" (varsayılan, elenir), "partial" (kısmi veri ile devam)
+  veya "no_data" (hemen veri yetersiz bildirimi)
+Dosya yoksa yalnızca yerleşik HT 0-0 kuralı kullanılır.
+"""
+
+import json
+import operator
+import os
+
+RULES_FILE = os.environ.get("RULES_FILE", "rules.json")
+
+OPERATORS = {
+    '>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le,
+    '==': operator.eq, '!=': operator.ne,
+}
+MISSING = ('fail', 'partial', 'no_data')
+
+# Botun önceki sabit HT 0-0 mantığıyla aynı
+DEFAULT_RULES = [
+    {"name": "ht00", "title": "HT 0-0",
+     "status": ["HT", "2H", "ET", "BT", "P"], "ht_score": [0, 0],
+     "features": [
+         {"feature": "avg_goal_combined_home_away", "op": ">", "value": "$threshold",
+          "missing": "no_data", "reason": "avg_goal_low"},
+         {"feature": "home_team_no_goal_last5", "op": "!=", "value": 1,
+          "missing": "partial", "reason": "no_goal_last5"},
+         {"feature": "away_team_no_goal_last5", "op": "!=", "value": 1,
+          "missing": "partial", "reason": "no_goal_last5"},
+     ]},
+]
+
+
+def _ht_score(m):
+    return m.ht_home, m.ht_away
+
+
+def _score(m):
+    return m.home_goals, m.away_goals
+
+
+def _score_check(spec, score_of):
+    """[ev, deplasman] skor koşulu (None: o taraf için koşul yok)"""
+    home, away = spec
+
+    def check(m):
+        h, a = score_of(m)
+        return (home is None or h == home) and (away is None or a == away)
+    return check
+
+
+def _compile_match(spec):
+    """Maç koşulları (skor, dakika) -> match(m): eleme nedeni veya None"""
+    checks = []
+    if spec.get('ht_score'):
+        checks.append((_score_check(spec['ht_score'], _ht_score), 'ht_score'))
+    if spec.get('score'):
+        checks.append((_score_check(spec['score'], _score), 'score'))
+    if spec.get('minute'):
+        low, high = spec['minute']
+        checks.append((lambda m: low <= (m.elapsed or 0) <= high, 'minute'))
+
+    def match(m):
+        for check, reason in checks:
+            if not check(m):
+                return reason
+        return None
+    return match
+
+
+def _compile_feature(spec, rule_name):
+    op = OPERATORS.get(spec['op'])
+    if op is None:
+        raise ValueError(f"Geçersiz operatör: {spec['op']} ({rule_name})")
+    missing = spec.get('missing', 'fail')
+    if missing not in MISSING:
+        raise ValueError(f"Geçersiz missing değeri: {missing} ({rule_name})")
+    feature = spec['feature']
+    value = spec['value']
+    if isinstance(value, str) and value.startswith('$'):
+        param = value[1:]
+        limit = lambda params: params[param]  # noqa: E731
+    else:
+        limit = lambda params: value  # noqa: E731
+    return feature, op, limit, missing, spec.get('reason', feature)
+
+
+def _compile_verdict(specs, rule_name):
+    """Özellik koşulları -> verdict(features, params): (bildirim türü, None) veya (None, eleme nedeni)"""
+    predicates = [_compile_feature(spec, rule_name) for spec in specs]
+
+    def verdict(features, params):
+        kind = 'full'
+        for feature, op, limit, missing, reason in predicates:
+            value = features.get(feature)
+            if value is None:
+                if missing == 'no_data':
+                    return 'no_data', None
+                if missing == 'fail':
+                    return None, reason
+                kind = 'partial'
+                continue
+            if not op(value, limit(params)):
+                return None, reason
+        return kind, None
+    return verdict
+
+
+class Rule:
+    """Derlenmiş strateji kuralı"""
+    __slots__ = ('name', 'title', 'statuses', 'match', 'verdict', 'uses_minute', 'minute', 'features')
+
+    def __init__(self, spec):
+        self.name = spec['name']
+        self.title = spec.get('title', self.name)
+        self.statuses = frozenset(spec['status']) if spec.get('status') else None  # None: tüm durumlar
+        self.match = _compile_match(spec)
+        self.verdict = _compile_verdict(spec.get('features', ()), self.name)
+        self.uses_minute = bool(spec.get('minute'))
+        self.minute = tuple(spec['minute']) if spec.get('minute') else None  # (en az, en çok) maç dakikası
+        self.features = frozenset(f['feature'] for f in spec.get('features', ()))
+
+
+class RuleSet:
+    """Kurallar ve durum -> kural indeksi"""
+
+    def __init__(self, specs):
+        self.rules = [Rule(spec) for spec in specs]
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Kural adları benzersiz olmalı")
+        # Her durumun listesi kural dosyasındaki sırayı korur; durumu belirtilmeyen kurallar hepsinde
+        self.any_status = [rule for rule in self.rules if rule.statuses is None]
+        statuses = set().union(*(rule.statuses for rule in self.rules if rule.statuses))
+        self.by_status = {status: [rule for rule in self.rules if rule.statuses is None or status in rule.statuses]
+                          for status in statuses}
+
+    def __len__(self):
+        return len(self.rules)
+
+    def uses_minute(self):
+        """Dakika koşulu olan kural var mı? (yoksa dakika ilerlemesi maçı yeniden değerlendirmez)"""
+        return any(rule.uses_minute for rule in self.rules)
+
+    def minute_ranges(self):
+        """Dakika koşullu kuralların canlı görülebilecek dakika aralıkları (sorgu pencereleri için)
+
+        Aralık kuralın durumlarına göre daraltılır: yalnızca 2H için 46'dan, yalnızca 1H için 45'e kadar.
+        """
+        ranges = set()
+        for rule in self.rules:
+            if rule.minute is None:
+                continue
+            low, high = rule.minute
+            if rule.statuses is not None:
+                if '1H' not in rule.statuses:
+                    low = max(low, 46)
+                if '2H' not in rule.statuses:
+                    high = min(high, 45)
+                if not rule.statuses & {'1H', '2H'}:
+                    continue
+            if low <= high:
+                ranges.add((low, high))
+        return sorted(ranges)
+
+    def names(self):
+        return [rule.name for rule in self.rules]
+
+    def for_status(self, status):
+        return self.by_status.get(status, self.any_status)
+
+
+def load_rules(path=RULES_FILE):
+    """Kuralları dosyadan yükleyip derle; dosya yoksa yerleşik HT 0-0 kuralı"""
+    if not os.path.exists(path):
+        return RuleSet(DEFAULT_RULES)
+    with open(path, 'r', encoding='utf-8') as f:
+        return RuleSet(json.load(f))
@@ -0,0 +1,174 @@
+"""
+Maç bazlı uyarlanabilir sorgu zamanlayıcısı
+- Her maç için beklenen devre arası (HT) ve maç sonu (FT) pencereleri; dakika koşullu kurallar
+  (ör. 60-70' arası 0-0) için o dakikaların pencereleri
+- Pencereler içinde sık, dışında hiç sorgu yok (uyanma zamanları öncelik kuyruğunda)
+- Zamanlar başlama saatinin tam tarihinden hesaplanır, gece yarısını aşan pencereler sorunsuz
+- Canlı veride gecikmeli maçlar görülünce pencere kaydırılır; süresi dolmuş pencere
+  (ör. başlama saati çok geciken maç) yeniden kurulur
+- Uzatmaya/penaltılara giden maçlarda (ET, BT, P) FT penceresi maçın yeni bitişine taşınır
+"""
+
+import heapq
+import itertools
+from datetime import datetime, timedelta
+
+HT_WINDOW = (45, 65)    # Başlamadan sonra dakika: devre arası beklenen aralık
+FT_WINDOW = (105, 125)  # Başlamadan sonra dakika: maç sonu beklenen aralık
+HT_POLL_INTERVAL = 60   # HT penceresinde sorgu aralığı (saniye)
+FT_POLL_INTERVAL = 300  # FT penceresinde sorgu aralığı (saniye)
+MINUTE_POLL_INTERVAL = 60  # Dakika penceresinde sorgu aralığı (saniye)
+HALF_TIME_BREAK = 15    # İkinci yarı dakikası -> başlamadan sonra dakika farkı (devre arası)
+MINUTE_SLACK = 10       # Dakika penceresinin sonuna eklenen pay (uzatma, gecikme)
+EXTRA_TIME_END = 120    # Uzatmalar dahil son maç dakikası
+EXTRA_TIME_BREAK = 5    # Normal süre ile uzatma arasındaki ara (BT, dakika)
+PENALTY_ALLOWANCE = 20  # Uzatma sonrası penaltılar için FT penceresi uzunluğu (dakika)
+
+# Oynanmayacak / bitmiş maçlar için pencere kurulmaz
+SKIP_STATUSES = {'PST', 'CANC', 'ABD', 'AWD', 'WO', 'FT', 'AET', 'PEN'}
+
+
+class Window:
+    """Bir maçın sorgu penceresi"""
+    __slots__ = ('start', 'end', 'interval', 'seq')
+
+    def __init__(self, start, end, interval):
+        self.start = start
+        self.end = end
+        self.interval = interval
+        self.seq = None
+
+
+def _offset(minute):
+    """Maç dakikası -> başlamadan sonra beklenen dakika"""
+    return minute if minute <= 45 else minute + HALF_TIME_BREAK
+
+
+class PollScheduler:
+    """Uyanma zamanlarını öncelik kuyruğunda tutan zamanlayıcı"""
+
+    def __init__(self, ht_interval=HT_POLL_INTERVAL, ft_interval=FT_POLL_INTERVAL, minute_ranges=(),
+                 minute_interval=MINUTE_POLL_INTERVAL):
+        self.ht_interval = ht_interval
+        self.ft_interval = ft_interval
+        self.minute_interval = minute_interval
+        # Dakika aralığı -> pencere türü ('m60-70')
+        self.minute_kinds = {f"m{low}-{high}": (low, high) for low, high in minute_ranges}
+        self.windows = {}  # (fixture_id, 'ht'|'ft'|'m<en az>-<en çok>') -> Window
+        self.heap = []     # (uyanma zamanı, seq, anahtar)
+        self.counter = itertools.count()
+
+    def _schedule(self, key, window, wake):
+        window.seq = next(self.counter)
+        self.windows[key] = window
+        heapq.heappush(self.heap, (wake, window.seq, key))
+
+    def _set_window(self, key, start, end, interval):
+        self._schedule(key, Window(start, end, interval), start)
+
+    def add_fixtures(self, fixtures, now):
+        """Fikstürlerin HT/FT pencerelerini ekle, süresi dolmuş pencereleri at"""
+        for f in fixtures:
+            if f.status in SKIP_STATUSES:
+                continue
+            kickoff = datetime.fromisoformat(f.date)
+            for kind, (start_min, end_min), interval in (('ht', HT_WINDOW, self.ht_interval),
+                                                         ('ft', FT_WINDOW, self.ft_interval)):
+                end = kickoff + timedelta(minutes=end_min)
+                if end > now:
+                    self._set_window((f.id, kind), kickoff + timedelta(minutes=start_min), end, interval)
+            for kind, (low, high) in self.minute_kinds.items():
+                end = kickoff + timedelta(minutes=_offset(high) + MINUTE_SLACK)
+                if end > now:
+                    self._set_window((f.id, kind), kickoff + timedelta(minutes=_offset(low)), end,
+                                     self.minute_interval)
+
+    def observe(self, live_matches, now):
+        """Canlı durumdan gecikmeleri yakala ve pencereleri kaydır (kaydırılan/yeniden kurulan anahtarlar döner)"""
+        shifted = []
+        for match in live_matches:
+            elapsed = match.elapsed or 0
+            if self.minute_kinds and match.status in ('1H', '2H'):
+                shifted.extend(self._observe_minutes(match, elapsed, now))
+            if match.status == '1H':
+                key, remaining, length = (match.id, 'ht'), 45 - elapsed, HT_WINDOW[1] - HT_WINDOW[0]
+            elif match.status == '2H':
+                key, remaining, length = (match.id, 'ft'), 90 - elapsed, FT_WINDOW[1] - FT_WINDOW[0]
+            elif match.status in ('ET', 'BT', 'P'):
+                # Uzatmaya giden maç FT penceresinden sonra biter: pencere uzatma sonuna (ve penaltılara) kayar
+                played = max(elapsed, 90)
+                remaining = {'ET': EXTRA_TIME_END - played,
+                             'BT': EXTRA_TIME_END - played + EXTRA_TIME_BREAK,
+                             'P': 0}[match.status]
+                key, length = (match.id, 'ft'), PENALTY_ALLOWANCE
+            else:
+                continue
+            window = self.windows.get(key)
+            expected = now + timedelta(minutes=max(remaining, 0))
+            if window is None:
+                # Maç başlamadan penceresi dolmuş: devre arası/maç sonu yeniden izlenir
+                interval = self.ht_interval if key[1] == 'ht' else self.ft_interval
+            elif expected <= window.start:
+                continue
+            else:
+                interval = window.interval
+            self._set_window(key, expected, expected + timedelta(minutes=length), interval)
+            shifted.append(key)
+        return shifted
+
+    def _observe_minutes(self, match, elapsed, now):
+        """Dakika pencerelerini canlı dakikaya göre kaydır (geçmiş aralıklar atlanır)"""
+        shifted = []
+        current = elapsed if match.status == '1H' else elapsed + HALF_TIME_BREAK
+        for kind, (low, high) in self.minute_kinds.items():
+            remaining_end = _offset(high) - current
+            if remaining_end < 0:
+                continue
+            key = (match.id, kind)
+            window = self.windows.get(key)
+            expected = now + timedelta(minutes=max(_offset(low) - current, 0))
+            if window is not None and expected <= window.start:
+                continue
+            self._set_window(key, expected, now + timedelta(minutes=remaining_end + MINUTE_SLACK),
+                             self.minute_interval)
+            shifted.append(key)
+        return shifted
+
+    def restore_window(self, key, start, end, interval, now):
+        """Günlükten kaydırılmış pencereyi geri kur (süresi dolmuşsa atlanır)"""
+        if end > now:
+            self._set_window(key, start, end, interval)
+
+    def _drop_stale(self):
+        while self.heap:
+            _, seq, key = self.heap[0]
+            window = self.windows.get(key)
+            if window is not None and window.seq == seq:
+                return
+            heapq.heappop(self.heap)
+
+    def next_wake(self):
+        """Bir sonraki sorgu zamanı (pencere kalmadıysa None)"""
+        self._drop_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def mark_polled(self, now):
+        """Sorgu yapıldı: zamanı gelmiş pencereleri bir sonraki adıma taşı"""
+        while True:
+            self._drop_stale()
+            if not self.heap or self.heap[0][0] > now:
+                break
+            _, _, key = heapq.heappop(self.heap)
+            window = self.windows[key]
+            wake = now + timedelta(seconds=window.interval)
+            if wake > window.end:
+                del self.windows[key]
+            else:
+                self._schedule(key, window, wake)
+
+    def span(self):
+        """Kalan pencerelerin ilk başlangıç ve son bitiş zamanı"""
+        if not self.windows:
+            return None, None
+        return (min(w.start for w in self.windows.values()),
+                max(w.end for w in self.windows.values()))
@@ -0,0 +1,60 @@
+"""
+Parçalı (sharded) canlı sorgu
+- Ligler parçalara bölünür, her parça ayrı bir süreçte kendi canlı sorgusunu yapar
+- Tüm süreçler ortak bir API kota bütçesini paylaşır (dakikalık sınır + günlük rezerv)
+- Aynı bildirimin iki kez gönderilmemesi maç deposundaki notified tablosuyla sağlanır
+"""
+
+import multiprocessing
+import os
+import time
+
+MINUTE_BUDGET = int(os.environ.get("API_MINUTE_BUDGET", "300"))  # Başlıklardaki dakikalık sınır daha düşükse o geçerli
+DAILY_RESERVE = int(os.environ.get("API_DAILY_RESERVE", "0"))    # Günlük kota bu değere inince istek yapılmaz
+
+
+def split_leagues(league_ids, count):
+    """Ligleri count parçaya sırayla dağıt (boş parça oluşmaz)"""
+    league_ids = sorted(league_ids)
+    count = max(1, min(count, len(league_ids)))
+    return [league_ids[i::count] for i in range(count)]
+
+
+class QuotaBudget:
+    """Süreçler arası paylaşılan API kota bütçesi"""
+
+    def __init__(self, per_minute=MINUTE_BUDGET, daily_reserve=DAILY_RESERVE):
+        self.lock = multiprocessing.Lock()
+        self.window = multiprocessing.RawValue('d', 0.0)            # Geçerli dakikanın başı
+        self.used = multiprocessing.RawValue('i', 0)                # Bu dakikada harcanan
+        self.per_minute = multiprocessing.RawValue('i', per_minute)
+        self.daily_remaining = multiprocessing.RawValue('i', -1)    # -1: henüz bilinmiyor
+        self.daily_reserve = daily_reserve
+
+    def acquire(self):
+        """Bir istek hakkı al; dakikalık bütçe doluysa sonraki dakikayı bekle (günlük kota bittiyse False)"""
+        while True:
+            with self.lock:
+                remaining = self.daily_remaining.value
+                if 0 <= remaining <= self.daily_reserve:
+                    return False
+                now = time.time()
+                window = now - now % 60
+                if self.window.value != window:
+                    self.window.value = window
+                    self.used.value = 0
+                if self.used.value < self.per_minute.value:
+                    self.used.value += 1
+                    if remaining > 0:
+                        self.daily_remaining.value = remaining - 1
+                    return True
+                wait = window + 60 - now
+            time.sleep(wait)
+
+    def update(self, daily_remaining, minute_limit):
+        """API yanıt başlıklarındaki güncel kota bilgisini paylaş"""
+        with self.lock:
+            if daily_remaining is not None:
+                self.daily_remaining.value = daily_remaining
+            if minute_limit:
+                self.per_minute.value = min(self.per_minute.value, minute_limit)
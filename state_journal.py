@@ -0,0 +1,172 @@
+"""
+Çökmeye dayanıklı durum günlüğü
+- Bildirim gönderilen (sohbet, kural, maç) üçlüleri, günün fikstür listesi, kaydırılan sorgu pencereleri
+  ve sonucu bekleyen bildirimler satır satır (JSON) günlüğe eklenir
+- Belirli sayıda kayıttan sonra ve her gün başında durum tek bir anlık görüntüye (snapshot) sıkıştırılır
+- Açılışta anlık görüntü + günlük okunur: API çağrısı yapılmadan ve bildirim tekrarlanmadan devam edilir
+- Tüm kayıtlar idempotent: sıkıştırma yarıda kalsa da (görüntü yazıldı, günlük silinmedi) sonuç aynı
+"""
+
+import json
+import os
+import time
+from datetime import date, timedelta
+
+JOURNAL_FILE = os.environ.get("STATE_JOURNAL_FILE", "state_journal.jsonl")
+COMPACT_EVERY = 1000  # Bu kadar kayıttan sonra anlık görüntüye sıkıştır
+
+
+class JournalState:
+    """Günlükten kurulan durum (anlık görüntüye de bu yazılır)"""
+
+    def __init__(self):
+        self.date = None     # Son fikstür yükleme günü
+        self.fixtures = {}   # fixture_id -> Fixture.record()
+        self.windows = {}    # (fixture_id, 'ht'|'ft') -> [başlangıç, bitiş, aralık]
+        self.notified = {}   # (chat_id, kural, fixture_id) -> gün
+        self.alerts = {}     # fixture_id -> [bildirim anındaki Fixture.record(), [kurallar]]
+
+    def apply(self, entry):
+        op = entry['op']
+        if op == 'day':
+            self._new_day(entry['date'], entry['fixtures'])
+        elif op == 'window':
+            self.windows[(entry['fixture_id'], entry['kind'])] = [entry['start'], entry['end'], entry['interval']]
+        elif op == 'notified':
+            self.notified[(entry['chat_id'], entry['rule'], entry['fixture_id'])] = entry['date']
+        elif op == 'released':
+            self.notified.pop((entry['chat_id'], entry['rule'], entry['fixture_id']), None)
+        elif op == 'alert':
+            alert = self.alerts.setdefault(entry['fixture'][0], [entry['fixture'], []])
+            if entry['rule'] not in alert[1]:
+                alert[1].append(entry['rule'])
+        elif op == 'outcome':
+            self.alerts.pop(entry['fixture_id'], None)
+
+    def _new_day(self, day, fixtures):
+        """Yeni günün fikstürleri; dünden eski maçlar ve bildirim kayıtları atılır
+        (gece yarısını aşan maçlar için önceki gün korunur)"""
+        cutoff = (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+        self.fixtures = {fid: f for fid, f in self.fixtures.items() if f[1][:10] >= cutoff}
+        for record in fixtures:
+            self.fixtures[record[0]] = record
+        self.windows = {key: w for key, w in self.windows.items() if key[0] in self.fixtures}
+        self.notified = {key: d for key, d in self.notified.items() if d >= cutoff}
+        self.date = day
+
+    def snapshot(self):
+        return {
+            'date': self.date,
+            'fixtures': list(self.fixtures.values()),
+            'windows': [[fid, kind, *w] for (fid, kind), w in self.windows.items()],
+            'notified': [[*key, d] for key, d in self.notified.items()],
+            'alerts': list(self.alerts.values()),
+        }
+
+    @classmethod
+    def from_snapshot(cls, data):
+        state = cls()
+        state.date = data['date']
+        state.fixtures = {f[0]: f for f in data['fixtures']}
+        state.windows = {(w[0], w[1]): w[2:] for w in data['windows']}
+        state.notified = {tuple(n[:3]): n[3] for n in data['notified']}
+        state.alerts = {a[0][0]: a for a in data['alerts']}
+        return state
+
+
+class StateJournal:
+    """Ekleme yapılan günlük + anlık görüntü"""
+
+    def __init__(self, path=JOURNAL_FILE, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.snapshot_path = f"{path}.snapshot"
+        self.compact_every = compact_every
+        self.state = JournalState()
+        self.appended = 0
+        self.file = None
+
+    def load(self):
+        """Anlık görüntü + günlükten durumu kur: (durum, okunan kayıt sayısı, süre sn)"""
+        started = time.perf_counter()
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    self.state = JournalState.from_snapshot(json.load(f))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Durum görüntüsü okunamadı ({e}), yalnızca günlük kullanılıyor")
+        count = 0
+        torn = False
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        torn = True  # Çökme anında yarım kalmış son satır
+                        break
+                    self.state.apply(entry)
+                    count += 1
+        self.appended = count
+        if torn:
+            # Yeni kayıtlar yarım satırın arkasına eklenmesin
+            self.compact()
+        return self.state, count, time.perf_counter() - started
+
+    def append(self, entry):
+        """Kaydı günlüğe ekle (hemen diske) ve duruma uygula"""
+        self.state.apply(entry)
+        if self.file is None:
+            self.file = open(self.path, 'a', encoding='utf-8')
+        self.file.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n")
+        self.file.flush()
+        self.appended += 1
+        if self.appended >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Durumu anlık görüntüye yaz, günlüğü boşalt"""
+        tmp = f"{self.snapshot_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state.snapshot(), f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        if self.file is not None:
+            self.file.close()
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.appended = 0
+
+    # ---------- Kayıt türleri ----------
+
+    def day(self, day, fixtures):
+        """Günün fikstür listesi yüklendi (yeni gün: hemen sıkıştırılır)"""
+        self.append({'op': 'day', 'date': day, 'fixtures': [f.record() for f in fixtures]})
+        self.compact()
+
+    def window(self, key, window):
+        self.append({'op': 'window', 'fixture_id': key[0], 'kind': key[1],
+                     'start': window.start.isoformat(), 'end': window.end.isoformat(),
+                     'interval': window.interval})
+
+    def notified(self, key, day):
+        chat_id, rule_name, fixture_id = key
+        self.append({'op': 'notified', 'chat_id': chat_id, 'rule': rule_name, 'fixture_id': fixture_id,
+                     'date': day})
+
+    def released(self, key):
+        """Bildirim gönderilemedi: sahiplik bırakıldı, sonra tekrar denenecek"""
+        chat_id, rule_name, fixture_id = key
+        self.append({'op': 'released', 'chat_id': chat_id, 'rule': rule_name, 'fixture_id': fixture_id})
+
+    def alert(self, match, rule_name):
+        """Sonucu izlenecek bildirim (maçın bildirim anındaki görüntüsüyle)"""
+        self.append({'op': 'alert', 'fixture': match.record(), 'rule': rule_name})
+
+    def outcome(self, fixture_id):
+        """Bildirim sonucu yazıldı: artık bekleyen iş değil"""
+        self.append({'op': 'outcome', 'fixture_id': fixture_id})
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,76 @@
+"""
+Abonelik kaydı
+- Her sohbetin kendi ligleri, eşiği ve mesaj formatı vardır
+- Lig -> abonelik indeksi: tek canlı sorgu, her maç yalnızca ilgili abonelere yönlendirilir
+
+subscriptions.json örneği:
+[
+  {"chat_id": "-1001234", "leagues": [39, 140], "threshold": 2.8, "format": "compact", "rules": ["ht00"]},
+  {"chat_id": "5678"}
+]
+Dosya yoksa TELEGRAM_CHAT_ID için tüm ligler, eşik 2.5, tam format kullanılır.
+rules verilmezse tüm strateji kuralları (rules.py) uygulanır; threshold kurallarda "$threshold" olarak kullanılır.
+"""
+
+import json
+import os
+
+SUBSCRIPTIONS_FILE = os.environ.get("SUBSCRIPTIONS_FILE", "subscriptions.json")
+DEFAULT_THRESHOLD = 2.5
+FORMATS = ("full", "compact")
+
+
+class Subscription:
+    """Bir sohbetin bildirim tercihleri"""
+    __slots__ = ('chat_id', 'leagues', 'threshold', 'format', 'rules', 'params')
+
+    def __init__(self, chat_id, leagues=None, threshold=DEFAULT_THRESHOLD, format="full", rules=None):
+        if format not in FORMATS:
+            raise ValueError(f"Geçersiz mesaj formatı: {format} ({chat_id})")
+        self.chat_id = str(chat_id)
+        self.leagues = frozenset(leagues) if leagues else None  # None: izlenen tüm ligler
+        self.threshold = float(threshold)
+        self.format = format
+        self.rules = frozenset(rules) if rules else None  # None: tüm kurallar
+        self.params = {'threshold': self.threshold}  # Kurallardaki "$..." değerleri
+
+    def accepts(self, rule_name):
+        return self.rules is None or rule_name in self.rules
+
+
+class SubscriptionRegistry:
+    """Abonelikler ve lig -> abonelik indeksi"""
+
+    def __init__(self, subscriptions, default_leagues):
+        self.subscriptions = list(subscriptions)
+        self.default_leagues = frozenset(default_leagues)
+        self.by_league = {}
+        for sub in self.subscriptions:
+            for league_id in sub.leagues or self.default_leagues:
+                self.by_league.setdefault(league_id, []).append(sub)
+
+    def __len__(self):
+        return len(self.subscriptions)
+
+    def for_league(self, league_id):
+        return self.by_league.get(league_id, ())
+
+    def check_rules(self, rule_names):
+        """Aboneliklerde tanımsız kural adı var mı?"""
+        for sub in self.subscriptions:
+            unknown = (sub.rules or frozenset()) - set(rule_names)
+            if unknown:
+                raise ValueError(f"Tanımsız kural: {', '.join(sorted(unknown))} ({sub.chat_id})")
+
+    def league_ids(self):
+        """En az bir abonesi olan ligler (canlı sorgu ve fikstür için)"""
+        return sorted(self.by_league)
+
+
+def load_subscriptions(default_chat_id, default_leagues, path=SUBSCRIPTIONS_FILE):
+    """Abonelikleri dosyadan yükle; dosya yoksa tek varsayılan abonelik"""
+    if not os.path.exists(path):
+        return SubscriptionRegistry([Subscription(default_chat_id)], default_leagues)
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return SubscriptionRegistry([Subscription(**entry) for entry in entries], default_leagues)
@@ -0,0 +1,274 @@
+"""
+Takım istatistik indeksi (özellik motoru)
+- Başlangıçta geçmiş maçlardan bir kez kurulur
+- Her biten maçta O(1) güncellenir: tüm geçmiş toplam/sayaç, kayan pencereler
+  (son N iç saha / deplasman / tüm maçlar) ve üstel ağırlıklı ortalamalar (EWMA)
+- Takım başına durum sabit boyutlu: özellik maliyeti geçmişin uzunluğundan bağımsız
+- Pencere ve EWMA boyları FEATURE_WINDOWS / FEATURE_EWMA_SPANS ile ayarlanır; her biri
+  features() içinde ayrı anahtar olarak çıkar, kurallar (rules.json) hepsini kullanabilir
+"""
+
+import json
+import os
+
+LAST_N = 5
+ROLLING_WINDOWS = tuple(sorted({int(n) for n in os.environ.get("FEATURE_WINDOWS", "5,10").split(',') if n}))
+EWMA_SPANS = tuple(sorted({int(n) for n in os.environ.get("FEATURE_EWMA_SPANS", "10").split(',') if n}))
+# Saklanan pencere durumu bu ayarla üretildi mi? (değişirse depodan yeniden hesaplanır)
+ENGINE_CONFIG = [list(ROLLING_WINDOWS), list(EWMA_SPANS)]
+
+# Depodaki türetilmiş sütunlar (features() anahtarlarıyla aynı)
+FEATURE_COLUMNS = [
+    'avg_goal_home_team', 'avg_goal_away_team', 'avg_goal_combined',
+    'avg_goal_home_team_home', 'avg_goal_away_team_away', 'avg_goal_combined_home_away',
+    'home_team_no_goal_last5', 'away_team_no_goal_last5',
+]
+
+
+def _sum_or_none(a, b):
+    return a + b if a is not None and b is not None else None
+
+
+def _family_keys(suffix):
+    """Tüm geçmiş ortalamalarıyla aynı altı anahtar, verilen sonekle"""
+    return tuple(name + suffix for name in FEATURE_COLUMNS[:6])
+
+
+def _add_family(features, keys, home_all, away_all, home_home, away_away):
+    features[keys[0]] = home_all
+    features[keys[1]] = away_all
+    features[keys[2]] = _sum_or_none(home_all, away_all)
+    features[keys[3]] = home_home
+    features[keys[4]] = away_away
+    features[keys[5]] = _sum_or_none(home_home, away_away)
+
+
+def feature_row(features):
+    """Özellikleri depo sütun değerlerine çevir (ortalamalar 2 basamak, yoksa None)"""
+    return {column: round(value, 2) if isinstance(value, float) else value
+            for column, value in ((c, features[c]) for c in FEATURE_COLUMNS)}
+
+
+class RollingWindow:
+    """Son değerlerin halka tamponu; her pencere boyu için kayan toplam (O(pencere sayısı) ekleme)"""
+    __slots__ = ('sizes', 'values', 'pos', 'length', 'sums')
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.values = [0] * max(sizes)
+        self.pos = 0
+        self.length = 0
+        self.sums = [0] * len(sizes)
+
+    def push(self, value):
+        values = self.values
+        capacity = len(values)
+        for i, size in enumerate(self.sizes):
+            if self.length >= size:
+                self.sums[i] -= values[(self.pos - size) % capacity]  # Pencereden çıkan değer
+            self.sums[i] += value
+        values[self.pos] = value
+        self.pos = (self.pos + 1) % capacity
+        if self.length < capacity:
+            self.length += 1
+
+    def restore(self, recent):
+        """recent() çıktısından geri kur (eskiden yeniye, en fazla kapasite kadar)"""
+        length = len(recent)
+        self.values[:length] = recent
+        self.pos = length % len(self.values)
+        self.length = length
+        self.sums = [sum(recent[-size:]) for size in self.sizes]
+
+    def avg(self, i):
+        """i. pencerenin ortalaması (pencere dolmadıysa eldeki maçlarla, hiç maç yoksa None)"""
+        count = min(self.length, self.sizes[i])
+        return self.sums[i] / count if count else None
+
+    def recent(self):
+        """Tampondaki değerler eskiden yeniye"""
+        capacity = len(self.values)
+        start = (self.pos - self.length) % capacity
+        return [self.values[(start + i) % capacity] for i in range(self.length)]
+
+
+_WINDOW_SIZES = ROLLING_WINDOWS or (LAST_N,)
+_ALL_SIZES = tuple(sorted(set(ROLLING_WINDOWS) | {LAST_N}))  # Son 5 gol bayrağı da buradan
+_LAST_N_INDEX = _ALL_SIZES.index(LAST_N)
+_ALPHAS = tuple(2 / (span + 1) for span in EWMA_SPANS)
+# features() için önceden hesaplanan (anahtarlar, pencere sırası, tüm maçlar penceresi sırası)
+_WINDOW_FEATURES = tuple((_family_keys(f"_last{size}"), i, _ALL_SIZES.index(size))
+                         for i, size in enumerate(ROLLING_WINDOWS))
+_EWMA_FEATURES = tuple((_family_keys(f"_ewm{span}"), i) for i, span in enumerate(EWMA_SPANS))
+
+
+def _ewma_push(averages, value):
+    """EWMA değerlerini güncelle (ilk maç başlangıç değeri)"""
+    for i, alpha in enumerate(_ALPHAS):
+        previous = averages[i]
+        averages[i] = value if previous is None else previous + alpha * (value - previous)
+
+
+class TeamStats:
+    """Bir takımın biriken gol istatistikleri"""
+    __slots__ = ('home_sum', 'home_count', 'away_sum', 'away_count',
+                 'home_window', 'away_window', 'all_window', 'home_ewma', 'away_ewma', 'all_ewma')
+
+    def __init__(self):
+        self.home_sum = 0
+        self.home_count = 0
+        self.away_sum = 0
+        self.away_count = 0
+        # Sabit boyutlu kayan pencereler ve EWMA değerleri
+        self.home_window = RollingWindow(_WINDOW_SIZES)
+        self.away_window = RollingWindow(_WINDOW_SIZES)
+        self.all_window = RollingWindow(_ALL_SIZES)
+        self.home_ewma = [None] * len(_ALPHAS)
+        self.away_ewma = [None] * len(_ALPHAS)
+        self.all_ewma = [None] * len(_ALPHAS)
+
+    def push_goals(self, goals):
+        """Tüm maçlar penceresine ve EWMA'sına gol sayısı ekle"""
+        self.all_window.push(goals)
+        _ewma_push(self.all_ewma, goals)
+
+    def add_home(self, goals):
+        self.home_sum += goals
+        self.home_count += 1
+        self.home_window.push(goals)
+        _ewma_push(self.home_ewma, goals)
+        self.push_goals(goals)
+
+    def add_away(self, goals):
+        self.away_sum += goals
+        self.away_count += 1
+        self.away_window.push(goals)
+        _ewma_push(self.away_ewma, goals)
+        self.push_goals(goals)
+
+    def avg_home(self):
+        return self.home_sum / self.home_count if self.home_count else None
+
+    def avg_away(self):
+        return self.away_sum / self.away_count if self.away_count else None
+
+    def avg_all(self):
+        """İç saha + deplasman tüm maçlarda ortalama gol"""
+        count = self.home_count + self.away_count
+        return (self.home_sum + self.away_sum) / count if count else None
+
+    def recent_goals(self):
+        """Son LAST_N maçın gollerini eskiden yeniye sırala"""
+        return self.all_window.recent()[-LAST_N:]
+
+    def state(self):
+        """Kalıcı saklama için durum (pencereler ve EWMA'lar JSON olarak, ayar imzasıyla)"""
+        windows = {'config': ENGINE_CONFIG,
+                   'home': self.home_window.recent(), 'away': self.away_window.recent(),
+                   'all': self.all_window.recent(),
+                   'ewma': [self.home_ewma, self.away_ewma, self.all_ewma]}
+        return (self.home_sum, self.home_count, self.away_sum, self.away_count,
+                ','.join(str(g) for g in self.recent_goals()), json.dumps(windows, separators=(',', ':')))
+
+    @classmethod
+    def from_state(cls, home_sum, home_count, away_sum, away_count, recent, windows=None):
+        """Saklanan durumdan kur; pencere durumu yoksa veya ayar değiştiyse None"""
+        if not windows:
+            return None
+        windows = json.loads(windows)
+        if windows['config'] != ENGINE_CONFIG:
+            return None
+        stats = cls()
+        stats.home_sum = home_sum
+        stats.home_count = home_count
+        stats.away_sum = away_sum
+        stats.away_count = away_count
+        stats.home_window.restore(windows['home'])
+        stats.away_window.restore(windows['away'])
+        stats.all_window.restore(windows['all'])
+        stats.home_ewma, stats.away_ewma, stats.all_ewma = windows['ewma']
+        return stats
+
+    def no_goal_last5(self):
+        """Son 5 maçta hiç gol yoksa 1, varsa 0, 5 maç yoksa None"""
+        if self.all_window.length < LAST_N:
+            return None
+        return 1 if self.all_window.sums[_LAST_N_INDEX] == 0 else 0
+
+
+_EMPTY = TeamStats()
+
+
+class TeamStatsIndex:
+    """Takım id'si -> TeamStats eşlemesi"""
+
+    def __init__(self):
+        self.teams = {}
+        self.version = 0  # Depodaki maç sayacının bu indekse yansımış değeri
+
+    def get(self, team_id):
+        return self.teams.get(str(team_id), _EMPTY)
+
+    def _team(self, team_id):
+        stats = self.teams.get(team_id)
+        if stats is None:
+            stats = self.teams[team_id] = TeamStats()
+        return stats
+
+    def load_team(self, team_id, state):
+        """Saklanan durumdan takım istatistiğini geri yükle (durum eski/uyumsuzsa False)"""
+        stats = TeamStats.from_state(*state)
+        if stats is None:
+            return False
+        self.teams[str(team_id)] = stats
+        return True
+
+    def replay_team(self, team_id, matches):
+        """Takımın istatistiğini maçlarından (kronolojik: ev id, deplasman id, ev gol, deplasman gol) yeniden kur"""
+        self.teams[str(team_id)] = TeamStats()
+        return self.extend_team(team_id, matches)
+
+    def extend_team(self, team_id, matches):
+        """Takımın mevcut istatistiğine yeni maçlarını (kronolojik, replay_team biçiminde) ekle"""
+        team_id = str(team_id)
+        stats = self._team(team_id)
+        for home_team_id, _, home_goals, away_goals in matches:
+            if str(home_team_id) == team_id:
+                stats.add_home(int(home_goals))
+            else:
+                stats.add_away(int(away_goals))
+        return stats
+
+    def add_match(self, home_team_id, away_team_id, home_goals, away_goals):
+        """Biten bir maçı indekse ekle (O(1))"""
+        self._team(str(home_team_id)).add_home(int(home_goals))
+        self._team(str(away_team_id)).add_away(int(away_goals))
+
+    def features(self, home_team_id, away_team_id):
+        """Bir maç için özellikleri hesapla"""
+        home = self.get(home_team_id)
+        away = self.get(away_team_id)
+
+        avg_goal_home_team = home.avg_all()
+        avg_goal_away_team = away.avg_all()
+        avg_goal_home_team_home = home.avg_home()
+        avg_goal_away_team_away = away.avg_away()
+
+        features = {
+            'avg_goal_home_team': avg_goal_home_team,
+            'avg_goal_away_team': avg_goal_away_team,
+            'avg_goal_combined': _sum_or_none(avg_goal_home_team, avg_goal_away_team),
+            'avg_goal_home_team_home': avg_goal_home_team_home,
+            'avg_goal_away_team_away': avg_goal_away_team_away,
+            'avg_goal_combined_home_away': _sum_or_none(avg_goal_home_team_home, avg_goal_away_team_away),
+            'home_team_no_goal_last5': home.no_goal_last5(),
+            'away_team_no_goal_last5': away.no_goal_last5()
+        }
+        # Kayan pencereler: ..._last{N} (pencere dolmadıysa eldeki maçlarla)
+        for keys, i, all_i in _WINDOW_FEATURES:
+            _add_family(features, keys, home.all_window.avg(all_i), away.all_window.avg(all_i),
+                        home.home_window.avg(i), away.away_window.avg(i))
+        # Üstel ağırlıklı ortalamalar: ..._ewm{span}
+        for keys, i in _EWMA_FEATURES:
+            _add_family(features, keys, home.all_ewma[i], away.all_ewma[i], home.home_ewma[i], away.away_ewma[i])
+        return features
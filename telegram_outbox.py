@@ -0,0 +1,252 @@
+"""
+Telegram giden kutusu
+- Karar döngüsü mesajı kuyruğa atar ve hemen devam eder
+- Arka plandaki iş parçacığı keep-alive bağlantı üzerinden gönderir
+- 429 yanıtındaki retry_after'a ve sohbet başına hız sınırına uyar
+- Aynı sohbete biriken mesajları (örn. devre arası yoğunluğu) tek mesajda birleştirir;
+  birleşik mesaj reddedilirse parçalar tek tek gönderilir, yalnızca hatalı olan atılır
+- Kuyruk diske yazılır, gönderilmemiş bildirimler yeniden başlatmada kaybolmaz
+- meta ile eklenen mesajın kesin sonucu (gönderildi / atıldı) on_result ile bildirilir
+"""
+
+import http.client
+import json
+import os
+import threading
+import time
+
+import clock
+from api_client import make_connection
+from metrics import metrics
+
+# Yerel test sunucusu için değiştirilebilir
+TELEGRAM_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+OUTBOX_FILE = os.environ.get("OUTBOX_FILE", "outbox.json")
+MAX_MESSAGE_LENGTH = 4096
+MESSAGE_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+CHAT_MIN_INTERVAL = 3.0  # Aynı sohbete iki mesaj arası (grup sınırı ~20/dk)
+COALESCE_DELAY = 1.0     # İlk mesajdan sonra birleştirme için bekleme (saniye)
+MAX_BACKOFF = 60
+DROP = -1  # Kalıcı hata: mesaj tekrar denenmeden kuyruktan çıkarılır
+
+
+class TelegramOutbox:
+    """Kalıcı, hız sınırına uyan Telegram gönderim kuyruğu"""
+
+    def __init__(self, token, path=OUTBOX_FILE, base_url=TELEGRAM_URL, timeout=30,
+                 chat_min_interval=CHAT_MIN_INTERVAL, coalesce_delay=COALESCE_DELAY, on_result=None):
+        self.token = token
+        # on_result(meta, gönderildi mi): gönderim iş parçacığında, mesaj kuyruktan çıkmadan önce çağrılır
+        self.on_result = on_result
+        self.path = path
+        self.base_url = base_url
+        self.timeout = timeout
+        self.chat_min_interval = chat_min_interval
+        self.coalesce_delay = coalesce_delay
+        self.cond = threading.Condition()
+        self.queue = self._load()
+        self.next_allowed = {}  # chat_id -> monotonic zaman
+        self.conn = None
+        self.thread = None
+        self.sent_count = 0
+        self.dropped_count = 0
+        self.failures = 0
+
+    # ---------- Kalıcılık ----------
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Outbox okunamadı ({e}), boş kuyrukla başlanıyor")
+            return []
+
+    def _persist(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.queue, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    # ---------- Kuyruk ----------
+
+    def enqueue(self, chat_id, text, meta=None):
+        """Mesajı kuyruğa ekle (diske yazılır), gönderimi beklemez
+
+        meta (JSON'a yazılabilir) verilirse mesajın sonucu on_result(meta, gönderildi mi) ile bildirilir.
+        """
+        item = {"chat_id": str(chat_id), "text": text}
+        if meta is not None:
+            item["meta"] = meta
+        with self.cond:
+            self.queue.append(item)
+            self._persist()
+            metrics.set('telegram_outbox_pending', len(self.queue))
+            self.cond.notify()
+
+    def pending(self):
+        with self.cond:
+            return len(self.queue)
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="telegram-outbox", daemon=True)
+            self.thread.start()
+
+    def wait_empty(self, timeout=None):
+        """Kuyruk boşalana kadar bekle (kapanış ve testler için)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.cond:
+            while self.queue:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.cond.wait(remaining)
+        return True
+
+    def _next_batch(self):
+        """Gönderim zamanı gelmiş ilk sohbetin birleştirilecek mesajları: (sohbet, mesajlar, bekleme)"""
+        now = time.monotonic()
+        wait = None
+        for item in self.queue:
+            chat_id = item["chat_id"]
+            delay = self.next_allowed.get(chat_id, 0) - now
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                continue
+            if item.get("single"):
+                return chat_id, [item], None
+            parts = []
+            length = 0
+            for other in self.queue:
+                if other["chat_id"] != chat_id:
+                    continue
+                if other.get("single"):
+                    break  # Sıra korunur: tek gönderilecek mesajdan sonrası bir sonraki partide
+                extra = len(other["text"]) + (len(MESSAGE_SEPARATOR) if parts else 0)
+                if parts and length + extra > MAX_MESSAGE_LENGTH:
+                    break
+                parts.append(other)
+                length += extra
+            return chat_id, parts, None
+        return None, None, wait
+
+    def _run(self):
+        while True:
+            try:
+                self._step()
+            except Exception as e:
+                # Beklenmeyen hata (disk, bozuk yanıt vb.) iş parçacığını durdurmasın
+                delay = self._backoff()
+                print(f"Telegram giden kutusu hatası: {e!r}, {delay} sn sonra devam")
+                metrics.inc('telegram_outbox_errors')
+                time.sleep(clock.real_seconds(delay))
+
+    def _step(self):
+        """Bir partiyi gönder (kuyruk boşsa bekle)"""
+        with self.cond:
+            while not self.queue:
+                self.cond.wait()
+        # Yoğunlukta gelen diğer mesajları da toplamak için kısa bekle
+        time.sleep(clock.real_seconds(self.coalesce_delay))
+        with self.cond:
+            chat_id, parts, wait = self._next_batch()
+            if chat_id is None:
+                self.cond.wait(wait)
+                return
+        text = MESSAGE_SEPARATOR.join(p["text"] for p in parts)
+        with metrics.timer('phase', phase='telegram_send'):
+            retry_after = self._deliver(chat_id, text)
+        if retry_after is None or (retry_after == DROP and len(parts) == 1):
+            # Kesin sonuç: kuyruktan çıkarmadan önce bildirilir (çökmede sonuç kaybolmaz, tekrar bildirilir)
+            self._report(parts, retry_after is None)
+        with self.cond:
+            if retry_after == DROP and len(parts) > 1:
+                # Birleşik mesaj reddedildi: diğer bildirimler kaybolmasın, parçalar tek tek denenir
+                print(f"  Birleşik mesaj reddedildi, {len(parts)} mesaj tek tek gönderilecek")
+                for part in parts:
+                    part["single"] = True
+                self._persist()
+                metrics.inc('telegram_retries')
+            elif retry_after is None or retry_after == DROP:
+                sent_ids = {id(p) for p in parts}
+                self.queue = [item for item in self.queue if id(item) not in sent_ids]
+                self._persist()
+                if retry_after is None:
+                    self.sent_count += len(parts)
+                    metrics.inc('telegram_messages', len(parts), result='sent')
+                else:
+                    self.dropped_count += len(parts)
+                    metrics.inc('telegram_messages', len(parts), result='dropped')
+                self.next_allowed[chat_id] = time.monotonic() + clock.real_seconds(self.chat_min_interval)
+                self.cond.notify_all()
+            else:
+                metrics.inc('telegram_retries')
+                self.next_allowed[chat_id] = time.monotonic() + clock.real_seconds(retry_after)
+
+    def _report(self, parts, sent):
+        if self.on_result is None:
+            return
+        for part in parts:
+            if "meta" not in part:
+                continue
+            try:
+                self.on_result(part["meta"], sent)
+            except Exception as e:
+                # Sonuç işlenemese de mesaj tekrar gönderilmesin
+                print(f"Telegram gönderim sonucu işlenemedi: {e!r}")
+                metrics.inc('telegram_outbox_errors')
+
+    # ---------- Gönderim ----------
+
+    def _connection(self):
+        if self.conn is None:
+            self.conn = make_connection(self.base_url, self.timeout)
+        return self.conn
+
+    def _deliver(self, chat_id, text):
+        """Gönder: başarılıysa None, kalıcı hatada DROP, değilse tekrar denemeden önce beklenecek saniye"""
+        body = json.dumps({"chat_id": chat_id, "text": text, "parse_mode": "HTML"})
+        headers = {'Content-Type': 'application/json'}
+        try:
+            conn = self._connection()
+            conn.request("POST", f"/bot{self.token}/sendMessage", body, headers)
+            res = conn.getresponse()
+            payload = res.read()
+            if res.will_close:
+                self._reset()
+        except (OSError, http.client.HTTPException) as e:
+            self._reset()
+            print(f"Telegram hatası: {e}")
+            return self._backoff()
+
+        if res.status == 200:
+            self.failures = 0
+            return None
+        try:
+            data = json.loads(payload.decode("utf-8"))
+        except ValueError:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        if res.status == 429:
+            retry_after = data.get("parameters", {}).get("retry_after", 5)
+            print(f"Telegram hız sınırı: {retry_after} sn bekleniyor")
+            return retry_after
+        if 400 <= res.status < 500:
+            # Tekrar denemek işe yaramaz (geçersiz sohbet, bozuk HTML vb.)
+            print(f"Telegram HTTP hatası: {res.status} {data.get('description', '')} - mesaj atıldı")
+            return DROP
+        print(f"Telegram HTTP hatası: {res.status}")
+        return self._backoff()
+
+    def _backoff(self):
+        self.failures += 1
+        return min(2 ** self.failures, MAX_BACKOFF)
+
+    def _reset(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
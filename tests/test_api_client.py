@@ -0,0 +1,97 @@
+"""API-Football istemcisi: tekrar deneme beklemeleri"""
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from api_client import ApiFootballClient, ApiError
+
+
+class ScriptedServer:
+    """Sıradaki (durum, başlıklar, gövde) yanıtını dönen yerel sunucu"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.paths = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.paths.append(self.path)
+                status, headers, body = server.responses.pop(0)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class RetryTest(unittest.TestCase):
+
+    def serve(self, responses):
+        server = ScriptedServer(responses)
+        self.addCleanup(server.close)
+        return ApiFootballClient('x', base_url=server.url, max_retries=3, backoff=0.5), server
+
+    def test_retry_after_is_capped_and_uses_clock(self):
+        api, _ = self.serve([(429, {'Retry-After': '3600'}, {}),
+                             (200, {}, {'errors': [], 'response': [1]})])
+        with mock.patch('clock.sleep') as sleep:
+            data = api.get('/fixtures?live=all')
+        self.assertEqual(data['response'], [1])
+        sleep.assert_called_once_with(0.5 * 2 ** 3)
+
+    def test_small_retry_after_is_kept(self):
+        api, _ = self.serve([(503, {'Retry-After': '2'}, {}),
+                             (200, {}, {'errors': [], 'response': []})])
+        with mock.patch('clock.sleep') as sleep:
+            api.get('/fixtures?live=all')
+        sleep.assert_called_once_with(2)
+
+    def test_client_error_is_not_retried(self):
+        api, server = self.serve([(403, {}, {})])
+        with mock.patch('clock.sleep') as sleep, self.assertRaises(ApiError):
+            api.get('/status')
+        sleep.assert_not_called()
+        self.assertEqual(len(server.paths), 1)
+
+
+class ErrorBodyTest(unittest.TestCase):
+
+    def serve(self, responses):
+        server = ScriptedServer(responses)
+        self.addCleanup(server.close)
+        return ApiFootballClient('x', base_url=server.url, max_retries=2, backoff=0.5), server
+
+    def test_errors_in_ok_response_raise(self):
+        api, server = self.serve([(200, {}, {'errors': {'plan': 'Bu parametre planınızda yok'}, 'response': []})])
+        with mock.patch('clock.sleep'), self.assertRaises(ApiError) as caught:
+            api.get('/fixtures?date=2026-10-17')
+        self.assertIn('plan', str(caught.exception))
+        self.assertEqual(len(server.paths), 1)
+
+    def test_rate_limit_error_is_retried(self):
+        api, server = self.serve([(200, {}, {'errors': {'rateLimit': 'Too many requests'}, 'response': []}),
+                                  (200, {}, {'errors': [], 'response': [1]})])
+        with mock.patch('clock.sleep'):
+            self.assertEqual(api.get('/fixtures?live=all')['response'], [1])
+        self.assertEqual(len(server.paths), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Telegram komutları: getUpdates sorgusu, sohbet süzgeci ve yanıt gönderimi"""
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from commands import CommandPoller
+
+
+class UpdatesServer:
+    """Sıradaki getUpdates gövdesini dönen yerel sunucu"""
+
+    def __init__(self, bodies):
+        self.bodies = list(bodies)
+        self.queries = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                server.queries.append((parts.path, parse_qs(parts.query)))
+                payload = json.dumps(server.bodies.pop(0)).encode()
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class EchoHandler:
+    """Bilinen komutu yankılar, bilinmeyende None, /fail'de hata"""
+
+    def __init__(self):
+        self.texts = []
+
+    def answer(self, text):
+        self.texts.append(text)
+        if text == '/fail':
+            raise RuntimeError("bozuk")
+        return f"yanıt: {text}" if text != '/unknown' else None
+
+
+def message(update_id, chat_id, text):
+    return {'update_id': update_id, 'message': {'chat': {'id': chat_id}, 'text': text}}
+
+
+class CommandPollerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = EchoHandler()
+        self.sent = []
+        self.poller = CommandPoller('TOKEN', self.handler, lambda text, chat_id: self.sent.append((chat_id, text)),
+                                    ['42'], timeout=1)
+
+    def test_only_subscribed_chats_are_answered(self):
+        self.poller._dispatch(message(1, 42, '/today')['message'])
+        self.poller._dispatch(message(2, 99, '/today')['message'])
+        self.poller._dispatch(message(3, 42, 'merhaba')['message'])
+        self.assertEqual(self.sent, [('42', "yanıt: /today")])
+        self.assertEqual(self.handler.texts, ['/today'])
+
+    def test_unknown_and_failing_commands_send_nothing(self):
+        self.poller._dispatch(message(1, 42, '/unknown')['message'])
+        self.poller._dispatch(message(2, 42, '/fail')['message'])
+        self.poller._dispatch({})
+        self.assertEqual(self.sent, [])
+
+    def test_offset_follows_last_update(self):
+        server = UpdatesServer([{'ok': True, 'result': [message(7, 42, '/help'), message(8, 99, '/help')]},
+                                {'ok': True, 'result': []},
+                                {'ok': False, 'description': 'Unauthorized'}])
+        self.addCleanup(server.close)
+        self.poller.base_url = server.url
+        self.addCleanup(self.poller._reset)
+        for update in self.poller._get_updates():
+            self.poller.offset = update['update_id'] + 1
+            self.poller._dispatch(update['message'])
+        self.assertEqual(self.poller._get_updates(), [])
+        with self.assertRaises(ValueError):
+            self.poller._get_updates()
+
+        (path, first), (_, second), _ = server.queries
+        self.assertEqual(path, '/botTOKEN/getUpdates')
+        self.assertNotIn('offset', first)
+        self.assertEqual(second['offset'], ['9'])
+        self.assertEqual(self.sent, [('42', "yanıt: /help")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Günlük fikstür yükleyici: tarih sorgusu ve lig bazlı yedek yol"""
+
+import unittest
+
+from api_client import ApiError
+from fixture_loader import load_fixtures
+
+
+def api_fixture(fixture_id, league_id):
+    """/fixtures yanıtındaki tek maç (yükleyicinin kullandığı alanlar)"""
+    return {
+        'fixture': {'id': fixture_id, 'date': '2026-10-17T15:00:00+03:00', 'status': {'short': 'NS', 'elapsed': None}},
+        'league': {'id': league_id, 'name': f"Lig {league_id}", 'country': 'Türkiye'},
+        'teams': {'home': {'id': 1, 'name': 'A'}, 'away': {'id': 2, 'name': 'B'}},
+        'goals': {'home': None, 'away': None},
+        'score': {'halftime': {'home': None, 'away': None}, 'fulltime': {'home': None, 'away': None}},
+    }
+
+
+class FakeApi:
+    """Uç noktaya göre yanıt veya hata dönen istemci"""
+
+    def __init__(self, date_result, league_results):
+        self.date_result = date_result
+        self.league_results = league_results
+        self.endpoints = []
+
+    def get(self, endpoint):
+        self.endpoints.append(endpoint)
+        if endpoint.startswith('/fixtures?date='):
+            result = self.date_result
+        else:
+            league_id = int(endpoint.split('league=')[1].split('&')[0])
+            result = self.league_results[league_id]
+        if isinstance(result, Exception):
+            raise result
+        return {'errors': [], 'response': result}
+
+
+class LoadFixturesTest(unittest.TestCase):
+
+    def test_date_query_filters_leagues_and_reports_time_once(self):
+        api = FakeApi([api_fixture(1, 203), api_fixture(2, 39), api_fixture(3, 999)], {})
+        fixtures, results, seconds = load_fixtures(api, [203, 39, 140], '2026-10-17', 'Europe/Istanbul', 2025)
+        self.assertEqual(sorted(f.id for f in fixtures), [1, 2])
+        self.assertEqual({r.league_id: r.count for r in results}, {203: 1, 39: 1, 140: 0})
+        self.assertTrue(all(r.seconds is None and r.error is None for r in results))
+        self.assertGreaterEqual(seconds, 0)
+        self.assertEqual(len(api.endpoints), 1)
+
+    def test_failed_date_query_falls_back_to_leagues(self):
+        api = FakeApi(ApiError("API hatası: {'plan': 'date parametresi desteklenmiyor'}"),
+                      {203: [api_fixture(1, 203)], 39: ApiError("HTTP 500")})
+        fixtures, results, _ = load_fixtures(api, [203, 39], '2026-10-17', 'Europe/Istanbul', 2025, workers=2)
+        self.assertEqual([f.id for f in fixtures], [1])
+        by_league = {r.league_id: r for r in results}
+        self.assertIsNone(by_league[203].error)
+        self.assertEqual(by_league[203].count, 1)
+        self.assertIsNotNone(by_league[203].seconds)
+        self.assertIn('HTTP 500', by_league[39].error)
+
+    def test_date_query_can_be_skipped(self):
+        api = FakeApi(AssertionError("kullanılmamalı"), {203: []})
+        fixtures, results, _ = load_fixtures(api, [203], '2026-10-17', 'Europe/Istanbul', 2025,
+                                             use_date_query=False)
+        self.assertEqual((fixtures, [r.count for r in results]), ([], [0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""Bot: bildirimin gönderim sonucuna göre kaydedilmesi, bekleyen sonuçların yeniden başlatmada kapanması"""
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import ht_bot
+from fixture_model import Fixture
+from live_state import FixtureTracker
+from match_store import MatchStore
+from prematch import Prepared
+from state_journal import StateJournal
+from subscriptions import Subscription
+from telegram_outbox import TelegramOutbox
+
+
+def api_match(fixture_id=7, status='HT', elapsed=45, goals=(0, 0)):
+    return {
+        'fixture': {'id': fixture_id, 'date': '2026-10-17T15:00:00+03:00',
+                    'status': {'short': status, 'elapsed': elapsed}},
+        'league': {'id': 203, 'name': 'Süper Lig', 'country': 'Türkiye'},
+        'teams': {'home': {'id': 1, 'name': 'A & B'}, 'away': {'id': 2, 'name': 'C'}},
+        'goals': {'home': goals[0], 'away': goals[1]},
+        'score': {'halftime': {'home': 0, 'away': 0}, 'fulltime': {'home': None, 'away': None}},
+    }
+
+
+def live_match(fixture_id=7):
+    return Fixture.from_api(api_match(fixture_id))
+
+
+class BotStateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        path = lambda name: os.path.join(self.dir.name, name)  # noqa: E731
+        self.saved = {name: getattr(ht_bot, name) for name in ('outbox', 'journal', 'fixture_tracker')}
+        ht_bot.outbox = TelegramOutbox('x', path=path('outbox.json'))
+        ht_bot.journal = StateJournal(path('journal.jsonl'))
+        ht_bot.fixture_tracker = FixtureTracker(outcomes_file=path('outcomes.jsonl'))
+        ht_bot.notified_fixtures.clear()
+        self.store = MatchStore(path('matches.db'))
+        self.rule = ht_bot.rules.rules[0]
+        self.sub = Subscription('42')
+        self.match = live_match()
+        self.key = ('42', self.rule.name, self.match.id)
+
+    def tearDown(self):
+        ht_bot.journal.close()
+        for name, value in self.saved.items():
+            setattr(ht_bot, name, value)
+        ht_bot.notified_fixtures.clear()
+        self.store.conn.close()
+        self.dir.cleanup()
+
+
+class AlertDeliveryTest(BotStateTest):
+
+    def send(self):
+        ht_bot.fixture_tracker.update(self.match)
+        prepared = Prepared({}, {(self.rule.name, self.sub): ('full', None)},
+                            {(self.rule.name, 'full', 'full'): ("başlık\n", "\nson")})
+        ht_bot.send_alerts(self.match, prepared, [(self.rule, self.sub)], None, self.store)
+        [item] = ht_bot.outbox.queue
+        return item['meta']
+
+    def test_alert_is_recorded_only_after_delivery(self):
+        meta = self.send()
+        self.assertNotIn(self.key, ht_bot.notified_fixtures)
+        self.assertNotIn(self.match.id, ht_bot.fixture_tracker.outcomes)
+
+        ht_bot.alert_result(meta, True, self.store)
+        self.assertIn(self.key, ht_bot.notified_fixtures)
+        self.assertEqual(ht_bot.fixture_tracker.outcomes[self.match.id].rules, {self.rule.name})
+        state = ht_bot.journal.state
+        self.assertIn(self.key, state.notified)
+        self.assertEqual(state.alerts[self.match.id][1], [self.rule.name])
+        self.assertFalse(self.store.claim_notification(*self.key))
+
+    def test_dropped_alert_releases_claim_and_is_retried(self):
+        meta = self.send()
+        # Mesaj kuyruktayken sonraki tur aynı bildirimi tekrar göndermez
+        ht_bot.outbox.queue.clear()
+        ht_bot.send_alerts(self.match, Prepared({}, {(self.rule.name, self.sub): ('full', None)}, {}),
+                           [(self.rule, self.sub)], None, self.store)
+        self.assertEqual(ht_bot.outbox.queue, [])
+
+        ht_bot.alert_result(meta, False, self.store)
+        self.assertNotIn(self.key, ht_bot.notified_fixtures)
+        self.assertNotIn(self.key, ht_bot.journal.state.notified)
+        changed, _, _ = ht_bot.fixture_tracker.update(self.match)
+        self.assertTrue(changed)  # Değişmemiş maç sonraki turda yeniden değerlendirilir
+        self.assertTrue(self.store.claim_notification(*self.key))
+
+
+class RestoreStateTest(BotStateTest):
+
+    def restore(self, response):
+        """Günlükte dünden kalan, penceresi bitmiş maçlar için bekleyen bildirimler varken yeniden başlat"""
+        other = live_match(8)
+        ht_bot.journal.day('2026-10-17', [self.match, other])
+        for match in (self.match, other):
+            ht_bot.journal.alert(match, self.rule.name)
+        ht_bot.journal.close()
+        ht_bot.journal = StateJournal(ht_bot.journal.path)
+        api = mock.Mock(side_effect=response)
+        with mock.patch.object(ht_bot, 'api_request', api), \
+                mock.patch.object(ht_bot, 'save_finished_match') as save, \
+                mock.patch.object(ht_bot.prematch, 'warm'):
+            day = ht_bot.restore_state(ht_bot.PollScheduler(), None, self.store, datetime.fromisoformat(
+                '2026-10-18T12:00:00+03:00'))
+        self.assertEqual(day, '2026-10-17')
+        return api, save
+
+    def outcomes(self):
+        with open(ht_bot.fixture_tracker.outcomes_file, encoding='utf-8') as f:
+            return {record['fixture_id']: record for record in map(json.loads, f)}
+
+    def test_unscheduled_outcomes_are_fetched_in_one_request(self):
+        finished = {'response': [api_match(7, 'FT', 90, (1, 0)), api_match(8, 'PST', None)]}
+        api, save = self.restore([finished])
+        api.assert_called_once_with("/fixtures?ids=7-8")
+        save.assert_called_once()
+        outcomes = self.outcomes()
+        self.assertEqual((outcomes[7]['final_status'], outcomes[7]['final_score'], outcomes[7]['second_half_goal']),
+                         ('FT', '1-0', True))
+        self.assertEqual(outcomes[8]['final_status'], 'PST')
+        self.assertEqual(ht_bot.fixture_tracker.outcomes, {})
+        self.assertEqual(ht_bot.journal.state.alerts, {})
+
+    def test_outcomes_expire_when_results_cannot_be_fetched(self):
+        self.restore(ht_bot.ApiError("HTTP 500"))
+        self.assertEqual(self.outcomes()[7]['final_score'], '0-0')
+        self.assertEqual(ht_bot.fixture_tracker.outcomes, {})
+        self.assertEqual(ht_bot.journal.state.alerts, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+"""Maç deposu: sayaç, toplu yazma, takım adları, süreçler arası takım istatistikleri ve bildirim sahipliği"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from match_store import MatchStore
+from team_stats import TeamStatsIndex
+
+
+def match_row(fixture_id, home, away, home_goals, away_goals, date='2026-10-17', time='15:00'):
+    return {'fixture_id': fixture_id, 'date': date, 'time': time, 'league_id': 203,
+            'home_team_id': home, 'home_team': f"Takım {home}", 'away_team_id': away,
+            'away_team': f"Takım {away}", 'home_goals': home_goals, 'away_goals': away_goals,
+            'ht_home': 0, 'ht_away': 0}
+
+
+class StoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'matches.db')
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.conn.close()
+        self.dir.cleanup()
+
+    def open_store(self):
+        store = MatchStore(self.path)
+        self.stores.append(store)
+        return store
+
+
+class MatchStoreTest(StoreTestCase):
+
+    def test_count_includes_pending_and_survives_reopen(self):
+        store = self.open_store()
+        store.add(match_row(1, 10, 20, 1, 0))
+        store.add(match_row(2, 30, 40, 0, 0))
+        self.assertEqual(store.count(), 2)
+        self.assertEqual(store.flush(), 2)
+        self.assertEqual(store.count(), 2)
+        store.add(match_row(1, 10, 20, 1, 0))  # Zaten kayıtlı: sayaç artmaz
+        store.flush()
+        self.assertEqual(self.open_store().count(), 2)
+
+    def test_has_sees_pending_and_stored(self):
+        store = self.open_store()
+        store.add(match_row(1, 10, 20, 1, 0))
+        self.assertTrue(store.has(1))
+        store.flush()
+        self.assertTrue(store.has('1'))
+        self.assertFalse(store.has(2))
+
+    def test_locked_flush_keeps_pending(self):
+        store = self.open_store()
+        store.conn.execute("PRAGMA busy_timeout = 0")
+        store.add(match_row(1, 10, 20, 1, 0))
+        other = sqlite3.connect(self.path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        with self.assertRaises(sqlite3.OperationalError):
+            store.flush()
+        other.execute("ROLLBACK")
+        other.close()
+        self.assertTrue(store.has(1))
+        self.assertEqual(store.flush(), 1)
+        self.assertEqual(store.count(), 1)
+
+    def test_team_names_use_newest_match(self):
+        store = self.open_store()
+        newest = match_row(1, 10, 20, 1, 0, date='2026-10-17')
+        newest['away_team'] = "Yeni Ad"
+        store.add(newest)
+        store.add(match_row(2, 20, 30, 0, 0, date='2026-10-10'))  # Eski ad, daha sonra eklenmiş
+        store.add(match_row(3, 30, 20, 0, 0, date='2026-10-17', time='12:00'))
+        store.flush()
+        self.assertEqual(store.team_names(), {10: "Takım 10", 20: "Yeni Ad", 30: "Takım 30"})
+
+
+class SharedStatsTest(StoreTestCase):
+    """İki depo nesnesi aynı dosyada: iki parça / bot ve fetch_matches.py gibi"""
+
+    def setUp(self):
+        super().setUp()
+        self.rng = random.Random(5)
+        self.next_id = 1
+
+    def play(self, store, stats, day, teams=range(1, 7)):
+        """Günün maçını hem belleğe hem depoya ekle (ht_bot.save_finished_match gibi)"""
+        home, away = self.rng.sample(list(teams), 2)
+        row = match_row(self.next_id, home, away, self.rng.randint(0, 3), self.rng.randint(0, 2),
+                        date=f"2026-10-{day:02d}")
+        self.next_id += 1
+        store.add(row)
+        stats.add_match(home, away, row['home_goals'], row['away_goals'])
+        return row
+
+    def assert_matches_rebuild(self, stats):
+        expected = self.open_store().rebuild_stats()
+        self.assertEqual({t: s.state() for t, s in stats.teams.items()},
+                         {t: s.state() for t, s in expected.teams.items()})
+
+    def test_two_writers_do_not_overwrite_each_other(self):
+        first, second = self.open_store(), self.open_store()
+        first_stats, second_stats = first.load_stats(), second.load_stats()
+        for day in range(1, 20):
+            self.play(first, first_stats, day)
+            self.play(second, second_stats, day)
+            first.flush(first_stats)
+            second.flush(second_stats)
+            self.assertTrue(first.sync_stats(first_stats))
+            second.sync_stats(second_stats)
+        self.assert_matches_rebuild(first_stats)
+        self.assert_matches_rebuild(second_stats)
+        self.assert_matches_rebuild(self.open_store().load_stats())
+
+    def test_flush_applies_only_new_matches(self):
+        store = self.open_store()
+        stats = store.load_stats()
+        for day in range(1, 10):
+            self.play(store, stats, day)
+        store.flush(stats)
+        self.play(store, stats, 20)
+        with mock.patch.object(TeamStatsIndex, 'replay_team', side_effect=AssertionError("yeniden hesaplandı")):
+            store.flush(stats)
+        store.sync_stats(stats)
+        self.assert_matches_rebuild(stats)
+
+    def test_older_or_duplicate_matches_fall_back_to_replay(self):
+        store = self.open_store()
+        stats = store.load_stats()
+        rows = [self.play(store, stats, day, teams=(1, 2)) for day in range(10, 20)]
+        store.flush(stats)
+        store.add(match_row(self.next_id, 1, 2, 4, 4, date='2026-10-01'))  # En son maçlardan eski
+        store.add(rows[-1])  # Zaten kayıtlı
+        store.flush(stats)
+        store.sync_stats(stats)
+        self.assert_matches_rebuild(stats)
+
+    def test_ingest_without_stats_is_picked_up(self):
+        bot, ingest = self.open_store(), self.open_store()
+        stats = bot.load_stats()
+        for day in range(1, 5):
+            self.play(bot, stats, day)
+        bot.flush(stats)
+        ingest.add(match_row(900, 1, 2, 2, 2, date='2026-09-01'))
+        ingest.flush()
+        # İstatistikler eksik: bot yazarken etkilenen takımlar maçlardan hesaplanır
+        self.play(bot, stats, 6, teams=(1, 2))
+        bot.flush(stats)
+        ingest.backfill_features()
+        changed = bot.sync_stats(stats)
+        self.assertTrue(changed)
+        self.assert_matches_rebuild(stats)
+        self.assertEqual(bot.sync_stats(stats), set())
+
+    def test_lagging_watermark_rebuilds_on_load(self):
+        store = self.open_store()
+        store.add(match_row(1, 10, 20, 1, 0))
+        store.flush()  # İstatistiksiz yazma (yarıda kalmış içe aktarma)
+        stats = self.open_store().load_stats()
+        self.assertEqual(stats.get(10).state()[:4], (1, 1, 0, 0))
+
+
+class NotificationClaimTest(StoreTestCase):
+
+    def test_claim_is_exclusive_across_stores_until_released(self):
+        first, second = self.open_store(), self.open_store()
+        self.assertTrue(first.claim_notification('42', 'ht00', 7))
+        self.assertFalse(second.claim_notification(42, 'ht00', '7'))
+        self.assertTrue(second.claim_notification('42', 'other', 7))
+        first.release_notification('42', 'ht00', 7)
+        self.assertTrue(second.claim_notification('42', 'ht00', 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
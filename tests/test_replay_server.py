@@ -0,0 +1,58 @@
+"""Replay sunucusu: canlı/ids sorguları ve bildirim gecikmesi özeti"""
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import ht_bot
+from replay_server import HT_START, ReplayState, SimFixture
+
+KICKOFF = datetime(2026, 10, 17, 15, 0, tzinfo=timezone(timedelta(hours=3)))
+LEAGUE = {'id': 39, 'name': 'Premier League', 'country': 'England', 'round': ''}
+
+
+class FixedClock:
+    def __init__(self, when):
+        self.when = when
+
+    def timestamp(self):
+        return self.when.timestamp()
+
+    def now(self, tz=None):
+        return self.when.astimezone(tz)
+
+
+def sim_fixture(fixture_id, home, away, kickoff=KICKOFF):
+    return SimFixture(fixture_id, kickoff, LEAGUE, {'id': 2 * fixture_id, 'name': home},
+                      {'id': 2 * fixture_id + 1, 'name': away}, [])
+
+
+class ReplayStateTest(unittest.TestCase):
+
+    def test_finished_matches_leave_live_feed_but_answer_ids(self):
+        clock = FixedClock(KICKOFF + timedelta(minutes=115))
+        state = ReplayState([sim_fixture(1, 'A', 'B'), sim_fixture(2, 'C', 'D', KICKOFF + timedelta(minutes=60))],
+                            clock)
+        self.assertEqual([f['fixture']['id'] for f in state.query_fixtures({'live': 'all'})], [2])
+        statuses = {f['fixture']['id']: f['fixture']['status']['short'] for f in state.query_fixtures({'ids': '1-2'})}
+        self.assertEqual(statuses, {1: 'FT', 2: 'HT'})
+
+    def test_latency_matches_escaped_names(self):
+        names = [('Brighton & Hove Albion', 'St. Pauli (U19)'), ('A+B', 'C.D')]
+        fixtures = [sim_fixture(i, home, away) for i, (home, away) in enumerate(names, 1)]
+        clock = FixedClock(KICKOFF + timedelta(minutes=HT_START, seconds=90))
+        state = ReplayState(fixtures, clock)
+        rule = SimpleNamespace(title='HT 0-0')
+        for f in fixtures:
+            fixture = SimpleNamespace(home_name=f.home['name'], away_name=f.away['name'],
+                                      league_name=LEAGUE['name'], country=LEAGUE['country'])
+            for fmt in ('full', 'compact'):
+                head, _ = ht_bot.alert_skeleton('no_data', rule, fixture, {'avg_goal_combined_home_away': None}, fmt)
+                state.record_message('1', head)
+        summary = state.summary()
+        self.assertEqual(summary['alerts_matched'], 4)
+        self.assertEqual(summary['alert_latency_seconds']['max'], 90)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Strateji kuralları: derleme, maç koşulları, kararlar ve durum indeksi"""
+
+import unittest
+from types import SimpleNamespace
+
+from rules import DEFAULT_RULES, RuleSet
+
+
+def live(status='HT', elapsed=45, score=(0, 0), ht=(0, 0)):
+    return SimpleNamespace(status=status, elapsed=elapsed, home_goals=score[0], away_goals=score[1],
+                           ht_home=ht[0], ht_away=ht[1])
+
+
+class MatchTest(unittest.TestCase):
+
+    def test_score_minute_and_open_side(self):
+        rules = RuleSet([{"name": "r", "status": ["2H"], "ht_score": [1, None], "score": [1, 0],
+                          "minute": [60, 70]}])
+        rule = rules.rules[0]
+        self.assertIsNone(rule.match(live('2H', 65, (1, 0), (1, 0))))
+        self.assertEqual(rule.match(live('2H', 65, (1, 0), (0, 0))), 'ht_score')
+        self.assertEqual(rule.match(live('2H', 65, (1, 1), (1, 1))), 'score')
+        self.assertEqual(rule.match(live('2H', 71, (1, 0), (1, 0))), 'minute')
+        self.assertEqual(rule.match(live('2H', None, (1, 0), (1, 0))), 'minute')
+
+
+class VerdictTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rule = RuleSet(DEFAULT_RULES).rules[0]
+        self.params = {'threshold': 2.5}
+
+    def features(self, combined=3.0, home=0, away=0):
+        return {'avg_goal_combined_home_away': combined, 'home_team_no_goal_last5': home,
+                'away_team_no_goal_last5': away}
+
+    def test_full_and_threshold_from_params(self):
+        self.assertEqual(self.rule.verdict(self.features(), self.params), ('full', None))
+        self.assertEqual(self.rule.verdict(self.features(2.5), self.params), (None, 'avg_goal_low'))
+        self.assertEqual(self.rule.verdict(self.features(2.5), {'threshold': 2.0}), ('full', None))
+
+    def test_missing_behaviours(self):
+        self.assertEqual(self.rule.verdict(self.features(None), self.params), ('no_data', None))
+        self.assertEqual(self.rule.verdict(self.features(home=None), self.params), ('partial', None))
+        self.assertEqual(self.rule.verdict(self.features(home=None, away=1), self.params), (None, 'no_goal_last5'))
+        strict = RuleSet([{"name": "s", "features": [{"feature": "x", "op": ">=", "value": 1}]}]).rules[0]
+        self.assertEqual(strict.verdict({}, {}), (None, 'x'))
+        self.assertEqual(strict.verdict({'x': 1}, {}), ('full', None))
+
+
+class RuleSetTest(unittest.TestCase):
+
+    def test_status_index_keeps_file_order(self):
+        rules = RuleSet([{"name": "a", "status": ["HT"]}, {"name": "any"}, {"name": "b", "status": ["HT", "2H"]}])
+        self.assertEqual([r.name for r in rules.for_status('HT')], ['a', 'any', 'b'])
+        self.assertEqual([r.name for r in rules.for_status('2H')], ['any', 'b'])
+        self.assertEqual([r.name for r in rules.for_status('1H')], ['any'])
+        self.assertFalse(rules.uses_minute())
+        self.assertTrue(RuleSet([{"name": "m", "minute": [1, 10]}]).uses_minute())
+
+    def test_invalid_specs_are_rejected(self):
+        for specs in ([{"name": "a"}, {"name": "a"}],
+                      [{"name": "a", "features": [{"feature": "x", "op": "~", "value": 1}]}],
+                      [{"name": "a", "features": [{"feature": "x", "op": ">", "value": 1, "missing": "skip"}]}]):
+            with self.assertRaises(ValueError):
+                RuleSet(specs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""Sorgu zamanlayıcısı: pencerelerin maç dakikalarını kapsaması"""
+
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from rules import RuleSet
+from scheduler import PollScheduler
+
+KICKOFF = datetime(2026, 10, 17, 15, 0)
+LIVE = {'1H', 'HT', '2H', 'ET', 'BT', 'P'}
+RULES = [
+    {"name": "ht00", "status": ["HT", "2H"], "ht_score": [0, 0]},
+    {"name": "00_60", "status": ["2H"], "score": [0, 0], "minute": [60, 70]},
+]
+
+
+def live_state(minutes_since_kickoff, delay=0):
+    """Tam zamanında (veya delay dk geç) başlayan maçın durumu ve dakikası"""
+    minute = minutes_since_kickoff - delay
+    if minute < 0:
+        return 'NS', None
+    if minute < 45:
+        return '1H', int(minute)
+    if minute < 60:
+        return 'HT', None
+    if minute < 105:
+        return '2H', int(minute - 15)
+    return 'FT', 90
+
+
+def extra_time_state(minutes_since_kickoff, delay=0):
+    """Uzatmaya ve penaltılara giden maçın durumu ve dakikası"""
+    minute = minutes_since_kickoff - delay
+    if minute < 105:
+        return live_state(minute)
+    if minute < 110:
+        return '2H', 90  # Uzatma dakikaları
+    if minute < 115:
+        return 'BT', 90
+    if minute < 148:
+        return 'ET', min(int(minute - 115) + 91, 120)
+    if minute < 168:
+        return 'P', 120
+    return 'PEN', 120
+
+
+def simulate(scheduler, delay=0, state=live_state):
+    """Zamanlayıcının uyandığı her anda maçın canlı görüntüsü: [(başlamadan sonra dk, durum, dakika)]"""
+    scheduler.add_fixtures([SimpleNamespace(id=1, date=KICKOFF.isoformat(), status='NS')], KICKOFF)
+    now = KICKOFF
+    seen = []
+    while True:
+        wake = scheduler.next_wake()
+        if wake is None:
+            return seen
+        now = max(now, wake)
+        since = (now - KICKOFF).total_seconds() / 60
+        status, elapsed = state(since, delay)
+        seen.append((since, status, elapsed))
+        live = [SimpleNamespace(id=1, status=status, elapsed=elapsed)] if status in LIVE else []
+        scheduler.observe(live, now)
+        scheduler.mark_polled(now)
+
+
+class MinuteRuleTest(unittest.TestCase):
+
+    def test_minute_ranges_follow_rule_statuses(self):
+        rules = RuleSet(RULES + [{"name": "early", "status": ["1H"], "minute": [30, 60]},
+                                 {"name": "ht_only", "status": ["HT"], "minute": [40, 50]}])
+        self.assertEqual(rules.minute_ranges(), [(30, 45), (60, 70)])
+
+    def test_without_minute_rules_second_half_is_not_polled(self):
+        seen = simulate(PollScheduler(60, 300))
+        self.assertFalse([e for _, status, e in seen if status == '2H' and 60 <= e <= 70])
+
+    def test_00_60_rule_fires_at_60_minutes(self):
+        rules = RuleSet(RULES)
+        rule = rules.rules[1]
+        seen = simulate(PollScheduler(60, 300, rules.minute_ranges()))
+        minutes = sorted({e for _, status, e in seen if status == '2H' and 60 <= e <= 70})
+        self.assertEqual(minutes, list(range(60, 71)))
+        # 0-0 maçta kural bu görüntülerde eşleşir
+        match = SimpleNamespace(status='2H', elapsed=minutes[0], home_goals=0, away_goals=0, ht_home=0, ht_away=0)
+        self.assertIsNone(rule.match(match))
+        self.assertIn(rule, rules.for_status('2H'))
+
+    def test_minute_window_follows_delayed_kickoff(self):
+        rules = RuleSet(RULES)
+        seen = simulate(PollScheduler(60, 300, rules.minute_ranges()), delay=20)
+        minutes = {e for _, status, e in seen if status == '2H' and 60 <= e <= 70}
+        self.assertEqual(minutes, set(range(60, 71)))
+
+
+class DelayedKickoffTest(unittest.TestCase):
+
+    def test_ht_and_ft_seen_on_time(self):
+        statuses = {status for _, status, _ in simulate(PollScheduler(60, 300))}
+        self.assertIn('HT', statuses)
+        self.assertIn('FT', statuses)
+
+    def test_expired_ht_window_is_recreated(self):
+        # HT penceresi (45-65. dk) maç başlamadan kapanır; FT penceresindeki sorgu maçı 1H'de görür
+        for delay in (20, 80):
+            seen = simulate(PollScheduler(60, 300), delay=delay)
+            statuses = [status for _, status, _ in seen]
+            self.assertIn('HT', statuses, delay)
+            self.assertIn('FT', statuses, delay)
+
+
+class ExtraTimeTest(unittest.TestCase):
+
+    def test_final_status_seen_after_extra_time_and_penalties(self):
+        for delay in (0, 80):
+            seen = simulate(PollScheduler(60, 300), delay=delay, state=extra_time_state)
+            statuses = [status for _, status, _ in seen]
+            self.assertIn('ET', statuses, delay)
+            self.assertEqual(statuses[-1], 'PEN', delay)
+
+    def test_extra_time_window_ends_after_penalties(self):
+        scheduler = PollScheduler(60, 300)
+        scheduler.add_fixtures([SimpleNamespace(id=1, date=KICKOFF.isoformat(), status='NS')], KICKOFF)
+        now = KICKOFF + timedelta(minutes=112)
+        self.assertEqual(scheduler.observe([SimpleNamespace(id=1, status='BT', elapsed=90)], now), [(1, 'ft')])
+        window = scheduler.windows[(1, 'ft')]
+        self.assertEqual(window.start, now + timedelta(minutes=35))
+        self.assertEqual(window.end, window.start + timedelta(minutes=20))
+
+
+if __name__ == '__main__':
+    unittest.main()
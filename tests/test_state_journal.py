@@ -0,0 +1,56 @@
+"""Durum günlüğü: çökme sonrası yarım satırla açılış"""
+
+import os
+import tempfile
+import unittest
+
+from state_journal import StateJournal
+
+
+def notified(journal, fixture_id):
+    journal.notified(('1', 'ht00', fixture_id), '2026-10-17')
+
+
+class TornLineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'journal.jsonl')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write_torn(self):
+        journal = StateJournal(self.path)
+        journal.load()
+        for fixture_id in (1, 2, 3):
+            notified(journal, fixture_id)
+        journal.close()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"op":"notified","chat_id":"1","ru')  # Çökme anında yarım kalan satır
+
+    def test_load_keeps_entries_before_torn_line(self):
+        self.write_torn()
+        journal = StateJournal(self.path)
+        state, count, _ = journal.load()
+        self.assertEqual(count, 3)
+        self.assertEqual(sorted(key[2] for key in state.notified), [1, 2, 3])
+        journal.close()
+        # Yarım satır sıkıştırmayla atıldı
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), '')
+        self.assertTrue(os.path.exists(journal.snapshot_path))
+
+    def test_appends_after_torn_line_survive_restart(self):
+        self.write_torn()
+        journal = StateJournal(self.path)
+        journal.load()
+        notified(journal, 4)
+        journal.close()
+        state, count, _ = StateJournal(self.path).load()
+        self.assertEqual(count, 1)
+        self.assertEqual(sorted(key[2] for key in state.notified), [1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Takım istatistik indeksi: kayan pencere ve EWMA durumunun doğruluğu"""
+
+import random
+import unittest
+
+from team_stats import (EWMA_SPANS, LAST_N, ROLLING_WINDOWS, RollingWindow, TeamStats, TeamStatsIndex)
+
+
+def _avg(values):
+    return sum(values) / len(values) if values else None
+
+
+def _ewma(values, span):
+    alpha = 2 / (span + 1)
+    value = None
+    for goals in values:
+        value = goals if value is None else value + alpha * (goals - value)
+    return value
+
+
+class RollingWindowTest(unittest.TestCase):
+
+    def test_sums_after_wraparound_match_recompute(self):
+        window = RollingWindow((3, 5, 8))
+        values = []
+        rng = random.Random(1)
+        for _ in range(50):  # Kapasite (8) defalarca aşılır
+            value = rng.randint(0, 4)
+            window.push(value)
+            values.append(value)
+            self.assertEqual(window.sums, [sum(values[-size:]) for size in (3, 5, 8)])
+            self.assertEqual(window.recent(), values[-8:])
+
+    def test_restore_matches_pushed_window(self):
+        for count in (0, 2, 8, 13):
+            pushed = RollingWindow((3, 8))
+            values = list(range(count))
+            for value in values:
+                pushed.push(value)
+            restored = RollingWindow((3, 8))
+            restored.restore(pushed.recent())
+            self.assertEqual((restored.sums, restored.recent(), restored.length),
+                             (pushed.sums, pushed.recent(), pushed.length))
+            # Geri kurulan tampon aynı şekilde ilerlemeli
+            pushed.push(7)
+            restored.push(7)
+            self.assertEqual((restored.sums, restored.recent()), (pushed.sums, pushed.recent()))
+
+
+class TeamStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TeamStatsIndex()
+        self.history = {}  # takım -> [(taraf, gol)]
+        rng = random.Random(3)
+        for _ in range(600):
+            home, away = rng.sample(range(1, 9), 2)
+            home_goals, away_goals = rng.randint(0, 3), rng.randint(0, 2)
+            self.index.add_match(home, away, home_goals, away_goals)
+            self.history.setdefault(home, []).append(('home', home_goals))
+            self.history.setdefault(away, []).append(('away', away_goals))
+
+    def test_features_match_recompute_from_history(self):
+        for home in self.history:
+            for away in self.history:
+                if home == away:
+                    continue
+                features = self.index.features(home, away)
+                home_all = [g for _, g in self.history[home]]
+                away_all = [g for _, g in self.history[away]]
+                home_home = [g for side, g in self.history[home] if side == 'home']
+                away_away = [g for side, g in self.history[away] if side == 'away']
+                expected = {'avg_goal_combined_home_away': _avg(home_home) + _avg(away_away),
+                            'home_team_no_goal_last5': int(sum(home_all[-LAST_N:]) == 0)}
+                for n in ROLLING_WINDOWS:
+                    expected[f'avg_goal_home_team_last{n}'] = _avg(home_all[-n:])
+                    expected[f'avg_goal_combined_home_away_last{n}'] = _avg(home_home[-n:]) + _avg(away_away[-n:])
+                for n in EWMA_SPANS:
+                    expected[f'avg_goal_away_team_ewm{n}'] = _ewma(away_all, n)
+                    expected[f'avg_goal_home_team_home_ewm{n}'] = _ewma(home_home, n)
+                for name, value in expected.items():
+                    self.assertAlmostEqual(features[name], value, places=9, msg=name)
+
+    def test_state_roundtrip(self):
+        for team_id, stats in self.index.teams.items():
+            restored = TeamStats.from_state(*stats.state())
+            self.assertEqual(restored.state(), stats.state())
+            restored.add_home(2)
+            stats.add_home(2)
+            self.assertEqual(restored.state(), stats.state())
+
+    def test_state_without_windows_is_rejected(self):
+        stats = self.index.teams['1']
+        self.assertIsNone(TeamStats.from_state(*stats.state()[:5]))
+        self.assertFalse(TeamStatsIndex().load_team(1, stats.state()[:5]))
+
+    def test_few_matches(self):
+        index = TeamStatsIndex()
+        index.add_match(1, 2, 0, 0)
+        features = index.features(1, 2)
+        self.assertIsNone(features['home_team_no_goal_last5'])
+        self.assertEqual(features['avg_goal_home_team_last5'], 0)
+        self.assertIsNone(index.features(3, 4)['avg_goal_combined_last5'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Telegram giden kutusu: birleştirme, reddedilen mesajlar ve gönderim sonucu"""
+
+import os
+import tempfile
+import unittest
+
+import telegram_outbox
+from telegram_outbox import DROP, MESSAGE_SEPARATOR, TelegramOutbox
+
+
+class FakeOutbox(TelegramOutbox):
+    """Telegram yerine metne göre yanıt veren giden kutusu ('BAD' içeren mesaj reddedilir)"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__('x', path=path, chat_min_interval=0, coalesce_delay=0, **kwargs)
+        self.delivered = []
+        self.fail_next = 0
+
+    def _deliver(self, chat_id, text):
+        if self.fail_next:
+            self.fail_next -= 1
+            raise RuntimeError("beklenmeyen hata")
+        if 'BAD' in text:
+            return DROP
+        self.delivered.append((chat_id, text))
+        return None
+
+    def _backoff(self):
+        return 0
+
+
+class OutboxTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'outbox.json')
+        self.results = []
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def outbox(self):
+        return FakeOutbox(self.path, on_result=lambda meta, sent: self.results.append((meta, sent)))
+
+    def drain(self, outbox):
+        while outbox.pending():
+            outbox._step()
+
+    def test_burst_is_coalesced_per_chat(self):
+        outbox = self.outbox()
+        for chat_id, text in (('1', 'a'), ('2', 'b'), ('1', 'c')):
+            outbox.enqueue(chat_id, text)
+        self.drain(outbox)
+        self.assertEqual(sorted(outbox.delivered), [('1', f"a{MESSAGE_SEPARATOR}c"), ('2', 'b')])
+        self.assertEqual(outbox.sent_count, 3)
+
+    def test_coalesced_message_respects_length_limit(self):
+        outbox = self.outbox()
+        text = 'x' * (telegram_outbox.MAX_MESSAGE_LENGTH // 2 - len(MESSAGE_SEPARATOR))
+        for _ in range(3):
+            outbox.enqueue('1', text)
+        self.drain(outbox)
+        self.assertEqual([len(t) for _, t in outbox.delivered],
+                         [2 * len(text) + len(MESSAGE_SEPARATOR), len(text)])
+
+    def test_rejected_batch_is_split_and_only_bad_part_dropped(self):
+        outbox = self.outbox()
+        for i, text in enumerate(('a1', 'a2 BAD', 'a3')):
+            outbox.enqueue('1', text, {'n': i})
+        self.drain(outbox)
+        self.assertEqual([t for _, t in outbox.delivered], ['a1', 'a3'])
+        self.assertEqual((outbox.sent_count, outbox.dropped_count), (2, 1))
+        self.assertEqual(sorted((meta['n'], sent) for meta, sent in self.results),
+                         [(0, True), (1, False), (2, True)])
+
+    def test_result_reported_before_removal_and_queue_persisted(self):
+        outbox = self.outbox()
+        outbox.enqueue('1', 'a', {'n': 1})
+        outbox.enqueue('1', 'b')  # meta yok: sonuç bildirilmez
+        reloaded = self.outbox()
+        self.assertEqual([item.get('meta') for item in reloaded.queue], [{'n': 1}, None])
+
+        def check_pending(meta, sent):
+            self.assertEqual(reloaded.pending(), 2)  # Henüz kuyruktan çıkmadı
+            self.results.append((meta, sent))
+        reloaded.on_result = check_pending
+        self.drain(reloaded)
+        self.assertEqual(self.results, [({'n': 1}, True)])
+        self.assertEqual(self.outbox().pending(), 0)
+
+    def test_thread_survives_unexpected_error(self):
+        outbox = self.outbox()
+        outbox.fail_next = 1
+        outbox.enqueue('1', 'a')
+        outbox.start()
+        self.assertTrue(outbox.wait_empty(5))
+        self.assertTrue(outbox.thread.is_alive())
+        self.assertEqual(outbox.delivered, [('1', 'a')])
+
+
+if __name__ == '__main__':
+    unittest.main()